@@ -26,7 +26,7 @@ REQUIRES_PYTHON = '>=3.6.0'
 REQUIRED = [
     'nanolib>=0.4', 'msgpack>=0.6', 'cryptography>=2.6', 'appdirs>=1.4',
     'click>=7.0', 'toml>=0.10', 'aiohttp>=3.5', 'filelock>=3.0', 'ijson>=2.5',
-    'python-rapidjson>=0.8'
+    'python-rapidjson>=0.8', 'ed25519-blake2b>=1.4'
 ]
 
 
@@ -150,6 +150,7 @@ setup(
         ],
         "siliqua.plugins.ui": [
             "stdio = siliqua.ui.stdio:StdioUI",
+            "daemon = siliqua.ui.daemon:DaemonUI",
         ]
     },
     # $ setup.py publish support.
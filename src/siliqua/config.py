@@ -49,12 +49,37 @@ denomination = "nano"
 # Default is 0.0001 NANO
 minimum_pocketable_amount = "100000000000000000000000000"
 
+# Large amounts of blocks are signed in a process pool
+# -1 = use half of logical CPU cores (default)
+signing_processes = -1
+# Maximum time in seconds a single update waits for blocks to be signed
+signing_time_budget = 0.1
+
+[ui]
+
+    [ui.daemon]
+    # Address the daemon's JSON-RPC API listens on. The wallet is kept
+    # unlocked while the daemon is running, so don't expose the API
+    # to untrusted clients.
+    host = "127.0.0.1"
+    port = 7090
+
+    # Unix socket to listen on instead of the host and port
+    # socket = "/run/siliqua/daemon.sock"
+
+    # Token clients must provide using the 'Authorization: Bearer <token>'
+    # header. Can also be provided using the DAEMON_TOKEN environment
+    # variable. If not provided, a random token is generated on startup,
+    # unless the daemon listens on a Unix socket. A token is required
+    # when listening on a non-loopback address.
+    # token = ""
+
 [work]
 precompute_work = true
 precompute_multiplier = 1.25
 
     [work.local]
-    # -1 = use half of physical CPU cores (default)
+    # -1 = use half of logical CPU cores (default)
     threads = -1
 
 [network]
@@ -64,14 +89,54 @@ precompute_multiplier = 1.25
     # 'nano_node' requires a NANO node with a version of 19 or higher
 
     # rpc_url is REQUIRED
+    # A list of URLs can also be provided, in which case requests are
+    # routed to the fastest node and failing nodes are skipped
     # rpc_url = "http://localhost:7076"
+    # rpc_url = ["http://localhost:7076", "http://192.168.1.2:7076"]
 
     # ws_url is optional, but allows new transactions to be received in
     # real-time
     # ws_url = "http://localhost:7078"
 
+    # Amount of WebSocket connections to split the wallet's accounts
+    # between. Each connection is subscribed to a fixed subset of accounts.
+    ws_connections = 1
+
+    # Maximum amount of concurrent requests to send to the node.
+    # Broadcasts are prioritized over polling account histories.
     concurrent_requests = 100
 
+    # Maximum amount of independent account chains to broadcast
+    # in parallel
+    broadcast_concurrency = 10
+
+    # If multiple RPC URLs are provided, send read requests that take
+    # longer than usual to a second node as well and use the response
+    # that arrives first
+    hedge_requests = false
+
+    # Interval in seconds to poll the network difficulty. The difficulty
+    # is only polled if it isn't received through the WebSocket connection.
+    difficulty_poll_interval = 10
+
+    # Large batches of blocks received from the node are verified
+    # in a process pool
+    # -1 = use half of logical CPU cores (default)
+    verify_processes = -1
+
+    # RPC URLs of nodes that are trusted to return valid blocks, such as
+    # your own node. Confirmed blocks returned by a trusted node are not
+    # fully verified, which makes syncing accounts with long histories
+    # faster. Instead, only a random sample of the blocks is verified.
+    # trusted_rpc_url = ["http://localhost:7076"]
+
+    # Ratio of confirmed blocks from trusted nodes to verify
+    trusted_verify_ratio = 0.01
+
+    # Stop retrieving account histories once this many retrieved blocks
+    # are waiting to be added into the wallet
+    processed_block_queue_capacity = 50000
+
     [network.nanovault]
     # 'nanovault' uses NanoVault.io-compatible servers and is
     # the easiest network plugin to set up.
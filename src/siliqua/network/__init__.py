@@ -1,23 +1,24 @@
-import copy
+import asyncio
 import time
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict, deque
 from enum import Enum
 from multiprocessing import Manager
-from queue import Empty, Queue
+from queue import Queue
 from threading import Lock
 
 from nanolib import WORK_DIFFICULTY
 from siliqua.exceptions import InsufficientConfiguration
 from siliqua.plugins import BasePlugin, get_network_plugins
-from siliqua.util import AccountIDDict, BlockProxy, normalize_account_id
+from siliqua.util import (AccountIDDict, BlockProxy, Callbacks,
+                          normalize_account_id)
 
 from siliqua import logger as root_logger  # isort:skip
 logger = root_logger.getChild("network")
 
 
 __all__ = (
-    "AccountSyncStatus", "ConnectionStatus", "BlockSyncResult",
-    "BlockSetQueue", "BaseNetworkPlugin"
+    "AccountSyncStatus", "AccountSyncStatusDict", "ConnectionStatus",
+    "BlockSyncResult", "BlockSetQueue", "BaseNetworkPlugin"
 )
 
 
@@ -65,6 +66,33 @@ class AccountSyncStatus:
         return time.time()
 
 
+class AccountSyncStatusDict(AccountIDDict):
+    """
+    Mapping of account IDs to :class:`AccountSyncStatus` instances.
+
+    The `account_added` and `account_removed` callbacks are invoked with
+    the account ID when accounts are added or removed, allowing network
+    processors to react to changes without comparing the entire account set.
+    """
+    def __init__(self, *args, **kwargs):
+        self.callbacks = Callbacks(["account_added", "account_removed"])
+
+        super().__init__(*args, **kwargs)
+
+    def __setitem__(self, key, val):
+        added = key not in self
+
+        super().__setitem__(key, val)
+
+        if added:
+            self.callbacks.account_added.invoke(normalize_account_id(key))
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+
+        self.callbacks.account_removed.invoke(normalize_account_id(key))
+
+
 class ConnectionStatus:
     """
     Connection status to the NANO network
@@ -80,6 +108,9 @@ class ConnectionStatus:
                               all accounts
     :ivar dict meta: Dictionary that can be used to hold arbitrary
                      connection-related information
+
+    The `round_completed` callback is invoked in the network thread
+    whenever a round of updates has been completed.
     """
     def __init__(self):
         self.connected = False
@@ -92,6 +123,8 @@ class ConnectionStatus:
 
         self.meta = {}
 
+        self.callbacks = Callbacks(["round_completed"])
+
     def update(self, connected):
         """
         Update the connection status.
@@ -124,6 +157,17 @@ class ConnectionStatus:
 
         self.error = error
 
+    def complete_round(self, sync_complete):
+        """
+        Mark a round of updates as completed
+
+        :param bool sync_complete: Whether all accounts are synced
+        """
+        self.sync_complete = sync_complete
+        self.completed_rounds += 1
+
+        self.callbacks.round_completed.invoke()
+
 
 class BlockProcessError(Enum):
     """
@@ -185,13 +229,42 @@ class BlockSyncResult(BlockProxy):
                     self.error = BlockProcessError("unknown")
 
         self.block = block
-        self.block.confirmed = confirmed
+
+        # Snapshots are immutable; the wallet updates its own block instead
+        if not isinstance(block, BlockSnapshot):
+            self.block.confirmed = confirmed
 
 
 class BlockSetQueue(Queue):
     """
-    FIFO queue that accepts Block instances
+    FIFO queue that accepts Block instances.
+
+    Blocks can be added and retrieved in batches using :meth:`put_many`
+    and :meth:`drain`, which only acquire the queue's lock once.
+
+    If `capacity` is provided, the producer can use
+    :meth:`wait_for_capacity` to wait until the consumer has caught up.
+    The capacity is a soft limit: :meth:`put` and :meth:`put_many`
+    never block, which means a single batch may exceed the capacity.
+
+    The `blocks_added` callback is invoked in the producer's thread
+    whenever blocks are added, allowing the consumer to process them
+    right away instead of polling the queue.
     """
+    def __init__(self, capacity=0):
+        """
+        :param int capacity: Amount of blocks the queue can hold before
+                             :meth:`wait_for_capacity` starts waiting.
+                             0 means the queue is unbounded.
+        """
+        super().__init__()
+        self.capacity = capacity
+
+        self.callbacks = Callbacks(["blocks_added"])
+
+        # (event loop, future) tuples for coroutines waiting for capacity
+        self.capacity_waiters = []
+
     def _init(self, maxsize=None):
         self.queue = OrderedDict()
 
@@ -201,7 +274,91 @@ class BlockSetQueue(Queue):
         self.queue[block_hash] = block
 
     def _get(self):
-        return self.queue.popitem(False)[1]
+        block = self.queue.popitem(False)[1]
+        self._notify_capacity()
+
+        return block
+
+    def _has_capacity(self):
+        return not self.capacity or len(self.queue) < self.capacity
+
+    def _notify_capacity(self):
+        # Wake up the coroutines waiting for capacity.
+        # This is called with the mutex held, possibly in another thread.
+        if not self.capacity_waiters or not self._has_capacity():
+            return
+
+        for loop, future in self.capacity_waiters:
+            try:
+                loop.call_soon_threadsafe(_set_future_done, future)
+            except RuntimeError:
+                # Event loop was already closed
+                pass
+
+        self.capacity_waiters = []
+
+    @property
+    def has_capacity(self):
+        """
+        Return True if the queue has room for more blocks
+        """
+        with self.mutex:
+            return self._has_capacity()
+
+    async def wait_for_capacity(self):
+        """
+        Wait until the queue has room for more blocks
+        """
+        loop = asyncio.get_event_loop()
+
+        while True:
+            with self.mutex:
+                if self._has_capacity():
+                    return
+
+                future = loop.create_future()
+                self.capacity_waiters.append((loop, future))
+
+            await future
+
+    def put(self, block, *args, **kwargs):
+        super().put(block, *args, **kwargs)
+        self.callbacks.blocks_added.invoke()
+
+    def put_many(self, blocks):
+        """
+        Add multiple blocks into the queue at once
+
+        :param blocks: Blocks to add
+        :type blocks: Iterable
+        """
+        with self.not_empty:
+            count = 0
+            for block in blocks:
+                self._put(block)
+                count += 1
+
+            if count:
+                self.unfinished_tasks += count
+                self.not_empty.notify(count)
+
+        if count:
+            self.callbacks.blocks_added.invoke()
+
+    def drain(self):
+        """
+        Remove and return every block in the queue at once
+
+        :returns: List of blocks in FIFO order
+        :rtype: list
+        """
+        with self.not_full:
+            blocks = list(self.queue.values())
+            self.queue.clear()
+            self.not_full.notify_all()
+            self._notify_capacity()
+
+        return blocks
 
     def remove(self, block):
         """
@@ -209,7 +366,80 @@ class BlockSetQueue(Queue):
 
         :returns: Returned block or None if no block was removed
         """
-        return self.queue.pop(block.block_hash, None)
+        with self.mutex:
+            removed_block = self.queue.pop(block.block_hash, None)
+            self._notify_capacity()
+
+        return removed_block
+
+    def remove_dependents(self, block_hashes):
+        """
+        Remove blocks that depend on any of the given blocks, either
+        directly or through other blocks in the queue. A block depends on
+        another block if it's the block's `previous` or `link` block.
+
+        :param block_hashes: Hashes of the blocks whose dependents
+                             will be removed
+        :type block_hashes: Iterable[str]
+
+        :returns: List of removed blocks
+        :rtype: list
+        """
+        removed_blocks = []
+
+        with self.mutex:
+            # Blocks in the queue aren't necessarily in dependency order,
+            # so map each block to the queued blocks depending on it
+            # and walk the map breadth-first
+            children = defaultdict(list)
+            for block_hash, block in self.queue.items():
+                for parent_hash in get_block_parent_hashes(block):
+                    children[parent_hash].append(block_hash)
+
+            pending_hashes = deque(block_hashes)
+
+            while pending_hashes:
+                parent_hash = pending_hashes.popleft()
+
+                for block_hash in children.pop(parent_hash, ()):
+                    block = self.queue.pop(block_hash, None)
+
+                    if block is None:
+                        # Already removed through another parent
+                        continue
+
+                    removed_blocks.append(block)
+                    pending_hashes.append(block_hash)
+
+            self._notify_capacity()
+
+        return removed_blocks
+
+
+def _set_future_done(future):
+    if not future.done():
+        future.set_result(None)
+
+
+def get_block_parent_hashes(block):
+    """
+    Get the hashes of the blocks the given block depends on
+
+    :param block: Block
+    :type block: siliqua.wallet.accounts.Block
+
+    :returns: Set of block hashes
+    :rtype: set
+    """
+    parent_hashes = set()
+
+    if block.previous:
+        parent_hashes.add(block.previous)
+
+    if block.link_block:
+        parent_hashes.add(block.link_block.block_hash)
+
+    return parent_hashes
 
 
 class BaseNetworkPlugin(BasePlugin):
@@ -239,17 +469,32 @@ class BaseNetworkPlugin(BasePlugin):
     """
     PLUGIN_TYPE = "network"
 
+    # Network plugins should stop retrieving account histories once there
+    # are this many processed blocks waiting for the wallet,
+    # unless configured otherwise
+    PROCESSED_BLOCK_QUEUE_CAPACITY = 50000
+
     def __init__(self, **kwargs):
         super(BaseNetworkPlugin, self).__init__(**kwargs)
 
-        self.processed_block_queue = BlockSetQueue()
+        self.processed_block_queue = BlockSetQueue(
+            capacity=int(self.config.get(
+                "network.{}.processed_block_queue_capacity".format(
+                    self.PLUGIN_NAME
+                ),
+                self.PROCESSED_BLOCK_QUEUE_CAPACITY
+            ))
+        )
         self.pocketable_block_queue = BlockSetQueue()
         self.broadcast_block_queue = BlockSetQueue()
         self.broadcast_queue_lock = Lock()
 
+        # Snapshots of the blocks last added to the broadcast queue
+        self.broadcast_snapshots = {}
+
         self.connection_status = ConnectionStatus()
 
-        self.account_sync_statuses = AccountIDDict()
+        self.account_sync_statuses = AccountSyncStatusDict()
 
         self.manager = None
 
@@ -328,15 +573,7 @@ class BaseNetworkPlugin(BasePlugin):
         """
         Get all the values in a queue
         """
-        items = []
-
-        while True:
-            try:
-                items.append(queue.get_nowait())
-            except Empty:
-                break
-
-        return items
+        return queue.drain()
 
     def wait_for_connection(self, timeout=5):
         """
@@ -382,14 +619,31 @@ class BaseNetworkPlugin(BasePlugin):
     def add_blocks_to_broadcast(self, blocks):
         """
         Add blocks into the broadcast queue to be eventually broadcast
-        into the network
+        into the network.
+
+        Blocks are handed over as :class:`siliqua.wallet.accounts.BlockSnapshot`
+        instances. Snapshots are reused for blocks that haven't changed
+        since the last call.
 
         :param blocks: List of blocks to broadcast
         :type blocks: List[siliqua.wallet.accounts.Block]
         """
+        snapshots = OrderedDict()
+
+        for block in blocks:
+            block_hash = block.block_hash
+            snapshot = self.broadcast_snapshots.get(block_hash, None)
+
+            if not snapshot or not snapshot.is_current(block):
+                snapshot = BlockSnapshot(block)
+
+            snapshots[block_hash] = snapshot
+
+        # Only keep snapshots for blocks that are still being broadcast
+        self.broadcast_snapshots = snapshots
+
         with self.broadcast_queue_lock:
-            for block in blocks:
-                self.broadcast_block_queue.put(copy.deepcopy(block))
+            self.broadcast_block_queue.put_many(snapshots.values())
 
         return True
 
@@ -420,6 +674,10 @@ class BaseNetworkPlugin(BasePlugin):
                 del self.account_sync_statuses[account_id]
 
 
+# Wallet imports this module, so import the wallet's block classes only
+# after the network classes have been defined
+from siliqua.wallet.accounts import BlockSnapshot  # isort:skip
+
 # TODO: We could scan the directories for built-in GUI plugins, but for now
 # just import them directly
 from .nano_node import *  # isort:skip
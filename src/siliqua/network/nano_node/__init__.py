@@ -10,8 +10,11 @@ import click
 
 from siliqua.exceptions import ConfigurationError
 from siliqua.network import BaseNetworkPlugin
+from siliqua.network.nano_node.pool import get_rpc_urls
 from siliqua.network.nano_node.rpc import RPCProcessor
-from siliqua.network.nano_node.ws import WebSocketProcessor
+from siliqua.network.nano_node.verifier import BlockVerifier
+from siliqua.network.nano_node.ws import (WebSocketProcessor,
+                                          get_account_shard)
 
 
 async def run_rpc_processor(network_plugin):
@@ -22,12 +25,24 @@ async def run_rpc_processor(network_plugin):
     network_plugin.rpc_processor = None
 
 
-async def run_websocket_processor(network_plugin):
-    logger.info("Starting WebSocket network task...")
+async def run_websocket_processors(network_plugin):
+    shard_count = network_plugin.websocket_shard_count
 
-    network_plugin.websocket_processor = WebSocketProcessor(network_plugin)
-    await network_plugin.websocket_processor.loop()
-    network_plugin.websocket_processor = None
+    logger.info(
+        "Starting %d WebSocket network task(s)...", shard_count
+    )
+
+    network_plugin.websocket_processors = [
+        WebSocketProcessor(
+            network_plugin, shard_index=shard_index, shard_count=shard_count
+        )
+        for shard_index in range(0, shard_count)
+    ]
+    await asyncio.gather(*[
+        websocket_processor.loop()
+        for websocket_processor in network_plugin.websocket_processors
+    ])
+    network_plugin.websocket_processors = []
 
 
 def run_network_thread(network_plugin):
@@ -44,11 +59,22 @@ def run_network_thread(network_plugin):
 
     if network_plugin.config.get("network.nano_node.ws_url", None):
         # WebSocket is optional
-        tasks.append(run_websocket_processor(network_plugin))
+        tasks.append(run_websocket_processors(network_plugin))
     else:
         logger.info("WebSocket URL not provided, using HTTP polling instead.")
 
-    loop.run_until_complete(asyncio.gather(*tasks))
+    # Large batches of blocks are verified in a process pool to avoid
+    # blocking the event loop
+    network_plugin.block_verifier = BlockVerifier(
+        processes=int(network_plugin.config.get(
+            "network.nano_node.verify_processes", -1
+        ))
+    )
+
+    try:
+        loop.run_until_complete(asyncio.gather(*tasks))
+    finally:
+        network_plugin.block_verifier.shutdown()
 
 
 class NetworkPlugin(BaseNetworkPlugin):
@@ -61,7 +87,26 @@ class NetworkPlugin(BaseNetworkPlugin):
         self.shutdown_flag = None
 
         self.rpc_processor = None
-        self.websocket_processor = None
+
+        # Accounts are split between one or more WebSocket connections,
+        # each handled by its own processor
+        self.websocket_processors = []
+
+        # Request scheduler shared by the RPC and WebSocket processors.
+        # This is created when the network thread is started.
+        self.request_scheduler = None
+
+        # Link block cache shared by the RPC and WebSocket processors
+        self.link_block_cache = None
+
+        # Difficulty tracker shared by the RPC and WebSocket processors
+        self.difficulty_tracker = None
+
+        # Pool of RPC nodes shared by the RPC and WebSocket processors
+        self.node_pool = None
+
+        # Block verifier shared by the RPC and WebSocket processors
+        self.block_verifier = None
 
         # Account IDs to poll. This is only used when a WebSocket connection
         # missed the successing block, requiring the account history to be
@@ -72,6 +117,33 @@ class NetworkPlugin(BaseNetworkPlugin):
     def started(self):
         return self.thread and self.thread.is_alive()
 
+    @property
+    def websocket_shard_count(self):
+        """
+        Amount of WebSocket connections to split the accounts between
+        """
+        return int(self.config.get(
+            "network.{}.ws_connections".format(self.PLUGIN_NAME), 1
+        ))
+
+    def get_websocket_processor(self, account_id):
+        """
+        Get the WebSocket processor that is subscribed to the given account
+
+        :param str account_id: Account ID
+        :returns: WebSocket processor or None if WebSocket connections
+                  are not in use
+        :rtype: siliqua.network.nano_node.ws.WebSocketProcessor or None
+        """
+        websocket_processors = self.websocket_processors
+
+        if not websocket_processors:
+            return None
+
+        return websocket_processors[
+            get_account_shard(account_id, len(websocket_processors))
+        ]
+
     def _get_cli_params(self):
         return [
             click.Option(
@@ -91,21 +163,47 @@ class NetworkPlugin(BaseNetworkPlugin):
     def validate_config(self):
         plugin_name = self.PLUGIN_NAME
 
-        rpc_url = self.config.get(
+        rpc_urls = get_rpc_urls(self.config.get(
             "network.{}.rpc_url".format(plugin_name), None
-        )
-        if not rpc_url:
+        ))
+        if not rpc_urls:
             raise ConfigurationError(
                 "network.{}.rpc_url".format(plugin_name),
                 "Parameter is required"
             )
 
+        for rpc_url in rpc_urls:
+            try:
+                urlparse(rpc_url)
+            except ValueError:
+                raise ConfigurationError(
+                    "network.{}.rpc_url".format(plugin_name),
+                    "Provided URL is invalid"
+                )
+
+        trusted_rpc_urls = get_rpc_urls(self.config.get(
+            "network.{}.trusted_rpc_url".format(plugin_name), None
+        ))
+        for trusted_rpc_url in trusted_rpc_urls:
+            if trusted_rpc_url not in rpc_urls:
+                raise ConfigurationError(
+                    "network.{}.trusted_rpc_url".format(plugin_name),
+                    "URL {} is not one of the RPC URLs".format(
+                        trusted_rpc_url
+                    )
+                )
+
         try:
-            urlparse(rpc_url)
+            trusted_verify_ratio = float(self.config.get(
+                "network.{}.trusted_verify_ratio".format(plugin_name), 0
+            ))
         except ValueError:
+            trusted_verify_ratio = -1
+
+        if not 0 <= trusted_verify_ratio <= 1:
             raise ConfigurationError(
-                "network.{}.rpc_url".format(plugin_name),
-                "Provided URL is invalid"
+                "network.{}.trusted_verify_ratio".format(plugin_name),
+                "Value must be between 0 and 1"
             )
 
         ws_url = self.config.get(
@@ -120,6 +218,17 @@ class NetworkPlugin(BaseNetworkPlugin):
                     "Provided URL is invalid"
                 )
 
+        try:
+            shard_count = self.websocket_shard_count
+        except ValueError:
+            shard_count = 0
+
+        if shard_count < 1:
+            raise ConfigurationError(
+                "network.{}.ws_connections".format(plugin_name),
+                "Value must be a positive integer"
+            )
+
     def _stop(self):
         self.shutdown_flag.set()
         self.thread.join()
@@ -130,7 +239,12 @@ class NetworkPlugin(BaseNetworkPlugin):
         self.shutdown_flag = None
 
         self.rpc_processor = None
-        self.websocket_processor = None
+        self.websocket_processors = []
+        self.request_scheduler = None
+        self.link_block_cache = None
+        self.difficulty_tracker = None
+        self.node_pool = None
+        self.block_verifier = None
 
     def _start(self):
         self.shutdown_flag = Event()
@@ -1,4 +1,7 @@
 import asyncio
+import math
+import random
+import time
 import traceback
 
 import aiohttp
@@ -8,6 +11,12 @@ from nanolib.exceptions import InvalidBlock, InvalidSignature
 from nanolib.util import dec_to_hex
 from nanolib.work import validate_difficulty
 from siliqua.network import BlockSyncResult
+from siliqua.network.nano_node.cache import LinkBlockCache
+from siliqua.network.nano_node.difficulty import DifficultyTracker
+from siliqua.network.nano_node.pool import (IDEMPOTENT_ACTIONS, NodePool,
+                                            get_rpc_urls)
+from siliqua.network.nano_node.scheduler import (RequestScheduler,
+                                                 get_request_priority)
 from siliqua.util import RawBlock
 from siliqua.wallet.accounts import (Block, LinkBlock, Timestamp,
                                      TimestampSource)
@@ -24,6 +33,26 @@ async def do_json_post(url, params, session):
     return result
 
 
+class RPCResponse(dict):
+    """
+    JSON response from a node, including the node endpoint that
+    returned it
+    """
+    def __init__(self, data, endpoint=None):
+        super().__init__(data)
+        self.endpoint = endpoint
+
+
+class HistoryPage(list):
+    """
+    Page of account history entries, including the node endpoint that
+    returned it
+    """
+    def __init__(self, entries=(), endpoint=None):
+        super().__init__(entries)
+        self.endpoint = endpoint
+
+
 EXTRA_FIELDS = ("hash", "height", "opened")
 
 BLOCK_PARAMS = (
@@ -31,10 +60,10 @@ BLOCK_PARAMS = (
     "balance", "source", "link", "link_as_account", "signature", "work"
 )
 
-def get_raw_block_from_json(block_data):
+def get_raw_block_from_json(block_data, verify=True):
     if "contents" in block_data:
         # 'blocks_info' includes a JSON string
-        return RawBlock.from_json(block_data["contents"])
+        return RawBlock.from_json(block_data["contents"], verify=verify)
 
     # 'account_history' uses a JSON array with some extra fields
     raw_block_data = {
@@ -50,18 +79,24 @@ def get_raw_block_from_json(block_data):
             int(raw_block_data["balance"]), 16
         )
 
-    return RawBlock.from_dict(raw_block_data)
+    return RawBlock.from_dict(raw_block_data, verify=verify)
 
 
-def get_block_from_json(block_data):
+def get_block_from_json(block_data, verify=True, raw_block=None):
     """
     Deserialize block data received from a node's JSON response to a
     Block instance.
 
     JSON response may include extra data such as a timestamp, so include
     those as well
+
+    :param dict block_data: Block data received from the node
+    :param bool verify: Whether to verify the block's signature and PoW
+    :param raw_block: Block already decoded from `block_data`
+                      using :class:`BlockVerifier`, if any
     """
-    raw_block = get_raw_block_from_json(block_data)
+    if not raw_block:
+        raw_block = get_raw_block_from_json(block_data, verify=verify)
 
     local_timestamp = None
     if "local_timestamp" in block_data and block_data["local_timestamp"]:
@@ -90,12 +125,25 @@ def get_link_block_hash(block, subtype):
     return None
 
 
-def get_link_block_from_json(block_data):
+def is_send_block(block, subtype):
+    return (
+        block.block_type == "send"
+        or (block.block_type == "state" and subtype == "send")
+    )
+
+
+def get_link_block_from_json(block_data, verify=True, raw_block=None):
     """
     Deserialize block data received from a node's JSON response to a
     LinkBlock instance.
+
+    :param dict block_data: Block data received from the node
+    :param bool verify: Whether to verify the block's signature and PoW
+    :param raw_block: Block already decoded from `block_data`
+                      using :class:`BlockVerifier`, if any
     """
-    raw_block = RawBlock.from_json(block_data["contents"])
+    if not raw_block:
+        raw_block = RawBlock.from_json(block_data["contents"], verify=verify)
 
     local_timestamp = None
     if "local_timestamp" in block_data and block_data["local_timestamp"]:
@@ -128,6 +176,32 @@ class NetworkProcessorBase:
     # Wait 10 seconds for a request to complete at most
     NETWORK_TIMEOUT_SECONDS = 10
 
+    # Send at most 100 concurrent requests to the node unless
+    # configured otherwise
+    DEFAULT_CONCURRENT_REQUESTS = 100
+
+    # Keep at most 10000 link blocks in the cache
+    LINK_BLOCK_CACHE_SIZE = 10000
+
+    # Wait 5 ms for other link block lookups before sending a request,
+    # allowing them to be retrieved in a single batch
+    LINK_BLOCK_COALESCE_SECONDS = 0.005
+
+    # Poll the active difficulty every 10 seconds unless configured
+    # otherwise or received through the WebSocket connection
+    DEFAULT_DIFFICULTY_POLL_INTERVAL_SECONDS = 10
+
+    # If hedging is enabled and a read request to the node takes more than
+    # twice its average latency, send the same request to another node.
+    # Wait for 500 ms if the node's latency isn't known yet.
+    HEDGE_LATENCY_MULTIPLIER = 2
+    MIN_HEDGE_DELAY_SECONDS = 0.05
+    DEFAULT_HEDGE_DELAY_SECONDS = 0.5
+
+    # Verify 1% of the confirmed blocks returned by trusted nodes
+    # unless configured otherwise
+    DEFAULT_TRUSTED_VERIFY_RATIO = 0.01
+
     def __init__(self, network_plugin):
         self.network_plugin = network_plugin
 
@@ -149,12 +223,88 @@ class NetworkProcessorBase:
             self.config.get("wallet.minimum_pocketable_amount")
 
         # RPC URL is also required by WebSocket task to retrieve link blocks
-        # which are not part of the WS messages
-        self.rpc_url = self.config.get(
+        # which are not part of the WS messages.
+        #
+        # Multiple RPC URLs can be provided, in which case requests
+        # are routed to the healthiest node. The first URL is used to refer
+        # to the pool of nodes.
+        rpc_urls = get_rpc_urls(self.config.get(
             "network.{}.rpc_url".format(self.network_plugin.PLUGIN_NAME)
-        )
+        ))
+        self.rpc_url = rpc_urls[0]
         self.session = None
 
+        # Node pool is shared between the processors, so that both
+        # use the same statistics
+        if not network_plugin.node_pool:
+            network_plugin.node_pool = NodePool(
+                rpc_urls,
+                trusted_urls=get_rpc_urls(self.config.get(
+                    "network.{}.trusted_rpc_url".format(
+                        self.network_plugin.PLUGIN_NAME
+                    ),
+                    None
+                ))
+            )
+
+        self.node_pool = network_plugin.node_pool
+
+        self.hedge_requests = bool(self.config.get(
+            "network.{}.hedge_requests".format(
+                self.network_plugin.PLUGIN_NAME
+            ),
+            False
+        ))
+
+        # Request scheduler is shared between the RPC and WebSocket
+        # processors
+        if not network_plugin.request_scheduler:
+            network_plugin.request_scheduler = RequestScheduler(
+                max_concurrency=int(self.config.get(
+                    "network.{}.concurrent_requests".format(
+                        self.network_plugin.PLUGIN_NAME
+                    ),
+                    self.DEFAULT_CONCURRENT_REQUESTS
+                ))
+            )
+
+        self.request_scheduler = network_plugin.request_scheduler
+
+        # Link block cache is also shared between the processors, since
+        # the same link block is often requested by both
+        if not network_plugin.link_block_cache:
+            network_plugin.link_block_cache = LinkBlockCache(
+                maxsize=self.LINK_BLOCK_CACHE_SIZE,
+                coalesce_seconds=self.LINK_BLOCK_COALESCE_SECONDS
+            )
+
+        self.link_block_cache = network_plugin.link_block_cache
+
+        # Difficulty tracker is updated by both processors
+        if not network_plugin.difficulty_tracker:
+            network_plugin.difficulty_tracker = DifficultyTracker(
+                network_plugin=network_plugin,
+                poll_interval=float(self.config.get(
+                    "network.{}.difficulty_poll_interval".format(
+                        self.network_plugin.PLUGIN_NAME
+                    ),
+                    self.DEFAULT_DIFFICULTY_POLL_INTERVAL_SECONDS
+                ))
+            )
+
+        self.difficulty_tracker = network_plugin.difficulty_tracker
+
+        self.trusted_verify_ratio = float(self.config.get(
+            "network.{}.trusted_verify_ratio".format(
+                self.network_plugin.PLUGIN_NAME
+            ),
+            self.DEFAULT_TRUSTED_VERIFY_RATIO
+        ))
+
+        # Block verifier is created when the network thread is started,
+        # since it owns a process pool that has to be shut down afterwards
+        self.block_verifier = network_plugin.block_verifier
+
     # Use an anonymous function to always keep a correct reference
     # to the underlying primitive
     work_difficulty = property(
@@ -165,29 +315,260 @@ class NetworkProcessorBase:
     )
 
     async def do_json_post(self, url, params):
+        """
+        Send a JSON RPC request to the node
+
+        :param str url: Node URL. If this is the configured RPC URL,
+                        the request is routed to the healthiest node in
+                        the node pool.
+        :param dict params: Request parameters
+
+        :returns: JSON response
+        :rtype: RPCResponse
+        """
+        await self.request_scheduler.acquire(
+            priority=get_request_priority(params),
+            key=params.get("account", None)
+        )
+
         try:
-            response = await do_json_post(
-                url=url, params=params, session=self.session
-            )
+            if url == self.rpc_url:
+                response = await self.do_pool_request(params)
+            else:
+                response = RPCResponse(
+                    await do_json_post(
+                        url=url, params=params, session=self.session
+                    )
+                )
+
             self.connection_status.update(True)
             return response
         except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
             self.connection_status.update(False)
-            try:
-                message = str(exc.message)
-            except AttributeError:
-                message = None
-            import traceback
             logger.error(
                 "HTTP POST to node %s, %s failed. Error %s",
-                self.rpc_url, str(params), traceback.format_exc()
+                url, str(params), traceback.format_exc()
             )
             raise exc
+        finally:
+            self.request_scheduler.release()
+
+    async def do_pool_request(self, params):
+        """
+        Send a JSON RPC request to the healthiest node in the node pool.
+        If the request fails, it is retried using the other nodes.
+
+        :param dict params: Request parameters
+
+        :returns: JSON response
+        :rtype: RPCResponse
+        """
+        hedge = (
+            self.hedge_requests
+            and params.get("action") in IDEMPOTENT_ACTIONS
+            and len(self.node_pool) > 1
+        )
+        tried_endpoints = []
+
+        while True:
+            endpoint = self.node_pool.select(exclude=tried_endpoints)
+            tried_endpoints.append(endpoint)
+
+            try:
+                if hedge:
+                    return await self.do_hedged_request(
+                        endpoint, params, tried_endpoints
+                    )
+
+                return await self.do_endpoint_request(endpoint, params)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if len(tried_endpoints) >= len(self.node_pool):
+                    raise
+
+                logger.warning(
+                    "HTTP POST to node %s failed, retrying using "
+                    "another node", endpoint.url
+                )
+
+    async def do_hedged_request(self, endpoint, params, tried_endpoints):
+        """
+        Send a JSON RPC request to the given endpoint. If the request
+        takes too long, send the same request to another endpoint and
+        use whichever response arrives first.
+
+        :param endpoint: Endpoint to send the request to
+        :type endpoint: siliqua.network.nano_node.pool.NodeEndpoint
+        :param dict params: Request parameters
+        :param list tried_endpoints: Endpoints that have already been tried.
+                                     The hedged endpoint is added to
+                                     the list.
+
+        :returns: JSON response
+        :rtype: RPCResponse
+        """
+        if endpoint.latency is None:
+            hedge_delay = self.DEFAULT_HEDGE_DELAY_SECONDS
+        else:
+            hedge_delay = max(
+                endpoint.latency * self.HEDGE_LATENCY_MULTIPLIER,
+                self.MIN_HEDGE_DELAY_SECONDS
+            )
+
+        tasks = [
+            asyncio.ensure_future(
+                self.do_endpoint_request(endpoint, params)
+            )
+        ]
+
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+
+            if not done:
+                hedge_endpoint = self.node_pool.select(
+                    exclude=tried_endpoints
+                )
+
+                if hedge_endpoint:
+                    tried_endpoints.append(hedge_endpoint)
+                    tasks.append(
+                        asyncio.ensure_future(
+                            self.do_endpoint_request(hedge_endpoint, params)
+                        )
+                    )
+
+            pending = tasks
+            error = None
+
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    if task.exception():
+                        error = task.exception()
+                        continue
+
+                    return task.result()
+
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def do_endpoint_request(self, endpoint, params):
+        """
+        Send a JSON RPC request to the given endpoint and update the
+        endpoint's statistics
+
+        :param endpoint: Endpoint to send the request to
+        :type endpoint: siliqua.network.nano_node.pool.NodeEndpoint
+        :param dict params: Request parameters
+
+        :returns: JSON response
+        :rtype: RPCResponse
+        """
+        endpoint.active += 1
+        start = time.time()
+
+        try:
+            result = await do_json_post(
+                url=endpoint.url, params=params, session=self.session
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.node_pool.record_failure(endpoint)
+            raise
+        finally:
+            endpoint.active -= 1
+
+        self.node_pool.record_success(endpoint, time.time() - start)
+
+        return RPCResponse(result, endpoint=endpoint)
+
+    def get_verify_mask(self, block_count, endpoint=None, confirmed=False):
+        """
+        Decide which blocks received from the node need to be verified.
+
+        If the blocks are confirmed and were returned by a trusted node,
+        only a random sample of the blocks is verified.
+
+        :param int block_count: Amount of blocks
+        :param endpoint: Node endpoint that returned the blocks, if known
+        :type endpoint: siliqua.network.nano_node.pool.NodeEndpoint
+        :param bool confirmed: Whether all the blocks are known to be
+                               confirmed account blocks. Link blocks and
+                               blocks with an unknown confirmation status
+                               are always fully verified.
+        :returns: List of booleans, True for each block to verify
+        :rtype: list
+        """
+        if not (confirmed and endpoint and endpoint.trusted):
+            return [True] * block_count
+
+        sample_size = min(
+            math.ceil(block_count * self.trusted_verify_ratio), block_count
+        )
+        sample = set(random.sample(range(block_count), sample_size))
+
+        return [i in sample for i in range(block_count)]
+
+    async def parse_blocks(
+            self, blocks_data, endpoint=None, confirmed=False, verify=None):
+        """
+        Decode and verify blocks received from the node.
+
+        If the blocks are confirmed and were returned by a trusted node,
+        only a random sample of the blocks is verified.
+
+        :param list blocks_data: List of block data received from the node
+        :param endpoint: Node endpoint that returned the blocks, if known
+        :type endpoint: siliqua.network.nano_node.pool.NodeEndpoint
+        :param bool confirmed: Whether all the blocks are known to be
+                               confirmed account blocks. Link blocks and
+                               blocks with an unknown confirmation status
+                               are always fully verified.
+        :param list verify: Blocks to verify as returned by
+                            :meth:`get_verify_mask`. If not provided,
+                            it's decided using `endpoint` and `confirmed`.
+        :raises nanolib.exceptions.InvalidBlock: If a block is invalid
+        :raises nanolib.exceptions.InvalidSignature: If a block has an invalid
+                                                     signature
+        :returns: List of decoded blocks in the same order
+        :rtype: list
+        """
+        if verify is None:
+            verify = self.get_verify_mask(
+                len(blocks_data), endpoint=endpoint, confirmed=confirmed
+            )
+
+        return await self.block_verifier.parse(blocks_data, verify=verify)
 
     async def get_link_blocks(self, block_hashes):
+        """
+        Get link blocks for the given block hashes. Link blocks are
+        retrieved from the cache if possible, and the rest are retrieved
+        from the node in batches.
+
+        :param list block_hashes: List of block hashes
+        :returns: List of link blocks in the same order as the block hashes
+        :rtype: list
+        """
         if not block_hashes:
             return []
 
+        return await self.link_block_cache.get_link_blocks(
+            block_hashes, fetch=self.fetch_link_blocks
+        )
+
+    async def fetch_link_blocks(self, block_hashes):
+        """
+        Retrieve link blocks from the node
+
+        :param list block_hashes: List of block hashes
+        :returns: Dict of block hashes and link blocks. Blocks that the node
+                  couldn't find are omitted.
+        :rtype: dict
+        """
         response = await self.do_json_post(
             self.rpc_url,
             params={
@@ -196,11 +577,28 @@ class NetworkProcessorBase:
             }
         )
 
-        # We don't need to preserve the order of the blocks here, so
-        # iterate them directly from the dict
-        link_blocks = [
-            get_link_block_from_json(block)
-            for block in response["blocks"].values()
-        ]
+        if "blocks" not in response:
+            if len(block_hashes) == 1:
+                return {}
+
+            # The node returns an error if any of the blocks is missing.
+            # Since the batch may contain lookups from different callers,
+            # retrieve the blocks separately so that one missing block
+            # doesn't fail the rest.
+            link_blocks = {}
+            for block_hash in block_hashes:
+                link_blocks.update(
+                    await self.fetch_link_blocks([block_hash])
+                )
+
+            return link_blocks
+
+        blocks = list(response["blocks"].items())
+        raw_blocks = await self.parse_blocks(
+            [block for _, block in blocks], endpoint=response.endpoint
+        )
 
-        return link_blocks
+        return {
+            block_hash: get_link_block_from_json(block, raw_block=raw_block)
+            for (block_hash, block), raw_block in zip(blocks, raw_blocks)
+        }
@@ -0,0 +1,173 @@
+import asyncio
+from collections import OrderedDict
+
+from siliqua.wallet.accounts import LinkBlock
+
+
+def copy_link_block(link_block):
+    """
+    Create a copy of a link block, so that the caller can't modify
+    the cached instance
+
+    :param link_block: Link block to copy
+    :type link_block: siliqua.wallet.accounts.LinkBlock
+    :rtype: siliqua.wallet.accounts.LinkBlock
+    """
+    return LinkBlock.from_dict(link_block.to_dict())
+
+
+class LinkBlockCache:
+    """
+    Bounded LRU cache of link blocks keyed by block hash.
+
+    Link blocks that aren't cached are retrieved from the node using the
+    provided fetch function. Lookups made within `coalesce_seconds` of
+    each other are merged into a single batch, and concurrent lookups for
+    the same block share the same request.
+    """
+    def __init__(self, maxsize, coalesce_seconds):
+        """
+        :param int maxsize: Maximum amount of link blocks to cache
+        :param float coalesce_seconds: Time in seconds to wait for other
+                                       lookups before retrieving the
+                                       link blocks
+        """
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+
+        self.maxsize = maxsize
+        self.coalesce_seconds = coalesce_seconds
+
+        self.link_blocks = OrderedDict()
+
+        # Block hash -> future for lookups that are queued or in progress
+        self.pending = {}
+        self.queued_block_hashes = []
+        self.flush_handle = None
+
+    def __len__(self):
+        return len(self.link_blocks)
+
+    def get(self, block_hash):
+        """
+        Get a copy of a cached link block
+
+        :param str block_hash: Block hash
+        :returns: Link block or None if the link block isn't cached
+        :rtype: siliqua.wallet.accounts.LinkBlock or None
+        """
+        try:
+            link_block = self.link_blocks[block_hash]
+        except KeyError:
+            return None
+
+        self.link_blocks.move_to_end(block_hash)
+        return copy_link_block(link_block)
+
+    def add(self, link_block):
+        """
+        Add a link block into the cache, evicting the least recently used
+        link block if the cache is full
+
+        :param link_block: Link block to add
+        :type link_block: siliqua.wallet.accounts.LinkBlock
+        """
+        block_hash = link_block.block_hash
+
+        self.link_blocks[block_hash] = copy_link_block(link_block)
+        self.link_blocks.move_to_end(block_hash)
+
+        while len(self.link_blocks) > self.maxsize:
+            self.link_blocks.popitem(last=False)
+
+    async def get_link_blocks(self, block_hashes, fetch):
+        """
+        Get link blocks, retrieving the ones that aren't cached
+
+        :param list block_hashes: List of block hashes
+        :param fetch: Coroutine function that receives a list of block
+                      hashes and returns a dict of block hashes and
+                      link blocks
+        :raises KeyError: If the node didn't return a link block
+
+        :returns: List of link blocks in the same order as the block hashes
+        :rtype: list
+        """
+        loop = asyncio.get_event_loop()
+
+        link_blocks = OrderedDict()
+        futures = []
+
+        for block_hash in block_hashes:
+            if block_hash in link_blocks:
+                continue
+
+            link_block = self.get(block_hash)
+            if link_block:
+                link_blocks[block_hash] = link_block
+                continue
+
+            link_blocks[block_hash] = None
+
+            try:
+                future = self.pending[block_hash]
+            except KeyError:
+                future = loop.create_future()
+                self.pending[block_hash] = future
+                self.queued_block_hashes.append(block_hash)
+
+            futures.append((block_hash, future))
+
+        if self.queued_block_hashes and not self.flush_handle:
+            self.flush_handle = loop.call_later(
+                self.coalesce_seconds, self._flush, fetch
+            )
+
+        for block_hash, future in futures:
+            # Shield the shared future so that cancelling one lookup doesn't
+            # cancel it for the others
+            link_block = await asyncio.shield(future)
+            link_blocks[block_hash] = copy_link_block(link_block)
+
+        return list(link_blocks.values())
+
+    def _flush(self, fetch):
+        block_hashes = self.queued_block_hashes
+
+        self.queued_block_hashes = []
+        self.flush_handle = None
+
+        asyncio.ensure_future(self._fetch(block_hashes, fetch))
+
+    async def _fetch(self, block_hashes, fetch):
+        try:
+            link_blocks = await fetch(block_hashes)
+        except asyncio.CancelledError:
+            for block_hash in block_hashes:
+                self.pending.pop(block_hash).cancel()
+            raise
+        except Exception as exc:
+            for block_hash in block_hashes:
+                future = self.pending.pop(block_hash)
+                if not future.done():
+                    future.set_exception(exc)
+                    # Don't warn about the exception if every lookup
+                    # waiting for this block was cancelled
+                    future.exception()
+            return
+
+        for block_hash in block_hashes:
+            future = self.pending.pop(block_hash)
+
+            try:
+                link_block = link_blocks[block_hash]
+            except KeyError:
+                if not future.done():
+                    future.set_exception(KeyError(block_hash))
+                    future.exception()
+                continue
+
+            self.add(link_block)
+
+            if not future.done():
+                future.set_result(link_block)
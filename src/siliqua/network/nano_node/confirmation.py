@@ -0,0 +1,308 @@
+import asyncio
+import time
+import traceback
+from collections import OrderedDict
+
+import aiohttp
+
+from siliqua.network import BlockSyncResult
+
+from . import logger
+
+
+class PendingConfirmation:
+    """
+    Broadcast block that is waiting for confirmation
+    """
+    __slots__ = ("block", "future", "start")
+
+    def __init__(self, block, future):
+        self.block = block
+        self.future = future
+        self.start = time.time()
+
+
+class ConfirmationTracker:
+    """
+    Tracker that keeps the set of broadcast blocks awaiting confirmation.
+
+    Instead of polling every block separately, the confirmation status
+    of all outstanding blocks is checked with a single 'blocks_info' request
+    on each tick.
+
+    If a WebSocket connection is active and subscribed to the block's
+    account, the block is confirmed as soon as the confirmation message
+    arrives and the RPC is only polled occasionally as a fallback.
+    Newly registered blocks are always polled on the next tick, in case
+    the confirmation arrived before the block was registered.
+    """
+    # How long confirmations received through the WebSocket connection for
+    # blocks that aren't being waited for are remembered, in case
+    # the block is registered shortly afterwards
+    RECENT_CONFIRMATION_SECONDS = 60
+
+    def __init__(self, rpc_processor):
+        """
+        :param rpc_processor: RPC processor used to poll the confirmation
+                              status
+        :type rpc_processor: siliqua.network.nano_node.rpc.RPCProcessor
+        """
+        self.rpc_processor = rpc_processor
+
+        self.pending_confirmations = {}
+        self.poll_task = None
+
+        # Blocks registered since the last tick
+        self.new_block_hashes = set()
+
+        # Block hash -> timestamp for confirmations received before
+        # the block was registered
+        self.recent_confirmations = OrderedDict()
+
+    async def wait_for_confirmation(self, block):
+        """
+        Wait until the broadcast block is confirmed, disappears from the
+        node or the wait times out
+
+        :param block: Block that has been broadcast
+        :type block: siliqua.wallet.accounts.Block
+
+        :returns: BlockSyncResult for the block, or None if the network
+                  plugin is shutting down
+        :rtype: siliqua.network.BlockSyncResult or None
+        """
+        block_hash = block.block_hash
+
+        self.prune_recent_confirmations()
+
+        if self.recent_confirmations.pop(block_hash, None):
+            # Confirmation arrived before the block was registered
+            return BlockSyncResult(block=block, confirmed=True)
+
+        try:
+            pending_confirmation = self.pending_confirmations[block_hash]
+        except KeyError:
+            pending_confirmation = PendingConfirmation(
+                block=block,
+                future=asyncio.get_event_loop().create_future()
+            )
+            self.pending_confirmations[block_hash] = pending_confirmation
+            self.new_block_hashes.add(block_hash)
+
+        if not self.poll_task or self.poll_task.done():
+            self.poll_task = asyncio.ensure_future(self.poll())
+
+        return await pending_confirmation.future
+
+    def confirm(self, block_hash):
+        """
+        Resolve a pending block as confirmed. This is called when the
+        confirmation is received through the WebSocket connection.
+
+        :param str block_hash: Block hash
+
+        :returns: True if the block was waiting for confirmation,
+                  False otherwise
+        :rtype: bool
+        """
+        try:
+            pending_confirmation = self.pending_confirmations[block_hash]
+        except KeyError:
+            # Remember the confirmation in case the block is registered
+            # shortly afterwards
+            self.prune_recent_confirmations()
+            self.recent_confirmations[block_hash] = time.time()
+            return False
+
+        self.resolve(
+            block_hash,
+            BlockSyncResult(block=pending_confirmation.block, confirmed=True)
+        )
+        return True
+
+    def prune_recent_confirmations(self):
+        """
+        Forget confirmations for unregistered blocks that are too old
+        """
+        expired = time.time() - self.RECENT_CONFIRMATION_SECONDS
+
+        while self.recent_confirmations:
+            block_hash, timestamp = \
+                next(iter(self.recent_confirmations.items()))
+
+            if timestamp > expired:
+                break
+
+            del self.recent_confirmations[block_hash]
+
+    def is_tracked_by_websocket(self, block):
+        """
+        Check if the confirmation of the given block will be received
+        through the WebSocket connection
+
+        :param block: Block that has been broadcast
+        :type block: siliqua.wallet.accounts.Block
+
+        :rtype: bool
+        """
+        websocket_processor = \
+            self.rpc_processor.network_plugin.get_websocket_processor(
+                block.account
+            )
+
+        if not websocket_processor or not websocket_processor.connected:
+            return False
+
+        return block.account in websocket_processor.subscribed_account_ids
+
+    def resolve(self, block_hash, sync_result):
+        """
+        Resolve a pending block with the given result
+
+        :param str block_hash: Block hash
+        :param sync_result: Result for the block, or None if the block
+                            is no longer being waited for
+        :type sync_result: siliqua.network.BlockSyncResult or None
+        """
+        try:
+            pending_confirmation = self.pending_confirmations.pop(block_hash)
+        except KeyError:
+            return
+
+        if not pending_confirmation.future.done():
+            pending_confirmation.future.set_result(sync_result)
+
+    async def poll(self):
+        """
+        Poll the confirmation status of all pending blocks until
+        every block has been resolved.
+
+        Blocks whose confirmation will be received through the WebSocket
+        connection are only polled every
+        `CONFIRMATION_FALLBACK_POLL_INTERVAL_SECONDS` seconds, except on
+        the first tick after they are registered, in case they were
+        confirmed before the WebSocket connection could report it.
+        """
+        shutdown_flag = self.rpc_processor.shutdown_flag
+        fallback_poll_interval = \
+            self.rpc_processor.CONFIRMATION_FALLBACK_POLL_INTERVAL_SECONDS
+
+        last_fallback_poll = time.time()
+
+        while self.pending_confirmations and not shutdown_flag.is_set():
+            fallback_poll = \
+                last_fallback_poll + fallback_poll_interval < time.time()
+
+            new_block_hashes = self.new_block_hashes
+            self.new_block_hashes = set()
+
+            if fallback_poll:
+                block_hashes = list(self.pending_confirmations.keys())
+                last_fallback_poll = time.time()
+            else:
+                block_hashes = [
+                    block_hash for block_hash, pending_confirmation
+                    in self.pending_confirmations.items()
+                    if block_hash in new_block_hashes
+                    or not self.is_tracked_by_websocket(
+                        pending_confirmation.block
+                    )
+                ]
+
+            try:
+                if block_hashes:
+                    await self.update_pending_confirmations(block_hashes)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                # Request failed, try again on the next tick
+                pass
+            except Exception as exc:
+                logger.error(
+                    "Unexpected error while polling for confirmations: "
+                    "%s %s", str(exc), traceback.format_exc()
+                )
+
+            if not self.pending_confirmations:
+                break
+
+            await asyncio.sleep(
+                self.rpc_processor.CONFIRMATION_POLL_INTERVAL_SECONDS
+            )
+
+        if shutdown_flag.is_set():
+            # Stop waiting for the remaining blocks
+            for block_hash in list(self.pending_confirmations.keys()):
+                self.resolve(block_hash, None)
+
+    async def update_pending_confirmations(self, block_hashes=None):
+        """
+        Check the confirmation status of every pending block using a
+        single request
+
+        :param list block_hashes: Block hashes to check. If not provided,
+                                  every pending block is checked.
+        """
+        if block_hashes is None:
+            block_hashes = list(self.pending_confirmations.keys())
+
+        response = await self.rpc_processor.do_json_post(
+            self.rpc_processor.rpc_url,
+            params={
+                "action": "blocks_info",
+                "hashes": block_hashes
+            }
+        )
+
+        if "blocks" not in response and len(block_hashes) > 1:
+            # The node returns an error if any of the blocks is missing.
+            # Split the blocks in half and check both halves to find out
+            # which blocks disappeared using as few requests as possible.
+            # The missing blocks are resolved once found, so they are not
+            # searched for again on the next tick.
+            middle = len(block_hashes) // 2
+
+            await asyncio.gather(
+                self.update_pending_confirmations(block_hashes[:middle]),
+                self.update_pending_confirmations(block_hashes[middle:])
+            )
+
+            return
+
+        for block_hash in block_hashes:
+            try:
+                pending_confirmation = self.pending_confirmations[block_hash]
+            except KeyError:
+                # Block was resolved while the request was in progress
+                continue
+
+            block = pending_confirmation.block
+
+            try:
+                confirmed = \
+                    response["blocks"][block_hash]["confirmed"] == "true"
+            except KeyError:
+                # Block disappeared entirely. Since we don't know
+                # why the node dropped it, set error to 'unknown'
+                self.resolve(
+                    block_hash,
+                    BlockSyncResult(
+                        block=block, rejected=True, error="unknown"
+                    )
+                )
+                continue
+
+            if confirmed:
+                self.resolve(
+                    block_hash, BlockSyncResult(block=block, confirmed=True)
+                )
+                continue
+
+            timeout = self.rpc_processor.CONFIRMATION_TIMEOUT_SECONDS
+
+            if pending_confirmation.start + timeout < time.time():
+                # Give up after several minutes of waiting.
+                self.resolve(
+                    block_hash,
+                    BlockSyncResult(
+                        block=block, rejected=True, error="timeout"
+                    )
+                )
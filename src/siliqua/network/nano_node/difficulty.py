@@ -0,0 +1,53 @@
+import time
+
+
+class DifficultyTracker:
+    """
+    Tracker that keeps the network's active difficulty up-to-date.
+
+    If a WebSocket connection is subscribed to the 'active_difficulty'
+    topic, the difficulty is updated whenever a message arrives and the
+    RPC doesn't need to be polled. Otherwise, the difficulty is polled
+    every `poll_interval` seconds, or right away if a refresh
+    has been requested (eg. after a block was rejected for insufficient
+    work).
+    """
+    def __init__(self, network_plugin, poll_interval):
+        """
+        :param network_plugin: Network plugin to update
+        :type network_plugin: siliqua.network.nano_node.NetworkPlugin
+        :param float poll_interval: Seconds to wait since the last update
+                                    before polling the difficulty again
+        """
+        self.network_plugin = network_plugin
+        self.poll_interval = poll_interval
+
+        self.timestamp = None
+        self.refresh_requested = False
+
+    @property
+    def poll_due(self):
+        """
+        Return True if the difficulty should be polled using the RPC
+        """
+        if self.refresh_requested or self.timestamp is None:
+            return True
+
+        return self.timestamp + self.poll_interval < time.time()
+
+    def update(self, difficulty):
+        """
+        Update the active difficulty
+
+        :param str difficulty: Active difficulty
+        """
+        self.network_plugin.work_difficulty = difficulty
+        self.timestamp = time.time()
+        self.refresh_requested = False
+
+    def request_refresh(self):
+        """
+        Poll the difficulty on the next update regardless of when the
+        difficulty was last updated
+        """
+        self.refresh_requested = True
@@ -0,0 +1,177 @@
+import time
+
+# Actions that only read data from the node. These can be safely sent
+# to more than one node at the same time.
+IDEMPOTENT_ACTIONS = (
+    "account_history", "account_info", "accounts_frontiers",
+    "accounts_pending", "active_difficulty", "blocks_info", "version"
+)
+
+
+def get_rpc_urls(value):
+    """
+    Get a list of RPC URLs from a configuration value, which may be
+    either a single URL or a list of URLs
+
+    :param value: Configuration value
+    :type value: str or list
+    :rtype: list
+    """
+    if not value:
+        return []
+
+    if isinstance(value, str):
+        return [value]
+
+    return list(value)
+
+
+class NodeEndpoint:
+    """
+    Node endpoint in a :class:`NodePool`, including the statistics used
+    to route requests to it
+    """
+    __slots__ = (
+        "url", "trusted", "latency", "active", "consecutive_failures",
+        "open_until"
+    )
+
+    def __init__(self, url, trusted=False):
+        self.url = url
+
+        # Confirmed blocks returned by a trusted endpoint are only
+        # verified partially
+        self.trusted = trusted
+
+        # Exponentially weighted moving average of request latency
+        # in seconds. None if no request has completed yet.
+        self.latency = None
+        self.active = 0
+
+        self.consecutive_failures = 0
+
+        # If set, the circuit breaker is open and the endpoint is out of
+        # rotation until this time
+        self.open_until = None
+
+    @property
+    def available(self):
+        """
+        Return True if the endpoint can receive requests. Endpoints with
+        an open circuit breaker become available for a trial request once
+        the breaker's timeout has passed.
+        """
+        return self.open_until is None or self.open_until <= time.time()
+
+    @property
+    def score(self):
+        """
+        Routing score, lower being better. Endpoints that haven't completed
+        a request yet are preferred so that every endpoint is measured.
+        """
+        if self.latency is None:
+            return 0
+
+        # Penalize endpoints that are already busy
+        return self.latency * (1 + self.active)
+
+
+class NodePool:
+    """
+    Pool of node endpoints.
+
+    Each request is routed to the endpoint with the lowest latency.
+    Endpoints that fail several requests in a row are taken out of rotation
+    by opening a circuit breaker. The breaker's timeout doubles every time
+    the trial request after the timeout fails.
+    """
+    # Weight of the latest request when updating the latency average
+    LATENCY_SMOOTHING = 0.3
+
+    # Take the endpoint out of rotation after 3 failed requests in a row
+    FAILURE_THRESHOLD = 3
+
+    # Keep the endpoint out of rotation for 5 seconds at first,
+    # and 5 minutes at most
+    MIN_OPEN_SECONDS = 5
+    MAX_OPEN_SECONDS = 300
+
+    def __init__(self, urls, trusted_urls=()):
+        """
+        :param list urls: List of node URLs
+        :param trusted_urls: Node URLs that are trusted to return
+                             valid blocks
+        """
+        if not urls:
+            raise ValueError("At least one node URL is required")
+
+        self.endpoints = [
+            NodeEndpoint(url, trusted=url in trusted_urls) for url in urls
+        ]
+
+    def __len__(self):
+        return len(self.endpoints)
+
+    def select(self, exclude=()):
+        """
+        Select the healthiest endpoint
+
+        :param exclude: Endpoints that should not be selected
+        :returns: Endpoint or None if every endpoint was excluded
+        :rtype: NodeEndpoint or None
+        """
+        endpoints = [
+            endpoint for endpoint in self.endpoints
+            if endpoint not in exclude
+        ]
+
+        if not endpoints:
+            return None
+
+        available_endpoints = [
+            endpoint for endpoint in endpoints if endpoint.available
+        ]
+
+        if not available_endpoints:
+            # Every endpoint is out of rotation. Use the one that would
+            # return first rather than not sending the request at all.
+            return min(endpoints, key=lambda endpoint: endpoint.open_until)
+
+        return min(available_endpoints, key=lambda endpoint: endpoint.score)
+
+    def record_success(self, endpoint, elapsed):
+        """
+        Record a successful request
+
+        :param NodeEndpoint endpoint: Endpoint
+        :param float elapsed: Time the request took in seconds
+        """
+        if endpoint.latency is None:
+            endpoint.latency = elapsed
+        else:
+            endpoint.latency = (
+                self.LATENCY_SMOOTHING * elapsed
+                + (1 - self.LATENCY_SMOOTHING) * endpoint.latency
+            )
+
+        endpoint.consecutive_failures = 0
+        endpoint.open_until = None
+
+    def record_failure(self, endpoint):
+        """
+        Record a failed request, taking the endpoint out of rotation
+        if it has failed too many times in a row
+
+        :param NodeEndpoint endpoint: Endpoint
+        """
+        endpoint.consecutive_failures += 1
+
+        excess_failures = \
+            endpoint.consecutive_failures - self.FAILURE_THRESHOLD
+
+        if excess_failures >= 0:
+            open_seconds = min(
+                self.MIN_OPEN_SECONDS * (2 ** excess_failures),
+                self.MAX_OPEN_SECONDS
+            )
+            endpoint.open_until = time.time() + open_seconds
@@ -1,20 +1,26 @@
 import asyncio
 import time
 import traceback
-from queue import Empty
 
 import aiohttp
 import pkg_resources
 
 from nanolib.exceptions import InvalidBlock, InvalidSignature
 from nanolib.work import validate_difficulty
-from siliqua.network import BlockProcessError, BlockSyncResult
+from siliqua.network import (BlockProcessError, BlockSyncResult,
+                              get_block_parent_hashes)
 from siliqua.network.exceptions import UnsupportedProtocolVersion
-from siliqua.network.nano_node.base import (NetworkProcessorBase,
+from siliqua.network.nano_node.base import (HistoryPage,
+                                            NetworkProcessorBase,
+                                            RPCResponse,
                                             get_block_from_json,
                                             get_link_block_from_json,
-                                            get_link_block_hash)
+                                            get_link_block_hash,
+                                            is_send_block)
+from siliqua.network.nano_node.confirmation import ConfirmationTracker
 from siliqua.util import normalize_account_id
+from siliqua.wallet.accounts import LinkBlock
+from siliqua.wallet.util import split_blocks_for_broadcast
 
 from . import logger
 
@@ -29,24 +35,81 @@ class RPCProcessor(NetworkProcessorBase):
     # TODO: Maybe make this interval configurable?
     FAST_POLL_INTERVAL_SECONDS = 5
 
-    # Poll for confirmation every 1 second
+    # Poll for confirmation of broadcast blocks every 1 second
     CONFIRMATION_POLL_INTERVAL_SECONDS = 1
 
+    # If the confirmation is received through the WebSocket connection,
+    # only poll for it every 30 seconds in case the message was missed
+    CONFIRMATION_FALLBACK_POLL_INTERVAL_SECONDS = 30
+
     # Wait 5 minutes at most for confirmation before giving up
     CONFIRMATION_TIMEOUT_SECONDS = 300
 
+    # Request 500 blocks of account history at a time.
+    # Requesting 1000 blocks results in a request that's too big
+    # for some web servers to handle
+    HISTORY_PAGE_SIZE = 500
+
+    # When retrieving long account histories, reduce the page size
+    # if a request takes longer than 2 seconds, down to 50 blocks
+    MIN_HISTORY_PAGE_SIZE = 50
+    HISTORY_PAGE_TARGET_SECONDS = 2
+
+    # Check frontiers of up to 1000 accounts in a single request
+    FRONTIER_BATCH_SIZE = 1000
+
+    # Check accounts that are due for polling using 'accounts_frontiers'
+    # before requesting their account histories
+    FRONTIER_SYNC_ENABLED = True
+
+    # Broadcast blocks for 10 independent account chains at a time
+    # unless configured otherwise
+    DEFAULT_BROADCAST_CONCURRENCY = 10
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.pocket_timestamp = None
 
+        self.confirmation_tracker = ConfirmationTracker(self)
+
+        # Account ID -> task retrieving a long account history
+        self.deep_sync_tasks = {}
+
+        # Task updating the active difficulty, shared by everyone
+        # waiting for the difficulty to be refreshed
+        self.difficulty_refresh_task = None
+
+        # Whether the node reports account confirmation heights. If not,
+        # the confirmation status of each block is checked separately.
+        self.confirmation_height_supported = True
+
+        # Account ID -> last known confirmation height. Blocks up to this
+        # height stay confirmed, so 'account_info' only needs to be
+        # requested again once they have all been retrieved.
+        self.confirmation_heights = {}
+
+        # Account ID -> height of the last block retrieved from the network
+        self.network_head_heights = {}
+
+        # Account ID -> frontier found during the last 'accounts_frontiers'
+        # check
+        self.checked_frontiers = {}
+
+        self.broadcast_concurrency = int(self.config.get(
+            "network.{}.broadcast_concurrency".format(
+                self.network_plugin.PLUGIN_NAME
+            ),
+            self.DEFAULT_BROADCAST_CONCURRENCY
+        ))
+
     @property
     def poll_interval(self):
         """
         Return HTTP poll interval depending on whether a WebSocket
         connection is active
         """
-        if self.network_plugin.websocket_processor:
+        if self.network_plugin.websocket_processors:
             return self.POLL_INTERVAL_SECONDS
 
         return self.FAST_POLL_INTERVAL_SECONDS
@@ -75,17 +138,20 @@ class RPCProcessor(NetworkProcessorBase):
             try:
                 await self.check_node_version()
 
-                await self.update_active_difficulty()
+                if self.difficulty_tracker.poll_due:
+                    await self.refresh_active_difficulty()
+
                 await self.update_broadcast_blocks()
                 await self.update_new_blocks()
                 await self.update_pocketable_blocks()
 
                 # Check if all accounts are synced
-                self.connection_status.sync_complete = not any([
-                    not status.sync_complete for status
-                    in self.account_sync_statuses.values()
-                ])
-                self.connection_status.completed_rounds += 1
+                self.connection_status.complete_round(
+                    sync_complete=not any([
+                        not status.sync_complete for status
+                        in self.account_sync_statuses.values()
+                    ])
+                )
             except (aiohttp.ClientError, asyncio.TimeoutError):
                 # In case of an error, sleep for a bit and then try
                 # again. This could happen if the node is just starting up
@@ -112,6 +178,13 @@ class RPCProcessor(NetworkProcessorBase):
 
         logger.info("Stopping RPC update loop")
 
+        for task in self.deep_sync_tasks.values():
+            task.cancel()
+
+        await asyncio.gather(
+            *self.deep_sync_tasks.values(), return_exceptions=True
+        )
+
         # Close the session on shutdown
         await self.session.close()
 
@@ -165,11 +238,29 @@ class RPCProcessor(NetworkProcessorBase):
 
         difficulty = validate_difficulty(result["network_minimum"])
 
-        self.work_difficulty = difficulty
+        self.difficulty_tracker.update(difficulty)
+
+    async def refresh_active_difficulty(self):
+        """
+        Update the active difficulty right away. If a refresh is already
+        in progress, wait for it to finish instead of starting another one.
+        """
+        if not self.difficulty_refresh_task \
+                or self.difficulty_refresh_task.done():
+            self.difficulty_refresh_task = asyncio.ensure_future(
+                self.update_active_difficulty()
+            )
+
+        # Don't cancel the shared refresh if one of the callers
+        # is cancelled
+        await asyncio.shield(self.difficulty_refresh_task)
 
     async def broadcast_block(self, block):
         """
         Broadcast a single block and wait until it is complete
+
+        :returns: BlockSyncResult for the block, or None if the block had
+                  already been processed by the node
         """
         params = {
             "action": "process",
@@ -193,40 +284,12 @@ class RPCProcessor(NetworkProcessorBase):
                 block=block, rejected=True, error=response["error"]
             )
         else:
-            poll_start = time.time()
-            while True:
-                response = await self.do_json_post(
-                    self.rpc_url,
-                    params={
-                        "action": "blocks_info",
-                        "hashes": [block_hash]
-                    }
-                )
-
-                try:
-                    confirmed = \
-                        response["blocks"][block_hash]["confirmed"] == "true"
-                except KeyError:
-                    # Block disappeared entirely. Since we don't know
-                    # why the node dropped it, set error to 'unknown'
-                    sync_result = BlockSyncResult(
-                        block=block, rejected=True, error="unknown"
-                    )
-                    break
+            sync_result = \
+                await self.confirmation_tracker.wait_for_confirmation(block)
 
-                if confirmed:
-                    sync_result = BlockSyncResult(block=block, confirmed=True)
-                    break
-
-                if poll_start + self.CONFIRMATION_TIMEOUT_SECONDS < time.time():
-                    # Give up after several minutes of waiting.
-                    sync_result = BlockSyncResult(
-                        block=block, rejected=True, error="timeout"
-                    )
-                    break
-
-                # Wait one second and poll for confirmation again
-                await asyncio.sleep(self.CONFIRMATION_POLL_INTERVAL_SECONDS)
+            if not sync_result:
+                # Network plugin is shutting down
+                return None
 
         if sync_result.rejected:
             if sync_result.error == \
@@ -249,16 +312,24 @@ class RPCProcessor(NetworkProcessorBase):
                     BlockProcessError.INSUFFICIENT_WORK:
                 # If block is rejected for having insufficient work,
                 # update active difficulty so that next work units
-                # have correct difficulty threshold
-                await self.update_active_difficulty()
+                # have correct difficulty threshold. If the refresh fails,
+                # it's retried on the next update.
+                self.difficulty_tracker.request_refresh()
+                await self.refresh_active_difficulty()
 
             self.processed_block_queue.put(sync_result)
-            # Clear the queue if a block is rejected
-            # TODO: A more granular approach could be taken here:
-            # only drop blocks that are dependent on the rejected block
-            # instead of dropping everything.
+            # Drop the queued blocks that depend on the rejected block,
+            # since they can't be confirmed either
             with self.broadcast_queue_lock:
-                self.broadcast_block_queue.queue.clear()
+                dropped_blocks = self.broadcast_block_queue.remove_dependents(
+                    [block_hash]
+                )
+
+            if dropped_blocks:
+                logger.info(
+                    "Dropped %d queued block(s) depending on rejected "
+                    "block %s", len(dropped_blocks), block_hash
+                )
         else:
             logger.info("Confirmed block %s", block_hash)
             self.processed_block_queue.put(sync_result)
@@ -266,32 +337,63 @@ class RPCProcessor(NetworkProcessorBase):
             # to prevent unnecessary duplicate transmissions
             self.broadcast_block_queue.remove(sync_result.block)
 
+        return sync_result
+
+    async def broadcast_block_group(self, blocks, semaphore):
+        """
+        Broadcast a group of dependent blocks one-by-one, skipping blocks
+        that depend on a rejected block
+        """
+        async with semaphore:
+            rejected_hashes = set()
+
+            for block in blocks:
+                if get_block_parent_hashes(block) & rejected_hashes:
+                    # Block depends on a rejected block
+                    rejected_hashes.add(block.block_hash)
+                    continue
+
+                sync_result = await self.broadcast_block(block)
+
+                if sync_result and sync_result.rejected:
+                    rejected_hashes.add(block.block_hash)
+
     async def update_broadcast_blocks(self):
         """
-        Broadcast blocks in the queue one-by-one until the queue
-        is exhausted
+        Broadcast blocks in the queue until the queue is exhausted.
+
+        Blocks are split into groups of blocks that depend on each other.
+        Independent groups are broadcast in parallel.
         """
+        semaphore = asyncio.Semaphore(self.broadcast_concurrency)
+
         while True:
-            try:
-                # TODO: Instead of processing every block one-by-one,
-                # order blocks into independent subqueues which can be
-                # processed in parallel
-                block = self.broadcast_block_queue.get_nowait()
-                await self.broadcast_block(block)
-            except Empty:
+            blocks = self.broadcast_block_queue.drain()
+
+            if not blocks:
                 break
 
-    async def update_account_blocks(self, account_id):
-        """
-        Update an account's block in two requests:
-        first request to check account's (unconfirmed) blockchain
-        second request to retrieve related link blocks and check blocks'
-        confirmation status
+            block_groups = split_blocks_for_broadcast(blocks)
+
+            await asyncio.gather(*[
+                self.broadcast_block_group(block_group, semaphore)
+                for block_group in block_groups
+            ])
+
+    async def get_account_history(self, account_id, head=None, count=500):
         """
-        sync_status = self.account_sync_statuses[account_id]
-        network_head = sync_status.network_head
+        Retrieve a page of an account's history, starting from the given
+        block
+
+        :param str account_id: Account ID
+        :param str head: Block hash to start from. If not provided, start
+                         from the first block of the account.
+        :param int count: Maximum amount of blocks to retrieve
 
-        # Start by retrieving account history
+        :returns: List of history entries, including the head block if
+                  provided
+        :rtype: HistoryPage
+        """
         params = {
             "action": "account_history",
             "account": account_id,
@@ -299,106 +401,634 @@ class RPCProcessor(NetworkProcessorBase):
             # so start from the first block
             "reverse": True,
             "raw": True,
-            # 500 blocks at a time.
-            # Requesting 1000 blocks results in a request that's too big
-            # for some web servers to handle
-            "count": 500,
+            "count": count,
         }
 
-        if network_head:
-            params["head"] = network_head
+        if head:
+            params["head"] = head
 
         response = await self.do_json_post(self.rpc_url, params=params)
 
         if "error" in response and response["error"] == "Account not found":
-            history = []
-        else:
-            history = response["history"]
+            return HistoryPage(endpoint=response.endpoint)
 
-        if history and history[0]["hash"] == network_head:
-            # We can skip retrieving the first block if we already have it
-            history = history[1:]
+        # Instead of an empty list, an empty string is used in the API
+        return HistoryPage(
+            response["history"] or [], endpoint=response.endpoint
+        )
 
-        if not history:
-            sync_status.sync_complete = True
-            self.account_ids_to_poll.discard(account_id)
-            return
+    async def get_confirmation_height(self, account_id):
+        """
+        Get the confirmation height of an account using 'account_info'
 
-        sync_status.sync_complete = False
-        self.connection_status.sync_complete = False
+        :param str account_id: Account ID
 
-        # Determine which blocks and link blocks we need to get
-        block_hashes_to_get = []
-        block_hash2link_block_hash = {}
-        blocks = []
+        :returns: (account_exists, confirmation_height) tuple. Confirmation
+                  height is None if the node doesn't report confirmation
+                  heights.
+        :rtype: tuple
+        """
+        if not self.confirmation_height_supported:
+            return True, None
+
+        response = await self.do_json_post(
+            self.rpc_url,
+            params={
+                "action": "account_info",
+                "account": account_id
+            }
+        )
+
+        if response.get("error", None) == "Account not found":
+            return False, 0
+
+        if "confirmation_height" not in response:
+            logger.info(
+                "Node doesn't report confirmation heights, checking "
+                "confirmation status for each block instead"
+            )
+            self.confirmation_height_supported = False
+            return True, None
+
+        return True, int(response["confirmation_height"])
+
+    async def process_account_history(
+            self, account_id, history, confirmation_height=None):
+        """
+        Retrieve the related link blocks and check the confirmation status
+        for blocks in an account's history, and add the confirmed blocks
+        into the queue
+
+        :param str account_id: Account ID
+        :param history: List of history entries in chronological order
+        :type history: HistoryPage
+        :param int confirmation_height: Confirmation height of the account.
+                                        If provided and the history entries
+                                        contain block heights, the
+                                        confirmation status of each block
+                                        doesn't need to be checked
+                                        separately.
+
+        :returns: True if all blocks were confirmed
+        :rtype: bool
+        """
+        sync_status = self.account_sync_statuses[account_id]
+        endpoint = history.endpoint
+
+        check_confirmed = not (
+            confirmation_height is not None
+            and all("height" in entry for entry in history)
+        )
+        all_confirmed = True
+
+        if not check_confirmed:
+            # Blocks up to the confirmation height are confirmed
+            confirmed_history = [
+                entry for entry in history
+                if int(entry["height"]) <= confirmation_height
+            ]
+            all_confirmed = len(confirmed_history) == len(history)
+            history = confirmed_history
+
+        block_heights = {}
 
         for entry in history:
             # Account ID may be unrelated due to a quirk in 'account_history'
             # RPC call
             entry["account"] = account_id
 
-            block = get_block_from_json(entry)
+            if "height" in entry:
+                block_heights[entry["hash"]] = int(entry["height"])
+
+        # Decode the entire page at once so that large pages can be
+        # decoded and verified in the process pool. If the confirmation
+        # height was used, the remaining blocks are known to be confirmed.
+        verify = self.get_verify_mask(
+            len(history), endpoint=endpoint, confirmed=not check_confirmed
+        )
+        raw_blocks = await self.parse_blocks(history, verify=verify)
+
+        # Determine which blocks and link blocks we need to get
+        block_hashes_to_get = []
+        link_block_hashes_to_get = []
+        link_block_hashes_in_response = []
+        block_hash2link_block_hash = {}
+        link_blocks = {}
+        blocks = []
+
+        for entry, raw_block, verified in zip(history, raw_blocks, verify):
+            block = get_block_from_json(entry, raw_block=raw_block)
             subtype = entry.get("subtype", None)
 
             block_hash = block.block_hash
-            block_hashes_to_get.append(block_hash)
+
+            if check_confirmed:
+                block_hashes_to_get.append(block_hash)
+
+            if is_send_block(block, subtype) and "amount" in entry \
+                    and verified:
+                # Send blocks are link blocks for their recipients.
+                # Cache them in case the recipient is also in the wallet.
+                # Blocks that weren't verified aren't cached, since link
+                # blocks taken from the cache aren't verified again.
+                self.link_block_cache.add(
+                    LinkBlock(
+                        block=block.block, amount=int(entry["amount"]),
+                        timestamp=block.timestamp
+                    )
+                )
 
             link_block_hash = get_link_block_hash(block, subtype)
 
             if link_block_hash:
-                block_hashes_to_get.append(link_block_hash)
                 block_hash2link_block_hash[block_hash] = link_block_hash
 
+                link_block = self.link_block_cache.get(link_block_hash)
+
+                if link_block:
+                    link_blocks[link_block_hash] = link_block
+                elif check_confirmed:
+                    block_hashes_to_get.append(link_block_hash)
+                    link_block_hashes_in_response.append(link_block_hash)
+                else:
+                    # Confirmation status doesn't need to be checked,
+                    # so only the link blocks are needed
+                    link_block_hashes_to_get.append(link_block_hash)
+
             blocks.append(block)
 
-        response = await self.do_json_post(
-            self.rpc_url,
-            params={
-                "action": "blocks_info",
-                "hashes": block_hashes_to_get
-            }
-        )
+        if link_block_hashes_to_get:
+            link_blocks.update({
+                link_block.block_hash: link_block
+                for link_block in await self.get_link_blocks(
+                    link_block_hashes_to_get
+                )
+            })
+
+        if block_hashes_to_get:
+            response = await self.do_json_post(
+                self.rpc_url,
+                params={
+                    "action": "blocks_info",
+                    "hashes": block_hashes_to_get
+                }
+            )
+        else:
+            response = RPCResponse({"blocks": {}})
+
+        raw_link_blocks = {}
+
+        if link_block_hashes_in_response:
+            raw_link_blocks = dict(zip(
+                link_block_hashes_in_response,
+                await self.parse_blocks(
+                    [
+                        response["blocks"][link_block_hash]
+                        for link_block_hash in link_block_hashes_in_response
+                    ],
+                    endpoint=response.endpoint
+                )
+            ))
 
         sync_status.update_timestamp()
 
+        sync_results = []
+
         for block in blocks:
             block_hash = block.block_hash
-            entry = response["blocks"][block_hash]
-            confirmed = entry["confirmed"] == "true"
 
-            if not confirmed:
-                return
+            if check_confirmed:
+                entry = response["blocks"][block_hash]
+                confirmed = entry["confirmed"] == "true"
+
+                if not confirmed:
+                    all_confirmed = False
+                    break
 
             link_block_hash = block_hash2link_block_hash.get(block_hash, None)
 
             if link_block_hash:
-                link_entry = response["blocks"][link_block_hash]
-                link_block = get_link_block_from_json(link_entry)
+                try:
+                    link_block = link_blocks[link_block_hash]
+                except KeyError:
+                    link_entry = response["blocks"][link_block_hash]
+                    link_block = get_link_block_from_json(
+                        link_entry, raw_block=raw_link_blocks[link_block_hash]
+                    )
+                    self.link_block_cache.add(link_block)
 
                 block.link_block = link_block
 
-            self.processed_block_queue.put(
-                BlockSyncResult(block=block, confirmed=True)
-            )
+            sync_results.append(BlockSyncResult(block=block, confirmed=True))
 
             sync_status.network_head = block_hash
 
+            if block_hash in block_heights:
+                self.network_head_heights[account_id] = \
+                    block_heights[block_hash]
+
+        # Don't add more blocks until the wallet has caught up with
+        # the blocks already retrieved
+        await self.processed_block_queue.wait_for_capacity()
+        self.processed_block_queue.put_many(sync_results)
+
+        return all_confirmed
+
+    def get_history_count(self, count, confirmation_height, head_height=0):
+        """
+        Cap the amount of history entries to request so that blocks past
+        the confirmation height aren't retrieved. One block past the
+        confirmation height is still requested to find out whether the
+        account has unconfirmed blocks.
+
+        :param int count: Maximum amount of history entries to request
+        :param int confirmation_height: Confirmation height of the account,
+                                        if available
+        :param int head_height: Height of the block the history is
+                                requested from, 0 if the history is
+                                requested from the first block or None
+                                if the height is unknown
+
+        :returns: Amount of history entries to request
+        :rtype: int
+        """
+        if confirmation_height is None or head_height is None:
+            return count
+
+        if not head_height:
+            return max(min(count, confirmation_height + 1), 1)
+
+        # The head block is included in the response
+        return max(min(count, confirmation_height - head_height + 2), 2)
+
+    def get_network_head_height(self, account_id):
+        """
+        Get the height of the last block retrieved for an account
+
+        :param str account_id: Account ID
+
+        :returns: Block height, 0 if no blocks have been retrieved or None
+                  if the height is unknown
+        :rtype: int or None
+        """
+        if not self.account_sync_statuses[account_id].network_head:
+            return 0
+
+        return self.network_head_heights.get(account_id, None)
+
+    def get_cached_confirmation_height(self, account_id):
+        """
+        Get the last known confirmation height of an account if the account
+        has confirmed blocks that haven't been retrieved yet
+
+        :param str account_id: Account ID
+
+        :returns: Confirmation height or None if it needs to be requested
+                  again
+        :rtype: int or None
+        """
+        confirmation_height = self.confirmation_heights.get(account_id, None)
+        head_height = self.get_network_head_height(account_id)
+
+        if confirmation_height is not None and head_height is not None \
+                and confirmation_height > head_height:
+            return confirmation_height
+
+        return None
+
+    async def update_confirmation_height(self, account_id):
+        """
+        Request the confirmation height of an account and cache it
+
+        :param str account_id: Account ID
+
+        :returns: (account_exists, confirmation_height) tuple
+        :rtype: tuple
+        """
+        account_exists, confirmation_height = \
+            await self.get_confirmation_height(account_id)
+
+        if confirmation_height is not None:
+            self.confirmation_heights[account_id] = confirmation_height
+
+        return account_exists, confirmation_height
+
+    async def update_account_blocks(self, account_id):
+        """
+        Update an account's blocks using the following requests:
+        first request to check the account's confirmation height
+        if the account has no blocks yet,
+        second request to check account's (unconfirmed) blockchain,
+        third request to retrieve related link blocks and check blocks'
+        confirmation status if the confirmation height isn't available
+
+        The confirmation height of an account that already has blocks is
+        only requested if the history doesn't fit in a single page, since
+        the confirmation status of a few new blocks can be checked with the
+        same request that retrieves the link blocks. This also means that
+        confirmation heights don't need to be stored between restarts.
+
+        If the account has more blocks than fit in a single page,
+        the rest of the history is retrieved in the background using
+        :meth:`deep_sync_account_blocks`
+        """
+        sync_status = self.account_sync_statuses[account_id]
+        network_head = sync_status.network_head
+
+        frontier_checked = account_id in self.checked_frontiers
+        frontier = self.checked_frontiers.pop(account_id, None)
+
+        confirmation_height = self.get_cached_confirmation_height(account_id)
+
+        if frontier_checked and not frontier:
+            # Frontier check already found that the account isn't opened
+            account_exists = False
+        elif confirmation_height is None and not network_head:
+            account_exists, confirmation_height = \
+                await self.update_confirmation_height(account_id)
+        else:
+            account_exists = True
+
+        if not account_exists:
+            history = HistoryPage()
+            page_full = False
+        else:
+            count = self.get_history_count(
+                count=self.HISTORY_PAGE_SIZE,
+                confirmation_height=confirmation_height,
+                head_height=self.get_network_head_height(account_id)
+            )
+            history = await self.get_account_history(
+                account_id, head=network_head, count=count
+            )
+            page_full = len(history) == self.HISTORY_PAGE_SIZE
+
+        if history and history[0]["hash"] == network_head:
+            # We can skip retrieving the first block if we already have it
+            if "height" in history[0]:
+                self.network_head_heights[account_id] = \
+                    int(history[0]["height"])
+
+            history = HistoryPage(history[1:], endpoint=history.endpoint)
+
+        if not history:
+            sync_status.sync_complete = True
+            sync_status.update_timestamp()
+            self.account_ids_to_poll.discard(account_id)
+            return
+
+        sync_status.sync_complete = False
+        self.connection_status.sync_complete = False
+
+        if confirmation_height is None and page_full:
+            # Long history is retrieved in several pages, which is cheaper
+            # once the confirmation height is known
+            _, confirmation_height = \
+                await self.update_confirmation_height(account_id)
+
+        all_confirmed = await self.process_account_history(
+            account_id, history, confirmation_height=confirmation_height
+        )
+
+        if all_confirmed and page_full:
+            self.start_deep_sync(account_id, confirmation_height)
+
+    def start_deep_sync(self, account_id, confirmation_height=None):
+        """
+        Start retrieving the rest of an account's history in the
+        background, unless already in progress
+
+        :param str account_id: Account ID
+        :param int confirmation_height: Confirmation height of the account,
+                                        if available
+        """
+        if account_id in self.deep_sync_tasks:
+            return
+
+        logger.info(
+            "Account %s has a long history, starting deep sync", account_id
+        )
+        self.deep_sync_tasks[account_id] = asyncio.ensure_future(
+            self.deep_sync_account_blocks(account_id, confirmation_height)
+        )
+
+    def get_next_history_page_size(self, page_size, elapsed):
+        """
+        Adjust the history page size depending on how long the last
+        request took
+
+        :param int page_size: Page size used in the last request
+        :param float elapsed: How long the last request took in seconds
+
+        :returns: Page size for the next request
+        :rtype: int
+        """
+        if elapsed > self.HISTORY_PAGE_TARGET_SECONDS:
+            return max(int(page_size / 2), self.MIN_HISTORY_PAGE_SIZE)
+        elif elapsed < self.HISTORY_PAGE_TARGET_SECONDS / 4:
+            return min(page_size * 2, self.HISTORY_PAGE_SIZE)
+
+        return page_size
+
+    async def deep_sync_account_blocks(
+            self, account_id, confirmation_height=None):
+        """
+        Retrieve the rest of an account's history page by page until
+        the end of the history or an unconfirmed block is reached.
+
+        The next history page is requested while the link blocks and
+        confirmation status for the current page are being retrieved.
+
+        :param str account_id: Account ID
+        :param int confirmation_height: Confirmation height of the account,
+                                        if available
+        """
+        sync_status = self.account_sync_statuses[account_id]
+
+        async def get_history_page(head, count):
+            start = time.time()
+            history = await self.get_account_history(
+                account_id, head=head, count=count
+            )
+            return history, count, time.time() - start
+
+        page_task = asyncio.ensure_future(
+            get_history_page(
+                sync_status.network_head,
+                self.get_history_count(
+                    count=self.HISTORY_PAGE_SIZE,
+                    confirmation_height=confirmation_height,
+                    head_height=self.get_network_head_height(account_id)
+                )
+            )
+        )
+
+        try:
+            while not self.shutdown_flag.is_set():
+                history, page_size, elapsed = await page_task
+                page_task = None
+
+                # Don't retrieve more blocks until the wallet has caught up
+                # with the blocks already retrieved
+                await self.processed_block_queue.wait_for_capacity()
+
+                page_full = len(history) == page_size
+
+                # No need to request more blocks if the page already
+                # goes past the confirmation height
+                past_confirmation_height = (
+                    confirmation_height is not None
+                    and history and "height" in history[-1]
+                    and int(history[-1]["height"]) > confirmation_height
+                )
+
+                if page_full and not past_confirmation_height:
+                    # Request the next page in advance
+                    page_task = asyncio.ensure_future(
+                        get_history_page(
+                            history[-1]["hash"],
+                            self.get_history_count(
+                                count=self.get_next_history_page_size(
+                                    page_size, elapsed
+                                ),
+                                confirmation_height=confirmation_height,
+                                head_height=(
+                                    int(history[-1]["height"])
+                                    if "height" in history[-1] else None
+                                )
+                            )
+                        )
+                    )
+
+                if history and history[0]["hash"] == sync_status.network_head:
+                    history = HistoryPage(
+                        history[1:], endpoint=history.endpoint
+                    )
+
+                if not history:
+                    break
+
+                all_confirmed = await self.process_account_history(
+                    account_id, history,
+                    confirmation_height=confirmation_height
+                )
+
+                if not all_confirmed or not page_task:
+                    break
+        finally:
+            if page_task:
+                page_task.cancel()
+
+    def collect_deep_sync_tasks(self):
+        """
+        Remove finished deep sync tasks, raising any errors that occurred
+        during them
+        """
+        for account_id, task in list(self.deep_sync_tasks.items()):
+            if not task.done():
+                continue
+
+            del self.deep_sync_tasks[account_id]
+
+            if not task.cancelled():
+                # Raise the exception if the task failed
+                task.result()
+
+    async def get_changed_account_ids(self, account_ids):
+        """
+        Check the current frontiers of the given accounts using bulk
+        'accounts_frontiers' requests and return the accounts whose frontier
+        doesn't match the last known network head
+
+        :param list account_ids: Account IDs to check
+        :returns: List of account IDs that need to be updated
+        :rtype: list
+        """
+        async def check_frontiers(account_ids):
+            response = await self.do_json_post(
+                self.rpc_url,
+                params={
+                    "action": "accounts_frontiers",
+                    "accounts": account_ids
+                }
+            )
+
+            if "frontiers" not in response:
+                # Check every account separately if the request failed
+                logger.warning(
+                    "Frontier check failed, updating accounts separately: %s",
+                    response.get("error", None)
+                )
+                return account_ids
+
+            # Instead of an empty dict, an empty string is used in the
+            # API
+            frontiers = {
+                normalize_account_id(account_id): block_hash
+                for account_id, block_hash
+                in (response["frontiers"] or {}).items()
+            }
+
+            changed_account_ids = []
+
+            for account_id in account_ids:
+                sync_status = self.account_sync_statuses[account_id]
+
+                # Unopened accounts don't have a frontier
+                frontier = frontiers.get(account_id, None)
+
+                if frontier == sync_status.network_head:
+                    sync_status.update_timestamp()
+                else:
+                    changed_account_ids.append(account_id)
+                    self.checked_frontiers[account_id] = frontier
+
+            return changed_account_ids
+
+        results = await asyncio.gather(*[
+            check_frontiers(account_ids[i:i+self.FRONTIER_BATCH_SIZE])
+            for i in range(0, len(account_ids), self.FRONTIER_BATCH_SIZE)
+        ])
+
+        return [
+            account_id for changed_account_ids in results
+            for account_id in changed_account_ids
+        ]
+
     async def update_new_blocks(self):
         """
         Check the network for any new blocks to add to the queue
         """
-        account_reqs = []
+        self.collect_deep_sync_tasks()
 
-        for account_id, sync_status in self.account_sync_statuses.items():
-            update_account = (
-                not sync_status.sync_complete
-                or account_id in self.account_ids_to_poll
-                or sync_status.seconds_since_timestamp > self.poll_interval
-            )
-            if update_account:
-                account_reqs.append(self.update_account_blocks(account_id))
+        account_ids_to_update = []
+        account_ids_to_check = []
+
+        for sync_status in self.account_sync_statuses.values():
+            account_id = sync_status.account_id
+
+            if account_id in self.deep_sync_tasks:
+                # Account is being synced in the background
+                continue
+
+            if not sync_status.sync_complete \
+                    or account_id in self.account_ids_to_poll:
+                account_ids_to_update.append(account_id)
+            elif sync_status.seconds_since_timestamp > self.poll_interval:
+                account_ids_to_check.append(account_id)
+
+        if account_ids_to_check and self.FRONTIER_SYNC_ENABLED:
+            # Only request the account history for accounts that have
+            # new blocks
+            account_ids_to_check = \
+                await self.get_changed_account_ids(account_ids_to_check)
+
+        account_ids_to_update += account_ids_to_check
 
-        await asyncio.gather(*account_reqs)
+        await asyncio.gather(*[
+            self.update_account_blocks(account_id)
+            for account_id in account_ids_to_update
+        ])
 
         return True
 
@@ -0,0 +1,129 @@
+import asyncio
+from collections import OrderedDict, deque
+
+# Lower value means higher priority
+ACTION_PRIORITIES = {
+    # Broadcasting blocks is the most time sensitive operation
+    "process": 0,
+    # Confirmation status, link blocks and node status
+    "blocks_info": 1,
+    "active_difficulty": 1,
+    "version": 1,
+    # Polling account histories and pocketable blocks
+    "account_history": 2,
+    "accounts_pending": 2
+}
+
+DEFAULT_PRIORITY = 2
+
+
+def get_request_priority(params):
+    """
+    Get the priority for a JSON RPC request
+
+    :param dict params: Request parameters
+    :returns: Priority, lower value meaning a higher priority
+    :rtype: int
+    """
+    return ACTION_PRIORITIES.get(params.get("action"), DEFAULT_PRIORITY)
+
+
+class RequestScheduler:
+    """
+    Scheduler that limits the amount of concurrent requests made to the node.
+
+    Requests that can't be started immediately are queued according to
+    their priority. Requests with the same priority are queued fairly using
+    a round-robin order between keys (eg. account IDs), so that
+    one account with a lot of requests can't starve the rest.
+    """
+    def __init__(self, max_concurrency):
+        """
+        :param int max_concurrency: Maximum amount of concurrent requests
+        """
+        if max_concurrency < 1:
+            raise ValueError("Maximum concurrency must be at least 1")
+
+        self.max_concurrency = max_concurrency
+        self.active = 0
+
+        # Priority -> {key: deque of futures}
+        self.waiters = {}
+        self.waiting_count = 0
+
+    async def acquire(self, priority=DEFAULT_PRIORITY, key=None):
+        """
+        Wait until a request can be started
+
+        :param int priority: Priority of the request, lower value meaning
+                             a higher priority
+        :param key: Key used to queue requests fairly, eg. account ID
+        """
+        if self.active < self.max_concurrency and not self.waiting_count:
+            self.active += 1
+            return
+
+        future = asyncio.get_event_loop().create_future()
+        self.waiters.setdefault(priority, OrderedDict()).setdefault(
+            key, deque()
+        ).append(future)
+        self.waiting_count += 1
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was already handed to us, pass it on
+                self.release()
+            else:
+                self._discard_waiter(priority, key, future)
+            raise
+
+    def release(self):
+        """
+        Finish a request, allowing the next queued request to start
+        """
+        while True:
+            future = self._pop_next_waiter()
+
+            if not future:
+                self.active -= 1
+                return
+
+            if not future.done():
+                # Hand the slot directly to the next request
+                future.set_result(None)
+                return
+
+    def _pop_next_waiter(self):
+        for priority in sorted(self.waiters.keys()):
+            waiters = self.waiters[priority]
+
+            if not waiters:
+                continue
+
+            key, futures = next(iter(waiters.items()))
+            future = futures.popleft()
+
+            # Move the key to the end of the queue so that the other
+            # keys get their turn first
+            del waiters[key]
+            if futures:
+                waiters[key] = futures
+
+            self.waiting_count -= 1
+            return future
+
+        return None
+
+    def _discard_waiter(self, priority, key, future):
+        try:
+            futures = self.waiters[priority][key]
+            futures.remove(future)
+        except (KeyError, ValueError):
+            return
+
+        if not futures:
+            del self.waiters[priority][key]
+
+        self.waiting_count -= 1
@@ -0,0 +1,125 @@
+import asyncio
+import concurrent.futures
+import os
+
+from siliqua.network.nano_node.base import get_raw_block_from_json
+
+from . import logger
+
+
+def parse_blocks_from_json(blocks_data, verify):
+    """
+    Decode blocks received in a node's JSON response, verifying the
+    signature and proof-of-work of the selected blocks.
+
+    This is run in a worker process for large batches.
+
+    :param list blocks_data: List of block data received from the node
+    :param list verify: List of booleans, one for each block, determining
+                        whether the block is verified
+    :raises nanolib.exceptions.InvalidBlock: If a block is invalid
+    :raises nanolib.exceptions.InvalidSignature: If a block has an invalid
+                                                 signature
+    :returns: List of decoded blocks
+    :rtype: list
+    """
+    return [
+        get_raw_block_from_json(block_data, verify=verify_block)
+        for block_data, verify_block in zip(blocks_data, verify)
+    ]
+
+
+class BlockVerifier:
+    """
+    Verifier that decodes blocks received from the node and checks their
+    signature and proof-of-work.
+
+    Large batches of blocks (eg. pages of account history) are decoded
+    and verified in a process pool to avoid blocking the network event
+    loop. Small batches (eg. real-time WebSocket messages) are handled
+    directly in the calling thread to avoid the overhead of the process
+    pool.
+    """
+    # If there are fewer blocks to decode than this, decode them in the
+    # calling thread instead
+    MIN_POOL_BLOCK_COUNT = 64
+
+    # Maximum amount of blocks to decode in a single worker task
+    BATCH_SIZE = 128
+
+    def __init__(self, processes=-1):
+        """
+        :param int processes: Amount of worker processes to use.
+                              -1 uses half of logical CPU cores.
+        """
+        if processes == -1:
+            processes = max(int(os.cpu_count() / 2), 1)
+
+        self.processes = int(processes)
+        self.pool = None
+
+        # Batches submitted to the process pool that haven't finished yet
+        self.pending_futures = set()
+
+    async def parse(self, blocks_data, verify=None):
+        """
+        Decode and verify the given blocks
+
+        :param list blocks_data: List of block data received from the node
+        :param list verify: List of booleans, one for each block, determining
+                            whether the block is verified. All blocks
+                            are verified by default.
+        :raises nanolib.exceptions.InvalidBlock: If a block is invalid
+        :raises nanolib.exceptions.InvalidSignature: If a block has an invalid
+                                                     signature
+        :returns: List of decoded blocks in the same order
+        :rtype: list
+        """
+        if verify is None:
+            verify = [True] * len(blocks_data)
+
+        if len(blocks_data) < self.MIN_POOL_BLOCK_COUNT:
+            return parse_blocks_from_json(blocks_data, verify)
+
+        if not self.pool:
+            logger.info(
+                "Starting block verification pool with %d process(es)",
+                self.processes
+            )
+            self.pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.processes
+            )
+
+        futures = [
+            self.pool.submit(
+                parse_blocks_from_json,
+                blocks_data[i:i+self.BATCH_SIZE],
+                verify[i:i+self.BATCH_SIZE]
+            )
+            for i in range(0, len(blocks_data), self.BATCH_SIZE)
+        ]
+        self.pending_futures.update(futures)
+
+        try:
+            results = await asyncio.gather(*[
+                asyncio.wrap_future(future) for future in futures
+            ])
+        finally:
+            self.pending_futures.difference_update(futures)
+
+        return [raw_block for result in results for raw_block in result]
+
+    def shutdown(self):
+        """
+        Shutdown the process pool. Batches that haven't started yet
+        are cancelled.
+        """
+        # 'cancel_futures' can't be used since it requires Python 3.9
+        for future in self.pending_futures:
+            future.cancel()
+
+        self.pending_futures = set()
+
+        if self.pool:
+            self.pool.shutdown(wait=False)
+            self.pool = None
@@ -1,6 +1,9 @@
 import asyncio
+import json
+import random
 import time
 import traceback
+from collections import deque
 
 import aiohttp
 
@@ -12,72 +15,257 @@ from siliqua.network.nano_node.base import (NetworkProcessorBase,
                                             get_block_from_json,
                                             get_link_block_hash,
                                             get_raw_block_from_json)
-from siliqua.util import normalize_account_id
+from siliqua.util import account_id_to_bytes, normalize_account_id
 from siliqua.wallet.accounts import LinkBlock, Timestamp, TimestampSource
 
 from . import logger
 
 
+def get_account_shard(account_id, shard_count):
+    """
+    Get the index of the WebSocket connection the account belongs to.
+
+    The shard is derived from the account's public key, meaning
+    the same account always belongs to the same shard regardless of the
+    account prefix.
+
+    :param str account_id: Account ID
+    :param int shard_count: Amount of shards
+    :rtype: int
+    """
+    if shard_count == 1:
+        return 0
+
+    public_key = account_id_to_bytes(account_id)
+
+    return int.from_bytes(public_key[0:8], "big") % shard_count
+
+
 class WebSocketProcessor(NetworkProcessorBase):
-    def __init__(self, *args, **kwargs):
+    # Wait for 100 ms for new messages before checking for subscription
+    # changes and the shutdown flag
+    MESSAGE_WAIT_SECONDS = 0.1
+
+    # Add or remove at most 1000 accounts in a single subscription message
+    SUBSCRIPTION_BATCH_SIZE = 1000
+
+    # Wait between 250 ms and 30 seconds before reconnecting, doubling
+    # the wait after each failed attempt
+    RECONNECT_MIN_WAIT_SECONDS = 0.25
+    RECONNECT_MAX_WAIT_SECONDS = 30
+
+    # Send a ping every 30 seconds to detect dropped connections
+    HEARTBEAT_INTERVAL_SECONDS = 30
+
+    def __init__(self, *args, shard_index=0, shard_count=1, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.websocket_url = self.config.get("network.nano_node.ws_url")
 
+        # This processor is only responsible for the accounts in its shard
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+
         self.difficulty_subscribed = False
         self.account_subscribed = False
 
+        # Account IDs we should be subscribed to and account IDs
+        # we are currently subscribed to
+        self.account_ids = None
         self.subscribed_account_ids = set()
 
+        # Account IDs that need to be subscribed or unsubscribed
+        # on the next update
+        self.accounts_to_subscribe = set()
+        self.accounts_to_unsubscribe = set()
+
+        # Account IDs that were subscribed when the connection was lost
+        self.missed_account_ids = set()
+
+        # Account additions and removals are received from the main thread
+        # as ("add" or "remove", account ID) tuples
+        self.account_changes = deque()
+        self.callback_ids = []
+
+        self.ws_conn = None
+        self.message_queue = None
+        self.reader_task = None
+
+    @property
+    def connected(self):
+        """
+        Return True if the WebSocket connection is open
+        """
+        return bool(self.ws_conn and not self.ws_conn.closed)
+
+    def add_account_callbacks(self):
+        callbacks = self.account_sync_statuses.callbacks
+
+        def add_change(change, account_id):
+            if self.is_shard_account(account_id):
+                self.account_changes.append((change, account_id))
+
+        self.callback_ids = [
+            (
+                callbacks.account_added,
+                callbacks.account_added.add(
+                    lambda account_id: add_change("add", account_id)
+                )
+            ),
+            (
+                callbacks.account_removed,
+                callbacks.account_removed.add(
+                    lambda account_id: add_change("remove", account_id)
+                )
+            )
+        ]
+
+    def remove_account_callbacks(self):
+        for callback, callback_id in self.callback_ids:
+            callback.remove(callback_id)
+
+        self.callback_ids = []
+
+    def is_shard_account(self, account_id):
+        """
+        Check if the account belongs to this processor's shard
+
+        :param str account_id: Account ID
+        :rtype: bool
+        """
+        return (
+            get_account_shard(account_id, self.shard_count)
+            == self.shard_index
+        )
+
+    def is_subscribed_account(self, account_id):
+        """
+        Check if the account is in the wallet and belongs to this
+        processor's shard. Other shards handle the rest of the accounts.
+
+        :param str account_id: Account ID
+        :rtype: bool
+        """
+        return (
+            account_id in self.account_sync_statuses
+            and self.is_shard_account(account_id)
+        )
+
+    def update_account_ids(self):
+        """
+        Update the set of account IDs we should be subscribed to using
+        the account additions and removals received since the last call
+        """
+        if self.account_ids is None:
+            # Take a snapshot of the accounts once. The callbacks have
+            # already been added, so no changes are missed.
+            self.account_ids = set([
+                sync_status.account_id
+                for sync_status in list(self.account_sync_statuses.values())
+                if self.is_shard_account(sync_status.account_id)
+            ])
+            self.accounts_to_subscribe = \
+                self.account_ids - self.subscribed_account_ids
+
+        while self.account_changes:
+            change, account_id = self.account_changes.popleft()
+
+            if change == "add":
+                self.account_ids.add(account_id)
+                self.accounts_to_unsubscribe.discard(account_id)
+
+                if account_id not in self.subscribed_account_ids:
+                    self.accounts_to_subscribe.add(account_id)
+            else:
+                self.account_ids.discard(account_id)
+                self.accounts_to_subscribe.discard(account_id)
+
+                if account_id in self.subscribed_account_ids:
+                    self.accounts_to_unsubscribe.add(account_id)
+
+    def pop_subscription_changes(self):
+        """
+        Get the account IDs to subscribe to and unsubscribe from since
+        the last call, and mark them as subscribed or unsubscribed.
+
+        Only the changes queued by the account callbacks are processed,
+        so this is cheap when no accounts have been added or removed.
+
+        :returns: (account IDs to subscribe, account IDs to unsubscribe)
+                  tuple of sorted lists
+        :rtype: tuple
+        """
+        self.update_account_ids()
+
+        added_account_ids = sorted(self.accounts_to_subscribe)
+        removed_account_ids = sorted(self.accounts_to_unsubscribe)
+
+        self.subscribed_account_ids.update(added_account_ids)
+        self.subscribed_account_ids.difference_update(removed_account_ids)
+
+        self.accounts_to_subscribe = set()
+        self.accounts_to_unsubscribe = set()
+
+        return added_account_ids, removed_account_ids
+
     async def loop(self):
         """
         The main event loop that continues endlessly until the shutdown
-        flag is activated
+        flag is activated.
+
+        If the connection is lost, it is reopened using exponential
+        backoff.
         """
+        self.add_account_callbacks()
+
         self.session = aiohttp.ClientSession(
             timeout=aiohttp.ClientTimeout(total=self.NETWORK_TIMEOUT_SECONDS)
         )
-        while True:
+
+        failed = False
+        error = None
+        reconnect_attempt = 0
+
+        while not self.shutdown_flag.is_set():
             try:
                 self.ws_conn = await self.session.ws_connect(
-                    self.websocket_url
+                    self.websocket_url,
+                    heartbeat=self.HEARTBEAT_INTERVAL_SECONDS
                 )
-                break
-            except aiohttp.client_exceptions.ClientConnectorError:
-                if self.shutdown_flag.is_set():
-                    await self.session.close()
-                    return
-                else:
-                    await asyncio.sleep(self.NETWORK_ERROR_WAIT_SECONDS)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                await self.wait(self.get_reconnect_wait(reconnect_attempt))
+                reconnect_attempt += 1
+                continue
 
-        logger.info("Starting WebSocket update loop")
+            reconnect_attempt = 0
 
-        failed = False
-        error = None
+            logger.info("Starting WebSocket update loop")
 
-        while not self.shutdown_flag.is_set():
             try:
-                # Update the subscription options (which account IDs are we
-                # following?)
-                await self.update_listen_subscription()
-                await self.listen_for_msg()
+                await self.process_connection()
             except (InvalidBlock, InvalidSignature) as exc:
                 # Abort if invalid blocks are returned
                 failed = True
                 error = exc
                 self.shutdown_flag.set()
-                break
-            except Exception as exc:
-                logger.error(
-                    "Unexpected error during WS network update: %s",
-                    traceback.format_exc()
+            finally:
+                await self.ws_conn.close()
+
+                # Confirmations for the currently subscribed accounts
+                # may be missed until the connection is reopened
+                self.missed_account_ids |= self.subscribed_account_ids
+                self.reset_subscription()
+
+            if not self.shutdown_flag.is_set():
+                logger.warning(
+                    "WebSocket connection to %s was lost, reconnecting",
+                    self.websocket_url
                 )
-                await asyncio.sleep(self.NETWORK_ERROR_WAIT_SECONDS)
-                continue
 
         logger.info("Stopping WebSocket update loop")
 
-        await self.ws_conn.close()
+        self.remove_account_callbacks()
+
         await self.session.close()
 
         if failed:
@@ -87,20 +275,188 @@ class WebSocketProcessor(NetworkProcessorBase):
             )
             self.connection_status.abort(error)
 
-    async def listen_for_msg(self):
+    def get_reconnect_wait(self, reconnect_attempt):
+        """
+        Get the time to wait before the next connection attempt using
+        exponential backoff with jitter
+
+        :param int reconnect_attempt: Amount of failed connection attempts
+                                      in a row
+        :returns: Time to wait in seconds
+        :rtype: float
+        """
+        wait = min(
+            self.RECONNECT_MIN_WAIT_SECONDS * (2 ** reconnect_attempt),
+            self.RECONNECT_MAX_WAIT_SECONDS
+        )
+
+        # Add jitter so that multiple connections don't reconnect
+        # at the same time
+        return random.uniform(wait / 2, wait)
+
+    async def wait(self, seconds):
+        """
+        Wait for the given time or until the shutdown flag is activated
+        """
+        end = time.time() + seconds
+
+        while not self.shutdown_flag.is_set() and time.time() < end:
+            await asyncio.sleep(
+                min(self.MESSAGE_WAIT_SECONDS, end - time.time())
+            )
+
+    def reset_subscription(self):
+        """
+        Reset the subscription state after the connection has been closed
+        """
+        self.difficulty_subscribed = False
+        self.account_subscribed = False
+        self.subscribed_account_ids = set()
+
+        # Every account needs to be subscribed again
+        self.accounts_to_subscribe = set(self.account_ids or ())
+        self.accounts_to_unsubscribe = set()
+
+    async def process_connection(self):
+        """
+        Process messages from the current connection until it is closed
+        or the shutdown flag is activated
+        """
+        self.message_queue = asyncio.Queue()
+        self.reader_task = asyncio.ensure_future(self.read_messages())
+
         try:
-            response = await self.ws_conn.receive_json(timeout=0.1)
-        except asyncio.TimeoutError:
+            async for messages in self.iter_message_batches():
+                try:
+                    # Update the subscription options (which account IDs
+                    # are we following?)
+                    await self.update_listen_subscription()
+                    self.poll_missed_accounts()
+                    await self.process_messages(messages)
+                except (InvalidBlock, InvalidSignature):
+                    raise
+                except Exception:
+                    logger.error(
+                        "Unexpected error during WS network update: %s",
+                        traceback.format_exc()
+                    )
+                    await asyncio.sleep(self.NETWORK_ERROR_WAIT_SECONDS)
+                    continue
+        finally:
+            self.reader_task.cancel()
+            await asyncio.gather(self.reader_task, return_exceptions=True)
+
+    def poll_missed_accounts(self):
+        """
+        Poll the accounts whose confirmations may have been missed while
+        the connection was closed.
+
+        This is done after the accounts have been subscribed again,
+        so that no confirmations are missed in between.
+        """
+        if not self.missed_account_ids:
             return
 
+        missed_account_ids = \
+            self.missed_account_ids & self.subscribed_account_ids
+
+        logger.info(
+            "Polling %d account(s) after reconnecting to WebSocket",
+            len(missed_account_ids)
+        )
+        self.account_ids_to_poll.update(missed_account_ids)
+
+        self.missed_account_ids = set()
+
+    async def read_messages(self):
+        """
+        Read messages from the WebSocket connection into the message queue
+        until the connection is closed
+        """
+        async for msg in self.ws_conn:
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                self.message_queue.put_nowait(msg.data)
+            elif msg.type == aiohttp.WSMsgType.ERROR:
+                break
+
+    async def iter_message_batches(self):
+        """
+        Iterate received messages in batches until the shutdown flag is
+        activated or the connection is closed.
+
+        Each batch contains every message received so far. An empty batch
+        is returned if no messages were received within
+        `MESSAGE_WAIT_SECONDS`.
+        """
+        while not self.shutdown_flag.is_set():
+            if self.reader_task.done() and self.message_queue.empty():
+                # Connection was closed
+                return
+
+            try:
+                messages = [
+                    await asyncio.wait_for(
+                        self.message_queue.get(),
+                        timeout=self.MESSAGE_WAIT_SECONDS
+                    )
+                ]
+            except asyncio.TimeoutError:
+                yield []
+                continue
+
+            while True:
+                try:
+                    messages.append(self.message_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            yield messages
+
+    async def process_messages(self, messages):
+        """
+        Process a batch of received messages in order
+
+        :param list messages: List of messages as JSON strings
+        """
+        for message in messages:
+            try:
+                await self.process_message(json.loads(message))
+            except (InvalidBlock, InvalidSignature):
+                raise
+            except Exception:
+                logger.error(
+                    "Unexpected error while processing WS message: %s",
+                    traceback.format_exc()
+                )
+
+    async def process_message(self, response):
         topic = response["topic"]
         msg = response["message"]
 
         if topic == "confirmation":
+            self.process_broadcast_confirmation_message(response)
             await self.process_block_message(response)
         elif topic == "active_difficulty":
-            self.work_difficulty = validate_difficulty(
-                msg["network_minimum"]
+            self.difficulty_tracker.update(
+                validate_difficulty(msg["network_minimum"])
+            )
+
+    def process_broadcast_confirmation_message(self, response):
+        """
+        Resolve the confirmation of a block we have broadcast ourselves,
+        if the RPC processor is waiting for it
+        """
+        rpc_processor = self.network_plugin.rpc_processor
+
+        if not rpc_processor:
+            return
+
+        block_hash = response["message"]["hash"]
+
+        if rpc_processor.confirmation_tracker.confirm(block_hash):
+            logger.debug(
+                "Received confirmation for broadcast block %s via "
+                "WebSocket", block_hash
             )
 
     async def process_block_message(self, response):
@@ -114,7 +470,7 @@ class WebSocketProcessor(NetworkProcessorBase):
         block_data = msg["block"]
         subtype = msg["block"]["subtype"]
 
-        if account_id in self.account_sync_statuses:
+        if self.is_subscribed_account(account_id):
             await self.process_account_block_message(
                 block_data=block_data,
                 account_id=account_id,
@@ -132,7 +488,7 @@ class WebSocketProcessor(NetworkProcessorBase):
                 block=raw_block,
                 amount=amount
             )
-            if link_block.recipient in self.account_sync_statuses:
+            if self.is_subscribed_account(link_block.recipient):
                 await self.process_pocketable_block_message(
                     block_data=block_data,
                     amount=int(msg["amount"])
@@ -213,34 +569,45 @@ class WebSocketProcessor(NetworkProcessorBase):
         self.pocketable_block_queue.put(link_block)
 
     async def update_listen_subscription(self):
-        if not self.difficulty_subscribed:
+        # Only the first shard needs to track the network difficulty
+        if not self.difficulty_subscribed and self.shard_index == 0:
             await self.ws_conn.send_json({
                 "action": "subscribe",
                 "topic": "active_difficulty"
             })
             self.difficulty_subscribed = True
 
-        # Check which accounts we are supposed to listen for
-        account_ids = set(list(self.account_sync_statuses.keys()))
+        # Only send the accounts that have changed, since subscribing
+        # to every account again could require sending a very large message
+        # and confirmations could be missed in between
+        added_account_ids, removed_account_ids = \
+            self.pop_subscription_changes()
 
-        if account_ids == self.subscribed_account_ids:
+        if not added_account_ids and not removed_account_ids:
             return
 
-        if self.subscribed_account_ids:
-            # Cancel the current subscription if one exists
+        batch_size = self.SUBSCRIPTION_BATCH_SIZE
+
+        if not self.account_subscribed:
             await self.ws_conn.send_json({
-                "action": "unsubscribe",
-                "topic": "confirmation"
+                "action": "subscribe",
+                "topic": "confirmation",
+                "options": {
+                    "confirmation_type": "all",
+                    "accounts": added_account_ids[0:batch_size]
+                }
             })
+            self.account_subscribed = True
+            added_account_ids = added_account_ids[batch_size:]
 
-        await self.ws_conn.send_json({
-            "action": "subscribe",
-            "topic": "confirmation",
-            "options": {
-                "confirmation_type": "all",
-                # The list of accounts is only sorted to make testing easier
-                "accounts": sorted(list(account_ids))
-            }
-        })
-
-        self.subscribed_account_ids = account_ids
+        for i in range(
+                0, max(len(added_account_ids), len(removed_account_ids)),
+                batch_size):
+            await self.ws_conn.send_json({
+                "action": "update",
+                "topic": "confirmation",
+                "options": {
+                    "accounts_add": added_account_ids[i:i+batch_size],
+                    "accounts_del": removed_account_ids[i:i+batch_size]
+                }
+            })
@@ -11,6 +11,7 @@ import click
 from nanolib.work import WORK_DIFFICULTY
 from siliqua.exceptions import ConfigurationError
 from siliqua.network.nano_node import NetworkPlugin as NanoNodeNetworkPlugin
+from siliqua.network.nano_node.verifier import BlockVerifier
 from siliqua.network.nanovault.rpc import RPCProcessor
 from siliqua.network.nanovault.ws import WebSocketProcessor
 
@@ -21,11 +22,21 @@ async def run_rpc_processor(network_plugin):
     await rpc_processor.loop()
 
 
-async def run_websocket_processor(network_plugin):
-    network_plugin.websocket_processor = WebSocketProcessor(network_plugin)
-    logger.info("Starting WebSocket network task...")
-    await network_plugin.websocket_processor.loop()
-    network_plugin.websocket_processor = None
+async def run_websocket_processors(network_plugin):
+    shard_count = network_plugin.websocket_shard_count
+
+    network_plugin.websocket_processors = [
+        WebSocketProcessor(
+            network_plugin, shard_index=shard_index, shard_count=shard_count
+        )
+        for shard_index in range(0, shard_count)
+    ]
+    logger.info("Starting %d WebSocket network task(s)...", shard_count)
+    await asyncio.gather(*[
+        websocket_processor.loop()
+        for websocket_processor in network_plugin.websocket_processors
+    ])
+    network_plugin.websocket_processors = []
 
 
 def run_network_thread(network_plugin):
@@ -42,14 +53,25 @@ def run_network_thread(network_plugin):
 
     if network_plugin.config.get("network.nanovault.ws_url", None):
         # WebSocket is optional
-        tasks.append(run_websocket_processor(network_plugin))
+        tasks.append(run_websocket_processors(network_plugin))
     else:
         logger.info(
             "WebSocket URL not provided, using HTTP polling instead. "
             "Block confirmations will be delayed."
         )
 
-    loop.run_until_complete(asyncio.gather(*tasks))
+    # Large batches of blocks are verified in a process pool to avoid
+    # blocking the event loop
+    network_plugin.block_verifier = BlockVerifier(
+        processes=int(network_plugin.config.get(
+            "network.nanovault.verify_processes", -1
+        ))
+    )
+
+    try:
+        loop.run_until_complete(asyncio.gather(*tasks))
+    finally:
+        network_plugin.block_verifier.shutdown()
 
 
 class NetworkPlugin(NanoNodeNetworkPlugin):
@@ -9,6 +9,9 @@ class RPCProcessor(NanoNodeRPCNetworkProcessor):
     NanoVault servers work identically to NANO nodes, but miss a few
     endpoints we can ignore
     """
+    # NanoVault servers don't expose 'accounts_frontiers'
+    FRONTIER_SYNC_ENABLED = False
+
     async def check_node_version(self):
         protocol_version = self.connection_status.meta.get(
             "protocol_version", None
@@ -45,4 +48,4 @@ class RPCProcessor(NanoNodeRPCNetworkProcessor):
     async def update_active_difficulty(self):
         # NanoVault servers don't seem to report the difficulty in any way?
         # Again, assume things will work out
-        self.work_difficulty = WORK_DIFFICULTY
+        self.difficulty_tracker.update(WORK_DIFFICULTY)
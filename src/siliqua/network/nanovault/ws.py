@@ -1,18 +1,11 @@
-import asyncio
 import time
-import traceback
 
-import aiohttp
-
-from nanolib.exceptions import InvalidBlock, InvalidSignature
 from siliqua.network.nano_node.base import get_raw_block_from_json
 from siliqua.network.nano_node.ws import \
     WebSocketProcessor as NanoNodeWebSocketProcessor
 from siliqua.util import normalize_account_id
 from siliqua.wallet.accounts import LinkBlock
 
-from . import logger
-
 
 class WebSocketProcessor(NanoNodeWebSocketProcessor):
     """
@@ -27,69 +20,9 @@ class WebSocketProcessor(NanoNodeWebSocketProcessor):
 
         self.account_subscribed = False
 
-        self.subscribed_account_ids = set()
-
         self.keepalive_timestamp = time.time()
 
-    async def loop(self):
-        """
-        The main event loop that continues endlessly until the shutdown
-        flag is activated
-        """
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.NETWORK_TIMEOUT_SECONDS)
-        )
-        while True:
-            try:
-                self.ws_conn = await self.session.ws_connect(
-                    self.websocket_url
-                )
-                break
-            except aiohttp.client_exceptions.ClientConnectorError:
-                if self.shutdown_flag.is_set():
-                    await self.session.close()
-                    return
-                else:
-                    await asyncio.sleep(self.NETWORK_ERROR_WAIT_SECONDS)
-
-        logger.info("Starting WebSocket update loop")
-
-        failed = False
-        error = None
-
-        while not self.shutdown_flag.is_set():
-            try:
-                # Update the subscription options (which account IDs are we
-                # following?)
-                await self.update_listen_subscription()
-                await self.listen_for_msg()
-            except (InvalidBlock, InvalidSignature) as exc:
-                # Abort if invalid blocks are returned
-                failed = True
-                error = exc
-                self.shutdown_flag.set()
-                break
-            except Exception as exc:
-                logger.error(
-                    "Unexpected error during WS network update: %s",
-                    traceback.format_exc()
-                )
-                await asyncio.sleep(self.NETWORK_ERROR_WAIT_SECONDS)
-                continue
-
-        logger.info("Stopping WebSocket update loop")
-
-        await self.ws_conn.close()
-        await self.session.close()
-
-        if failed:
-            logger.error(
-                "Network server aborted due to a fatal error in WebSocket "
-                "processor: %s", error
-            )
-            self.connection_status.abort(error)
-
-    async def listen_for_msg(self):
+    async def send_keepalive(self):
         broadcast_keepalive = (
             self.keepalive_timestamp + self.KEEPALIVE_INTERVAL_SECONDS
             < time.time()
@@ -98,11 +31,7 @@ class WebSocketProcessor(NanoNodeWebSocketProcessor):
             await self.ws_conn.send_json({"event": "keepalive"})
             self.keepalive_timestamp = time.time()
 
-        try:
-            response = await self.ws_conn.receive_json(timeout=0.1)
-        except asyncio.TimeoutError:
-            return
-
+    async def process_message(self, response):
         msg = response["data"]
         block_data = msg["block"]
         account_id = normalize_account_id(block_data["account"])
@@ -134,22 +63,20 @@ class WebSocketProcessor(NanoNodeWebSocketProcessor):
             )
 
     async def update_listen_subscription(self):
-        # Check which accounts we are supposed to listen for
-        account_ids = set(list(self.account_sync_statuses.keys()))
+        await self.send_keepalive()
 
-        if account_ids == self.subscribed_account_ids:
-            return
+        # Only subscribe and unsubscribe the accounts that have changed
+        added_account_ids, removed_account_ids = \
+            self.pop_subscription_changes()
 
-        if self.subscribed_account_ids:
-            # Cancel the current subscription if one exists
+        if removed_account_ids:
             await self.ws_conn.send_json({
                 "event": "unsubscribe",
-                "data": list(self.subscribed_account_ids)
+                "data": removed_account_ids
             })
 
-        await self.ws_conn.send_json({
-            "event": "subscribe",
-            "data": list(account_ids)
-        })
-
-        self.subscribed_account_ids = account_ids
+        if added_account_ids:
+            await self.ws_conn.send_json({
+                "event": "subscribe",
+                "data": added_account_ids
+            })
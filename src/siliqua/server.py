@@ -9,18 +9,28 @@ with the instance responsible for launching new threads for network and
 work threads and managing the communication between them. This is
 done for the most part by calling the :meth:`siliqua.server.WalletServer.update`
 in the GUI thread when the user is not using the wallet (eg. sending NANO).
+
+:class:`siliqua.server.AsyncWalletServer` wraps a WalletServer for use in
+asyncio applications, updating it whenever the network or work
+providers have new results instead of on a fixed interval.
 """
 from siliqua import logger as root_logger  # isort:skip
 logger = root_logger.getChild("server")
 
+import asyncio
+import concurrent.futures
+import functools
 import json
+import threading
 import time
+import traceback
 from collections import OrderedDict
+from contextlib import contextmanager
 
 import filelock
 from siliqua.exceptions import WalletFileLocked
 from siliqua.network import BlockProcessError
-from siliqua.wallet import Wallet
+from siliqua.wallet import BlockSigner, Wallet
 from nanolib.work import derive_work_difficulty
 
 
@@ -102,6 +112,10 @@ class WalletServer(object):
     A server comprising a wallet, network provider and work provider
     to provide a functioning wallet
     """
+    # Maximum time to wait for a notification from the network or work
+    # provider before updating the wallet anyway
+    UPDATE_INTERVAL_SECONDS = 1
+
     def __init__(self, config, work, network, wallet):
         """
         :param config: Config instance
@@ -127,6 +141,36 @@ class WalletServer(object):
         self.wallet_path = None
         self.wallet_lock = None
 
+        # If True, saving the wallet is postponed. See :meth:`defer_save`.
+        self.save_deferred = False
+        self.save_pending = False
+
+        self.signer = BlockSigner(
+            processes=config.get("wallet.signing_processes", -1),
+            time_budget=config.get("wallet.signing_time_budget", 0.1)
+        )
+
+        # Set whenever the network or work provider has new results
+        # for the wallet
+        self.update_event = threading.Event()
+        self.callback_id = "wallet_server_{}".format(id(self))
+
+        if self.network:
+            self.network.processed_block_queue.callbacks.blocks_added.add(
+                self.notify_update, self.callback_id
+            )
+            self.network.pocketable_block_queue.callbacks.blocks_added.add(
+                self.notify_update, self.callback_id
+            )
+            self.network.connection_status.callbacks.round_completed.add(
+                self.notify_update, self.callback_id
+            )
+
+        if self.work:
+            self.work.callbacks.work_solved.add(
+                lambda work_unit: self.notify_update(), self.callback_id
+            )
+
     @property
     def ready(self):
         """
@@ -141,6 +185,35 @@ class WalletServer(object):
             and self.network and self.network.ready
         )
 
+    def notify_update(self):
+        """
+        Wake up any thread waiting in :meth:`wait_for_update`.
+        This can be called from any thread.
+        """
+        self.update_event.set()
+
+    def wait_for_update(self, timeout=None):
+        """
+        Wait until the network or work provider has new results, or until
+        the timeout is reached
+
+        :param float timeout: Maximum time to wait in seconds.
+                              Defaults to :attr:`UPDATE_INTERVAL_SECONDS`.
+        :returns: True if a notification was received, False otherwise
+        :rtype: bool
+        """
+        if timeout is None:
+            timeout = self.UPDATE_INTERVAL_SECONDS
+
+        if self.signer.pending:
+            # Collect the remaining signatures right away
+            return True
+
+        notified = self.update_event.wait(timeout)
+        self.update_event.clear()
+
+        return notified
+
     def start_work(self):
         """
         Start the work provider
@@ -167,6 +240,8 @@ class WalletServer(object):
         except ValueError:
             pass
 
+        self.signer.shutdown()
+
         if self.wallet_lock:
             self.close_wallet()
 
@@ -209,10 +284,38 @@ class WalletServer(object):
 
     def save_wallet(self):
         """
-        Save the wallet data
+        Save the wallet data, unless saving has been deferred using
+        :meth:`defer_save`
         """
+        if self.save_deferred:
+            self.save_pending = True
+            return
+
         self.wallet.save(self.wallet_path)
 
+    @contextmanager
+    def defer_save(self):
+        """
+        Context manager to postpone saving the wallet until the block
+        is exited. The wallet is saved once at the end if
+        :meth:`save_wallet` was called inside the block, even if an
+        exception is raised.
+
+        This is useful when running a large amount of commands in a row,
+        since every save writes the entire wallet.
+        """
+        self.save_deferred = True
+        self.save_pending = False
+
+        try:
+            yield
+        finally:
+            self.save_deferred = False
+
+            if self.save_pending:
+                self.save_pending = False
+                self.save_wallet()
+
     def close_wallet(self):
         """
         Closes the wallet by unlocking the corresponding lock file
@@ -369,7 +472,13 @@ class WalletServer(object):
                         )
                     break
 
-                time.sleep(0.2)
+                wait_timeout = self.UPDATE_INTERVAL_SECONDS
+                if timeout:
+                    wait_timeout = min(
+                        wait_timeout, max(start + timeout - end, 0)
+                    )
+
+                self.wait_for_update(timeout=wait_timeout)
 
             return MultipleWaitResult(
                 wait_results=list(wait_results.values()),
@@ -403,7 +512,8 @@ class WalletServer(object):
 
         This should be called regularly (eg. once every second)
         in a wallet application when no other activity is happening (eg.
-        NANO being sent).
+        NANO being sent). :meth:`wait_for_update` can be used to call this
+        as soon as the network or work provider has new results.
         """
         self.network.update_accounts_to_sync(self.wallet)
 
@@ -446,5 +556,414 @@ class WalletServer(object):
 
         # If wallet is unlocked,refill accounts and sign any unsigned blocks
         if self.wallet.secrets_unlocked:
-            self.wallet.sign_blocks()
+            self.wallet.sign_blocks(signer=self.signer)
             self.wallet.refill_accounts()
+
+
+class BlockEvent:
+    """
+    Block event emitted by :class:`AsyncWalletServer`
+
+    :ivar str name: Name of the wallet callback that triggered the event.
+                    One of `block_added`, `block_confirmed`, `block_rejected`,
+                    `block_removed` or `block_received`.
+    :ivar block: Block the event concerns
+    :ivar error: :class:`siliqua.network.BlockProcessError` instance if the
+                 block was rejected
+    """
+    def __init__(self, name, block, error=None):
+        self.name = name
+        self.block = block
+        self.error = error
+
+
+class AsyncWalletServer:
+    """
+    asyncio interface for a :class:`WalletServer`.
+
+    Instead of requiring the caller to poll :meth:`WalletServer.update`,
+    the server is updated whenever the network or work plugin
+    has new results. All wallet operations run in a single dedicated
+    thread, since the wallet itself is not thread-safe; the wallet should
+    only be accessed through :meth:`run` while the server is started.
+    """
+    # Block events forwarded from the wallet callbacks
+    BLOCK_EVENTS = (
+        "block_added", "block_confirmed", "block_rejected",
+        "block_removed", "block_received"
+    )
+
+    # Update the server at least once a second even if no notifications
+    # are received, since not every change (eg. sync status) sends one
+    MAX_UPDATE_INTERVAL_SECONDS = 1
+
+    # How many recently rejected blocks to remember, so that waits started
+    # after a rejection can still resolve
+    RECENT_REJECTION_COUNT = 1000
+
+    def __init__(self, server):
+        """
+        :param server: Wallet server
+        :type server: WalletServer
+        """
+        self.server = server
+
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+        self.loop = None
+        self.update_event = None
+        self.update_task = None
+
+        # Queues of subscribers to block events
+        self.event_queues = []
+
+        # Recently rejected block hashes and their errors
+        self.recent_rejections = OrderedDict()
+
+        self.callback_id = "async_wallet_server_{}".format(id(self))
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Run a function in the wallet thread and return its result
+
+        :param func: Function to run
+        """
+        return await self.loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def start(self):
+        """
+        Start updating the server in the background
+        """
+        self.loop = asyncio.get_event_loop()
+        self.update_event = asyncio.Event()
+
+        network = self.server.network
+        work = self.server.work
+
+        network.processed_block_queue.callbacks.blocks_added.add(
+            self.notify, self.callback_id
+        )
+        network.pocketable_block_queue.callbacks.blocks_added.add(
+            self.notify, self.callback_id
+        )
+        work.callbacks.work_solved.add(
+            lambda work_unit: self.notify(), self.callback_id
+        )
+
+        for name in self.BLOCK_EVENTS:
+            getattr(self.server.wallet.callbacks, name).add(
+                functools.partial(self._add_block_event, name),
+                self.callback_id
+            )
+
+        self.update_task = asyncio.ensure_future(self.update_loop())
+
+    async def stop(self):
+        """
+        Stop updating the server in the background and shutdown the
+        wallet thread
+        """
+        self.update_task.cancel()
+
+        try:
+            await self.update_task
+        except asyncio.CancelledError:
+            pass
+
+        network = self.server.network
+
+        network.processed_block_queue.callbacks.blocks_added.remove(
+            self.callback_id
+        )
+        network.pocketable_block_queue.callbacks.blocks_added.remove(
+            self.callback_id
+        )
+        self.server.work.callbacks.work_solved.remove(self.callback_id)
+
+        for name in self.BLOCK_EVENTS:
+            getattr(self.server.wallet.callbacks, name).remove(
+                self.callback_id
+            )
+
+        self.executor.shutdown(wait=False)
+
+    def notify(self):
+        """
+        Wake up the update loop. This can be called from any thread.
+        """
+        self.loop.call_soon_threadsafe(self.update_event.set)
+
+    def _add_block_event(self, name, block, error=None):
+        # Invoked in the wallet thread
+        self.loop.call_soon_threadsafe(
+            self._dispatch_block_event, BlockEvent(name, block, error)
+        )
+
+    def _dispatch_block_event(self, event):
+        if event.name == "block_rejected":
+            self.recent_rejections[event.block.block_hash] = event.error
+
+            while len(self.recent_rejections) > self.RECENT_REJECTION_COUNT:
+                self.recent_rejections.popitem(last=False)
+
+        for queue in self.event_queues:
+            queue.put_nowait(event)
+
+    def subscribe(self):
+        """
+        Start receiving block events
+
+        :returns: Queue that receives :class:`BlockEvent` instances
+        :rtype: asyncio.Queue
+        """
+        queue = asyncio.Queue()
+        self.event_queues.append(queue)
+
+        return queue
+
+    def unsubscribe(self, queue):
+        """
+        Stop receiving block events
+
+        :param asyncio.Queue queue: Queue returned by :meth:`subscribe`
+        """
+        self.event_queues.remove(queue)
+
+    async def events(self):
+        """
+        Iterate block events as they happen
+
+        :returns: Asynchronous iterator of :class:`BlockEvent` instances
+        """
+        queue = self.subscribe()
+
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.unsubscribe(queue)
+
+    async def update(self):
+        """
+        Run a single round of updates in the wallet thread
+        """
+        await self.run(self.server.update)
+
+        if self.server.signer.pending:
+            # Collect the remaining signatures right away
+            self.update_event.set()
+
+    async def update_loop(self):
+        """
+        Update the server whenever a notification is received
+        """
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self.update_event.wait(),
+                    timeout=self.MAX_UPDATE_INTERVAL_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+
+            self.update_event.clear()
+
+            try:
+                await self.update()
+            except Exception:
+                logger.error(
+                    "Unexpected error during wallet update: %s",
+                    traceback.format_exc()
+                )
+
+    async def send_from(
+            self, source, destination, amount,
+            confirm=True, timeout=None, txid=None,
+            description=None):
+        """
+        Send NANO from a source account to a destination account.
+
+        Parameters are identical to :meth:`WalletServer.send_from`.
+
+        :returns: Created block
+        :rtype: siliqua.wallet.accounts.Block
+        """
+        # Subscribe before the block is created to ensure no events
+        # are missed
+        queue = self.subscribe()
+
+        try:
+            block = await self.run(
+                self.server.wallet.send,
+                source=source, destination=destination, amount=amount,
+                txid=txid, description=description
+            )
+            self.update_event.set()
+
+            if confirm:
+                wait_result = await self._wait_for_blocks(
+                    [block], queue=queue, timeout=timeout
+                )
+                block = wait_result.wait_results[0].block
+        finally:
+            self.unsubscribe(queue)
+
+        return block
+
+    async def wait_for_blocks(self, blocks, timeout=None):
+        """
+        Wait until the given blocks have been confirmed, rejected or until
+        the optional timeout is reached
+
+        :param blocks: List of blocks that await confirmation
+        :param float timeout: Maximum length of time to wait until all blocks
+                              are confirmed and/or rejected
+
+        :returns: MultipleWaitResult instance containing block results
+        :rtype: MultipleWaitResult
+        """
+        queue = self.subscribe()
+
+        try:
+            return await self._wait_for_blocks(
+                blocks, queue=queue, timeout=timeout
+            )
+        finally:
+            self.unsubscribe(queue)
+
+    async def wait_for_block(self, block, timeout=None):
+        """
+        Wait until the given block has been confirmed, rejected or until
+        the optional timeout is reached
+
+        :returns: WaitResult instance containing block result
+        :rtype: WaitResult
+        """
+        result = await self.wait_for_blocks([block], timeout=timeout)
+        return result.wait_results[0]
+
+    async def _wait_for_blocks(self, blocks, queue, timeout=None):
+        remaining_blocks = OrderedDict(
+            (block.block_hash, block) for block in blocks
+        )
+        wait_results = OrderedDict()
+
+        # Blocks may have been confirmed, rejected or removed before
+        # we started waiting
+        def get_block_states():
+            return [
+                (
+                    block, block.confirmed,
+                    self.server.wallet.get_block(block.block_hash) is None
+                )
+                for block in blocks
+            ]
+
+        for block, confirmed, removed in await self.run(get_block_states):
+            block_hash = block.block_hash
+
+            if confirmed:
+                wait_results[block_hash] = WaitResult(
+                    block=block, confirmed=True
+                )
+            elif removed:
+                wait_result = self._get_removed_wait_result(
+                    block, wait_results
+                )
+                if wait_result:
+                    wait_results[block_hash] = wait_result
+            else:
+                continue
+
+            del remaining_blocks[block_hash]
+
+        start = self.loop.time()
+
+        while remaining_blocks:
+            remaining_time = None
+            if timeout is not None:
+                remaining_time = start + timeout - self.loop.time()
+
+                if remaining_time <= 0:
+                    break
+
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=remaining_time
+                )
+            except asyncio.TimeoutError:
+                break
+
+            block = event.block
+            block_hash = block.block_hash
+
+            if block_hash not in remaining_blocks:
+                continue
+
+            if event.name == "block_confirmed":
+                wait_results[block_hash] = WaitResult(
+                    block=block, confirmed=True
+                )
+            elif event.name == "block_rejected":
+                wait_results[block_hash] = WaitResult(
+                    block=block, rejected=True, error=event.error
+                )
+            elif event.name == "block_removed":
+                # Block is removed either as part of a cascading rejection
+                # or for another reason, in which case it won't be
+                # confirmed or rejected anymore
+                wait_result = self._get_removed_wait_result(
+                    block, wait_results
+                )
+                if wait_result:
+                    wait_results[block_hash] = wait_result
+            else:
+                continue
+
+            del remaining_blocks[block_hash]
+
+        if remaining_blocks:
+            logger.info(
+                "Timeout reached but %d block(s) are still remaining",
+                len(remaining_blocks)
+            )
+
+        for block in remaining_blocks.values():
+            wait_results[block.block_hash] = WaitResult(
+                block=block, timeout=True
+            )
+
+        return MultipleWaitResult(
+            wait_results=list(wait_results.values()),
+            complete=not remaining_blocks
+        )
+
+    def _get_removed_wait_result(self, block, wait_results):
+        """
+        Get the wait result for a block that was removed from the wallet
+
+        :returns: WaitResult if the block was rejected, None if it was
+                  removed for another reason
+        :rtype: WaitResult or None
+        """
+        if block.block_hash in self.recent_rejections:
+            return WaitResult(
+                block=block, rejected=True,
+                error=self.recent_rejections[block.block_hash]
+            )
+
+        previous_wait_result = wait_results.get(block.previous, None)
+        previous_rejected = (
+            (previous_wait_result and previous_wait_result.rejected)
+            or block.previous in self.recent_rejections
+        )
+
+        if previous_rejected:
+            return WaitResult(
+                block=block, rejected=True,
+                error=BlockProcessError.PREVIOUS_BLOCK_REJECTED
+            )
+
+        return None
@@ -0,0 +1,561 @@
+"""
+User interface plugin that keeps the wallet loaded, unlocked and in sync
+and exposes the stdio commands through a local JSON-RPC API.
+
+Each request is a JSON-RPC 2.0 call where the method is the name of a stdio
+command and the params are the command's parameters:
+
+.. code-block:: json
+
+    {
+        "jsonrpc": "2.0", "id": 1, "method": "send",
+        "params": {
+            "source": "xrb_...", "destination": "xrb_...", "amount": "1"
+        }
+    }
+
+The result is identical to the JSON printed by the stdio command.
+
+Requests must use the `application/json` content type. Requests sent by
+web browsers, identified by the `Origin` header, are rejected. Requests must
+provide a token using the `Authorization: Bearer <token>` header. If no token
+is configured, a random token is generated and printed on startup. Token is
+only optional when listening on a Unix socket, which is only accessible by
+the daemon's user.
+
+Commands that reveal wallet secrets, change the wallet's encryption or read
+files on the daemon's host are not available.
+"""
+from siliqua import logger as root_logger  # isort:skip
+logger = root_logger.getChild("gui.daemon")
+
+import asyncio
+import hmac
+import ipaddress
+import os
+import secrets
+import signal
+import sys
+import traceback
+from getpass import getpass
+
+import click
+from aiohttp import web
+
+from siliqua.exceptions import WalletFileLocked
+from siliqua.network.exceptions import UnsupportedProtocolVersion
+from siliqua.server import AsyncWalletServer
+from siliqua.ui import BaseUI
+from siliqua.ui.stdio.commands import (BATCH_COMMANDS,
+                                       wait_result_to_dict_and_error)
+from siliqua.ui.stdio.exceptions import (BlockRejected, NetworkTimeout,
+                                         StdioError)
+from siliqua.ui.stdio.util import run_manual_command
+from siliqua.wallet import Wallet
+from siliqua.wallet.exceptions import InvalidEncryptionKey, WalletLocked
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+# Commands that are not available through the daemon:
+# 'sync', since the daemon keeps the wallet in sync on its own, and
+# commands that reveal secrets, change the wallet's encryption or read
+# files on the daemon's host, since the wallet is kept unlocked.
+EXCLUDED_COMMANDS = {
+    "sync", "get_wallet_seed", "get_account_private_key",
+    "change_encryption", "add_accounts_from_file"
+}
+
+# Commands that don't use the loaded wallet are not available either
+DAEMON_COMMANDS = {
+    name: command for name, command in BATCH_COMMANDS.items()
+    if name not in EXCLUDED_COMMANDS
+}
+
+# Commands whose blocks are waited for by the daemon if
+# 'wait_until_confirmed' is enabled, and functions returning the result
+# entries for the blocks. The blocks are waited for outside the wallet
+# thread so that other commands can run in the meantime.
+WAIT_COMMANDS = {
+    "send": lambda data: [data],
+    "send_many": lambda data: data["blocks"]
+}
+
+
+def create_error_response(request_id, code, message):
+    """
+    Create a JSON-RPC error response
+
+    :param request_id: ID of the request
+    :param int code: JSON-RPC error code
+    :param str message: Human readable error message
+
+    :rtype: dict
+    """
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {
+            "code": code,
+            "message": message
+        }
+    }
+
+
+def is_loopback_host(host):
+    """
+    Check if the given host only accepts connections from the local machine
+
+    :param str host: Host name or IP address
+    :rtype: bool
+    """
+    if host == "localhost":
+        return True
+
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def check_request(request, token=None):
+    """
+    Check that a HTTP request is allowed to use the JSON-RPC API
+
+    :param request: HTTP request
+    :type request: aiohttp.web.Request
+    :param str token: Token the request must provide in the `Authorization`
+                      header, if any
+
+    :raises aiohttp.web.HTTPForbidden: Request was sent by a web browser
+    :raises aiohttp.web.HTTPUnsupportedMediaType: Request doesn't contain
+                                                  JSON
+    :raises aiohttp.web.HTTPUnauthorized: Token is missing or incorrect
+    """
+    if "Origin" in request.headers:
+        # Don't allow web pages to use the API through the user's browser
+        raise web.HTTPForbidden(text="Cross-origin requests are not allowed")
+
+    if request.content_type != "application/json":
+        raise web.HTTPUnsupportedMediaType(
+            text="Content type must be application/json"
+        )
+
+    if token:
+        authorization = request.headers.get("Authorization", "")
+        expected = "Bearer {}".format(token)
+
+        if not hmac.compare_digest(
+                authorization.encode("utf-8"), expected.encode("utf-8")):
+            raise web.HTTPUnauthorized(
+                text="Invalid or missing token",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+
+
+def apply_wait_results(server, result, entries, multiwait_result):
+    """
+    Update a command's result with the results of waiting for its blocks.
+    This is run in the wallet thread.
+
+    :param server: Wallet server
+    :type server: siliqua.server.WalletServer
+    :param result: Command result
+    :type result: siliqua.ui.stdio.util.StdioResult
+    :param list entries: Result entries for each block
+    :param multiwait_result: Results for the blocks
+    :type multiwait_result: siliqua.server.MultipleWaitResult
+
+    :returns: Updated command result
+    :rtype: siliqua.ui.stdio.util.StdioResult
+    """
+    wait_results = {
+        wait_result.block.block_hash: wait_result
+        for wait_result in multiwait_result.wait_results
+    }
+
+    for entry in entries:
+        wait_result = wait_results.get(entry["hash"], None)
+
+        if not wait_result:
+            # Block was removed from the wallet without being rejected
+            continue
+
+        if wait_result.rejected:
+            del entry["hash"]
+
+        entry.update(wait_result_to_dict_and_error(wait_result)[0])
+        entry["has_valid_work"] = wait_result.block.has_valid_work
+
+    if multiwait_result.rejected_results:
+        result.error = BlockRejected
+    elif not multiwait_result.complete:
+        result.error = NetworkTimeout
+
+    server.save_wallet()
+
+    return result
+
+
+class DaemonUI(BaseUI):
+    """
+    User interface plugin that runs the wallet as a long-running daemon
+    with a JSON-RPC API
+    """
+    def get_cli(self):
+        """
+        Get Click command with the daemon's options
+        """
+        return click.Command(
+            name="daemon",
+            params=[
+                click.Option(
+                    ["--host"],
+                    default=self.config.get("ui.daemon.host", "127.0.0.1"),
+                    help="Address to listen on"
+                ),
+                click.Option(
+                    ["--port"], type=int,
+                    default=self.config.get("ui.daemon.port", 7090),
+                    help="Port to listen on"
+                ),
+                click.Option(
+                    ["--socket", "socket_path"],
+                    type=click.Path(dir_okay=False),
+                    default=self.config.get("ui.daemon.socket", None),
+                    help=(
+                        "Unix socket to listen on instead of "
+                        "the host and port"
+                    )
+                ),
+                click.Option(
+                    ["--passphrase"], default="", show_envvar=True,
+                    envvar="PASSPHRASE",
+                    help="Passphrase for an encrypted wallet"
+                ),
+                click.Option(
+                    ["--token"], show_envvar=True,
+                    envvar="DAEMON_TOKEN",
+                    default=self.config.get("ui.daemon.token", None),
+                    help=(
+                        "Token clients must provide using the "
+                        "'Authorization: Bearer <token>' header. "
+                        "If not provided, a random token is generated "
+                        "unless listening on a Unix socket."
+                    )
+                )
+            ]
+        )
+
+    def run(
+            self, server, ctx, wallet, host, port, socket_path,
+            passphrase, token=None, **kwargs):
+        """
+        Load and unlock the wallet and serve the JSON-RPC API until
+        the daemon is interrupted
+        """
+        if not wallet:
+            raise click.UsageError("--wallet is required")
+
+        if not token and not socket_path:
+            if not is_loopback_host(host):
+                raise click.UsageError(
+                    "--token is required when listening on a non-loopback "
+                    "address"
+                )
+
+            token = secrets.token_urlsafe(32)
+            click.echo("Generated daemon token: {}".format(token), err=True)
+
+        try:
+            server.work.validate_config()
+            server.network.validate_config()
+
+            if Wallet.is_wallet_file_encrypted(wallet) and not passphrase \
+                    and sys.stdout.isatty():
+                passphrase = getpass("Passphrase: ")
+
+            server.load_wallet(path=wallet, passphrase=passphrase)
+
+            if server.wallet.encryption.secrets_encrypted:
+                if not passphrase:
+                    raise WalletLocked
+
+                # The wallet is kept unlocked for the daemon's lifetime
+                # to avoid deriving the key for every command
+                server.wallet.unlock(passphrase)
+        except InvalidEncryptionKey:
+            raise click.ClickException("Incorrect passphrase")
+        except WalletLocked:
+            raise click.ClickException(
+                "Wallet is encrypted but no passphrase was provided"
+            )
+        except WalletFileLocked:
+            raise click.ClickException(
+                "Wallet is locked and in use by another process"
+            )
+
+        try:
+            server.start_work()
+            server.start_network()
+
+            try:
+                server.network.wait_for_connection(timeout=5)
+            except TimeoutError:
+                raise click.ClickException(
+                    "Network plugin couldn't establish a connection."
+                )
+            except UnsupportedProtocolVersion as exc:
+                raise click.ClickException(
+                    "NANO node only supports protocol version "
+                    f"{exc.current_version} while "
+                    f"protocol version {exc.required_version} is "
+                    "required"
+                )
+
+            # asyncio.run() is not available in Python 3.6
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+
+            try:
+                loop.run_until_complete(
+                    self.serve(
+                        AsyncWalletServer(server), host=host, port=port,
+                        socket_path=socket_path, token=token
+                    )
+                )
+            finally:
+                loop.close()
+        finally:
+            if server.wallet_lock:
+                server.save_wallet()
+
+            server.stop()
+
+    def create_app(self, async_server, token=None):
+        """
+        Create the aiohttp application serving the JSON-RPC API
+
+        :param async_server: Wallet server
+        :type async_server: siliqua.server.AsyncWalletServer
+        :param str token: Token clients must provide in the `Authorization`
+                          header. If not provided, clients don't need
+                          to authenticate.
+        :rtype: aiohttp.web.Application
+        """
+        async def handle_request(request):
+            check_request(request, token=token)
+            return await self.handle_request(async_server, request)
+
+        app = web.Application()
+        app.router.add_post("/", handle_request)
+
+        return app
+
+    async def serve(
+            self, async_server, host, port, socket_path=None, token=None):
+        """
+        Serve the JSON-RPC API until SIGINT or SIGTERM is received
+
+        :param async_server: Wallet server
+        :type async_server: siliqua.server.AsyncWalletServer
+        :param str host: Address to listen on
+        :param int port: Port to listen on
+        :param str socket_path: Unix socket to listen on instead of
+                                `host` and `port`
+        :param str token: Token clients must provide in the `Authorization`
+                          header, if any
+        """
+        loop = asyncio.get_event_loop()
+        shutdown_event = asyncio.Event()
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, shutdown_event.set)
+            except NotImplementedError:
+                # Signal handlers are not supported on Windows
+                pass
+
+        runner = web.AppRunner(self.create_app(async_server, token=token))
+        await runner.setup()
+
+        if socket_path:
+            site = web.UnixSite(runner, socket_path)
+        else:
+            site = web.TCPSite(runner, host, port)
+
+        await async_server.start()
+
+        if socket_path:
+            # Only the daemon's user is allowed to use the socket.
+            # Set the permissions when the socket is created, so that
+            # it's never accessible by other users.
+            umask = os.umask(0o177)
+
+            try:
+                await site.start()
+            finally:
+                os.umask(umask)
+        else:
+            await site.start()
+
+        logger.info("Daemon listening on %s", site.name)
+
+        try:
+            await shutdown_event.wait()
+        finally:
+            logger.info("Stopping daemon")
+            await runner.cleanup()
+            await async_server.stop()
+
+    async def handle_request(self, async_server, request):
+        """
+        Handle a JSON-RPC request containing a single call or a batch
+        of calls
+        """
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.json_response(
+                create_error_response(None, PARSE_ERROR, "Parse error")
+            )
+
+        if isinstance(payload, list):
+            if not payload:
+                return web.json_response(
+                    create_error_response(
+                        None, INVALID_REQUEST, "Invalid request"
+                    )
+                )
+
+            # Calls waiting for confirmations don't hold up the rest
+            responses = await asyncio.gather(*[
+                self.process_call(async_server, call) for call in payload
+            ])
+
+            return web.json_response(list(responses))
+
+        return web.json_response(
+            await self.process_call(async_server, payload)
+        )
+
+    async def process_call(self, async_server, call):
+        """
+        Run a single JSON-RPC call in the wallet thread
+
+        :param async_server: Wallet server
+        :type async_server: siliqua.server.AsyncWalletServer
+        :param call: JSON-RPC call
+
+        :returns: JSON-RPC response
+        :rtype: dict
+        """
+        if not isinstance(call, dict):
+            return create_error_response(
+                None, INVALID_REQUEST, "Invalid request"
+            )
+
+        request_id = call.get("id", None)
+        method = call.get("method", None)
+        params = call.get("params", {})
+
+        if not isinstance(method, str) or not isinstance(params, dict):
+            return create_error_response(
+                request_id, INVALID_REQUEST, "Invalid request"
+            )
+
+        # Accept both 'list-accounts' and 'list_accounts'
+        name = method.replace("-", "_")
+
+        try:
+            command = DAEMON_COMMANDS[name]
+        except KeyError:
+            return create_error_response(
+                request_id, METHOD_NOT_FOUND, "Method not found"
+            )
+
+        try:
+            result = (await self.run_command(
+                async_server, name, command, params
+            )).to_dict()
+        except StdioError as exc:
+            result = exc.to_dict()
+        except ValueError as exc:
+            return create_error_response(
+                request_id, INVALID_PARAMS, str(exc)
+            )
+        except Exception:
+            logger.error(
+                "Unexpected error when running '%s': %s",
+                method, traceback.format_exc()
+            )
+            return create_error_response(
+                request_id, INTERNAL_ERROR, "Internal error"
+            )
+
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "result": result
+        }
+
+    async def run_command(self, async_server, name, command, params):
+        """
+        Run a command in the wallet thread. If the command waits for its
+        blocks to be confirmed, the blocks are waited for outside the
+        wallet thread instead.
+
+        :param async_server: Wallet server
+        :type async_server: siliqua.server.AsyncWalletServer
+        :param str name: Command name
+        :param command: Stdio command
+        :param dict params: Command parameters
+
+        :raises ValueError: If a parameter is invalid
+        :raises StdioError: If the command failed
+        :returns: Command result
+        :rtype: siliqua.ui.stdio.util.StdioResult
+        """
+        cli_params = {param.name: param for param in command.cli_params}
+        wait_until_confirmed = False
+
+        if "wait_until_confirmed" in cli_params:
+            wait_until_confirmed = cli_params["wait_until_confirmed"].parse(
+                params.get("wait_until_confirmed", None)
+            )
+
+            if wait_until_confirmed and name not in WAIT_COMMANDS:
+                raise ValueError(
+                    "'wait_until_confirmed' is not supported by the daemon "
+                    "for this command"
+                )
+
+            params = dict(params, wait_until_confirmed=False)
+
+        result = await async_server.run(
+            run_manual_command, async_server.server, command, params
+        )
+
+        if not wait_until_confirmed or result.error:
+            return result
+
+        # Timeout of 0 means no timeout
+        timeout = cli_params["timeout"].parse(params.get("timeout", None))
+        entries = WAIT_COMMANDS[name](result.data)
+        wallet = async_server.server.wallet
+
+        blocks = await async_server.run(
+            lambda: [wallet.get_block(entry["hash"]) for entry in entries]
+        )
+        multiwait_result = await async_server.wait_for_blocks(
+            blocks, timeout=timeout or None
+        )
+
+        return await async_server.run(
+            apply_wait_results, async_server.server, result, entries,
+            multiwait_result
+        )
@@ -1,4 +1,6 @@
+import json
 import os.path
+import sys
 import time
 from collections import OrderedDict, defaultdict
 
@@ -12,8 +14,8 @@ from siliqua.wallet import \
 from siliqua.wallet.exceptions import AccountAlreadyExists, InsufficientBalance
 
 from . import logger
-from .exceptions import (AccountNotFound, BlockNotFound, BlockRejected,
-                         LinkBlockNotAllowed, MissingPassphrase,
+from .exceptions import (AccountNotFound, BatchCommandFailed, BlockNotFound,
+                         BlockRejected, LinkBlockNotAllowed, MissingPassphrase,
                          NetworkTimeout, SeedRequired,
                          SpendableAccountRequired, StdioError, WalletExists)
 from .params import (AccountOption, AccountParam, AmountParam, BlockHashParam,
@@ -22,7 +24,8 @@ from .params import (AccountOption, AccountParam, AmountParam, BlockHashParam,
                      PassphraseOption, PrivateKeyOption, PublicKeyOption,
                      RepeatParams, SecureStrOption, StrOption, StrParam)
 from .util import (StdioResult, cli_command, paginate_list,
-                   truncate_ordered_dict, unlock_wallet)
+                   run_manual_command, start_providers, truncate_ordered_dict,
+                   unlock_wallet)
 
 
 def get_default_key_iteration_count():
@@ -372,6 +375,52 @@ def add_account(
     return StdioResult({"account_id": account.account_id})
 
 
+@cli_command(
+    short_help_text="Add accounts into a wallet from a file of private keys",
+    help_text=(
+        "Add accounts into a wallet using private keys read from a file. "
+        "The file should contain one private key per line.\n\n"
+        "Private keys that are invalid or belong to accounts already in the "
+        "wallet are skipped and reported using their line numbers."
+    ),
+    start_work=False, start_network=False
+)
+def add_accounts_from_file(
+        server,
+        passphrase: PassphraseOption,
+        path: FilePathParam(exists=True)):
+    line_numbers = []
+
+    def read_private_keys(f):
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+
+            line_numbers.append(line_number)
+            yield line
+
+    with unlock_wallet(server=server, passphrase=passphrase):
+        with open(path, "r") as f:
+            accounts, errors = server.wallet.add_accounts_from_private_keys(
+                read_private_keys(f)
+            )
+
+    server.save_wallet()
+
+    return StdioResult({
+        "added_count": len(accounts),
+        "invalid_lines": [
+            line_numbers[index] for index, exc in errors
+            if not isinstance(exc, AccountAlreadyExists)
+        ],
+        "existing_lines": [
+            line_numbers[index] for index, exc in errors
+            if isinstance(exc, AccountAlreadyExists)
+        ]
+    })
+
+
 @cli_command(
     short_help_text="Remove account from a wallet",
     help_text="Remove account from a wallet",
@@ -492,23 +541,25 @@ def sync(
 
     # Register callbacks
     server.wallet.callbacks.block_removed.add(
-        lambda b: remove_block(new_blocks, received_blocks, b)
+        lambda b: remove_block(new_blocks, received_blocks, b), "sync"
     )
     server.wallet.callbacks.block_added.add(
-        lambda b: add_block(new_blocks, rejected_blocks, b)
+        lambda b: add_block(new_blocks, rejected_blocks, b), "sync"
     )
     server.wallet.callbacks.block_received.add(
-        lambda b: receive_block(received_blocks, b)
+        lambda b: receive_block(received_blocks, b), "sync"
     )
     server.wallet.callbacks.block_rejected.add(
         lambda block, error: reject_block(
             rejected_blocks, new_blocks, block, error
-        )
+        ),
+        "sync"
     )
     server.wallet.callbacks.work_unit_completed.add(
         lambda work_unit: complete_work_unit(
             completed_work_units, work_unit
-        )
+        ),
+        "sync"
     )
 
     start = time.time()
@@ -529,7 +580,14 @@ def sync(
 
             postpone_timeout = False
 
-            time.sleep(0.1)
+            # Wait until the network or work provider has something new
+            # for us, without waiting past the timeout
+            wait_timeout = server.UPDATE_INTERVAL_SECONDS
+            remaining_time = start + timeout - time.time()
+            if remaining_time > 0:
+                wait_timeout = min(wait_timeout, remaining_time)
+
+            server.wait_for_update(timeout=wait_timeout)
             current = time.time()
 
             # Postpone timeout if something needs to be done first
@@ -546,6 +604,13 @@ def sync(
                 >= network_round_count + 2
             )
 
+    # Remove the callbacks in case the server is used for other commands
+    # afterwards (eg. in the daemon)
+    for name in (
+            "block_removed", "block_added", "block_received",
+            "block_rejected", "work_unit_completed"):
+        getattr(server.wallet.callbacks, name).remove("sync")
+
     new_block_entries = defaultdict(list)
     for block in new_blocks.values():
         entry = {
@@ -1060,6 +1125,138 @@ def remove_from_address_book(
     })
 
 
+@cli_command(
+    short_help_text="Run multiple commands from a file or stdin",
+    help_text=(
+        "Run multiple commands from a file, or stdin if the path is '-', "
+        "while loading and saving the wallet only once.\n\n"
+        "Each line should be a JSON object containing the command name "
+        "in 'command' and its parameters in 'params', eg. "
+        '{"command": "set-account-name", '
+        '"params": {"account_id": "xrb_...", "name": "Savings"}}. '
+        "An optional 'id' is included in the command's result.\n\n"
+        "Each result is printed on a single line as soon as the command "
+        "is finished, followed by a summary."
+    ),
+    start_work=False, start_network=False
+)
+def batch(
+        server,
+        passphrase: PassphraseOption,
+        path: StrParam,
+        stop_on_error: BoolOption(default=False)):
+    # Work and network providers are only started once a command
+    # requires them
+    providers_started = {"work": False, "network": False}
+
+    def run_command(entry):
+        if not isinstance(entry, dict) \
+                or not isinstance(entry.get("command", None), str) \
+                or not isinstance(entry.get("params", {}), dict):
+            raise StdioError(
+                "invalid_batch_command",
+                "Command is not a JSON object with a 'command' and optional "
+                "'params' field"
+            )
+
+        command_name = entry["command"]
+        command = BATCH_COMMANDS.get(command_name.replace("-", "_"), None)
+
+        if not command:
+            raise StdioError(
+                "command_not_found",
+                "Command '{}' not found".format(command_name)
+            )
+
+        start_work = command.start_work and not providers_started["work"]
+        start_network = \
+            command.start_network and not providers_started["network"]
+
+        start_providers(
+            server, start_work=start_work, start_network=start_network
+        )
+        providers_started["work"] |= start_work
+        providers_started["network"] |= start_network
+
+        params = entry.get("params", {})
+
+        if passphrase and "passphrase" in (
+                param.name for param in command.cli_params):
+            # Commands that need wallet secrets unlock the wallet
+            # themselves using the batch passphrase
+            params = dict(params)
+            params.setdefault("passphrase", passphrase)
+
+        try:
+            return run_manual_command(server, command, params)
+        except ValueError as exc:
+            raise StdioError("invalid_parameter", str(exc))
+
+    def run_commands(f):
+        command_count = 0
+        error_count = 0
+
+        with server.defer_save():
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+
+                command_count += 1
+                entry = None
+
+                try:
+                    entry = json.loads(line)
+                    result = run_command(entry).to_dict()
+                except ValueError:
+                    result = StdioError(
+                        "invalid_batch_command",
+                        "Command is not valid JSON"
+                    ).to_dict()
+                except StdioError as exc:
+                    result = exc.to_dict()
+
+                result["line"] = line_number
+
+                if isinstance(entry, dict) and "id" in entry:
+                    result["id"] = entry["id"]
+
+                print(json.dumps(result, sort_keys=True), flush=True)
+
+                if result["status"] == "error":
+                    error_count += 1
+
+                    if stop_on_error:
+                        break
+
+        return StdioResult(
+            {
+                "command_count": command_count,
+                "error_count": error_count
+            },
+            error=BatchCommandFailed if error_count else None,
+            compact=True
+        )
+
+    if path == "-":
+        return run_commands(sys.stdin)
+
+    try:
+        f = open(path, "r")
+    except FileNotFoundError:
+        raise StdioError(
+            "file_not_found", "File '{}' does not exist".format(path)
+        )
+    except OSError as exc:
+        raise StdioError(
+            "file_unreadable",
+            "File '{}' could not be read: {}".format(path, exc.strerror)
+        )
+
+    with f:
+        return run_commands(f)
+
+
 COMMANDS = [
     create_wallet,
     calculate_key_iteration_count,
@@ -1068,6 +1265,7 @@ COMMANDS = [
     get_wallet_seed,
     get_balance,
     add_account,
+    add_accounts_from_file,
     remove_account,
     generate_account,
     sync,
@@ -1084,5 +1282,14 @@ COMMANDS = [
     set_block_description,
     clear_block_description,
     add_to_address_book,
-    remove_from_address_book
+    remove_from_address_book,
+    batch
 ]
+
+COMMAND_MAP = {command.__name__: command for command in COMMANDS}
+
+# Commands that can be run using 'batch'
+BATCH_COMMANDS = {
+    name: command for name, command in COMMAND_MAP.items()
+    if command.wallet_required and command is not batch
+}
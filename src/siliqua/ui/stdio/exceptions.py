@@ -10,14 +10,20 @@ class StdioError(Exception):
         self.code = code
         self.message = message
 
+    def to_dict(self):
+        """
+        Get the error as a dict
+
+        :rtype: dict
+        """
+        return {
+            "status": "error",
+            "data": {"error": self.code},
+            "message": self.message
+        }
+
     def show(self):
-        print(
-            json.dumps({
-                "status": "error",
-                "data": {"error": self.code},
-                "message": self.message
-            }, indent=4, sort_keys=True)
-        )
+        print(json.dumps(self.to_dict(), indent=4, sort_keys=True))
 
 
 def create_error(code, message):
@@ -64,3 +70,7 @@ NetworkTimeout = create_error(
     "network_timeout",
     "The operation could not be finished in the given time."
 )
+BatchCommandFailed = create_error(
+    "batch_command_failed",
+    "At least one command in the batch failed."
+)
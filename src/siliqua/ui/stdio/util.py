@@ -60,16 +60,25 @@ class StdioResult:
 
     Result can be printed in JSON format
     """
-    def __init__(self, data=None, error=None):
+    def __init__(self, data=None, error=None, compact=False):
+        """
+        :param dict data: Result data
+        :param error: Error if the command failed
+        :type error: siliqua.ui.stdio.exceptions.StdioError or None
+        :param bool compact: Whether to print the result on a single line
+        """
         if not data:
             data = {}
 
         self.data = data
         self.error = error
+        self.compact = compact
 
-    def show(self):
+    def to_dict(self):
         """
-        Print the result to stdio in JSON format
+        Get the result as a dict
+
+        :rtype: dict
         """
         status = "success" if not self.error else "error"
 
@@ -87,7 +96,18 @@ class StdioResult:
             result["data"]["error"] = self.error.code
             result["message"] = self.error.message
 
-        print(json.dumps(result, indent=4, sort_keys=True))
+        return result
+
+    def show(self):
+        """
+        Print the result to stdio in JSON format
+        """
+        print(
+            json.dumps(
+                self.to_dict(), indent=None if self.compact else 4,
+                sort_keys=True
+            )
+        )
 
 
 def raise_common_error(exc):
@@ -148,6 +168,40 @@ def parse_manual_params(func, kwargs):
     return parsed_kwargs
 
 
+def run_manual_command(server, func, kwargs):
+    """
+    Run a stdio command against a server that already has its wallet
+    loaded and providers started, using a dict of parameters.
+
+    This is used when running commands outside the Click-based
+    interface (eg. in the daemon)
+
+    :param server: Wallet server
+    :type server: siliqua.server.WalletServer
+    :param func: Stdio command
+    :param dict kwargs: Command parameters
+
+    :raises ValueError: If a parameter is invalid
+    :raises StdioError: If the command failed
+    :returns: Command result
+    :rtype: StdioResult
+    """
+    kwargs = parse_manual_params(func, kwargs)
+
+    # Convert empty string parameters to None
+    kwargs = {
+        k: None if v == "" else v for k, v in kwargs.items()
+    }
+
+    try:
+        # Call the undecorated command, since the wallet is already loaded
+        return func.__wrapped__(server=server, **kwargs)
+    except StdioError:
+        raise
+    except Exception as exc:
+        raise_common_error(exc)
+
+
 def get_cli_params(func):
     """
     Return a list of stdio command's parameters by iterating through
@@ -172,6 +226,37 @@ def get_cli_params(func):
     return cli_params
 
 
+def start_providers(server, start_work=True, start_network=True):
+    """
+    Start the work and/or network provider and wait until the network
+    provider has established a connection
+
+    :param server: Wallet server
+    :type server: siliqua.server.WalletServer
+    :param bool start_work: Whether to start the work provider
+    :param bool start_network: Whether to start the network provider
+    """
+    if start_work:
+        server.start_work()
+    if start_network:
+        server.start_network()
+        try:
+            server.network.wait_for_connection(timeout=5)
+        except TimeoutError:
+            raise StdioError(
+                "network_connection_failure",
+                "Network plugin couldn't establish a connection."
+            )
+        except UnsupportedProtocolVersion as exc:
+            raise StdioError(
+                "unsupported_protocol_version",
+                "NANO node only supports protocol version "
+                f"{exc.current_version} while "
+                f"protocol version {exc.required_version} is "
+                "required"
+            )
+
+
 def cli_command(
         wallet_required=True,
         help_text=None,
@@ -283,25 +368,10 @@ def cli_command(
 
                 kwargs["server"] = server
 
-                if start_work:
-                    server.start_work()
-                if start_network:
-                    server.start_network()
-                    try:
-                        server.network.wait_for_connection(timeout=5)
-                    except TimeoutError:
-                        raise StdioError(
-                            "network_connection_failure",
-                            "Network plugin couldn't establish a connection."
-                        )
-                    except UnsupportedProtocolVersion as exc:
-                        raise StdioError(
-                            "unsupported_protocol_version",
-                            "NANO node only supports protocol version "
-                            f"{exc.current_version} while "
-                            f"protocol version {exc.required_version} is "
-                            "required"
-                        )
+                start_providers(
+                    server, start_work=start_work,
+                    start_network=start_network
+                )
 
                 del kwargs["wallet_path"]
 
@@ -342,8 +412,15 @@ def unlock_wallet(*args, **kwargs):
 
         return val
 
+    if server.wallet.secret_key:
+        # Wallet was already unlocked by the caller (eg. the daemon),
+        # so leave it unlocked afterwards
+        yield peek
+        return
+
     if not passphrase and not server.wallet.secrets_unlocked:
-        print("Passphrase required to access wallet secrets.")
+        # Print the prompt to stderr to keep it separate from the results
+        print("Passphrase required to access wallet secrets.", file=sys.stderr)
         passphrase = getpass("Passphrase: ")
 
     try:
@@ -4,6 +4,7 @@ logger = root_logger.getChild("wallet")
 
 from .accounts import *
 from .secret import *
+from .signer import *
 from .util import *
 from .wallet import *
 from .exceptions import *
@@ -15,7 +15,8 @@ from .util import (HexDict, Timestamp, TimestampSource, WalletSerializable,
                    get_current_timestamp, wallet_parameter)
 
 __all__ = (
-    "AccountSource", "BlockProxy", "Account", "LinkBlock", "Block"
+    "AccountSource", "BlockProxy", "Account", "LinkBlock", "Block",
+    "BlockSnapshot"
 )
 
 # Representative to use if no representative hasn't been assigned
@@ -320,6 +321,77 @@ class Block(WalletSerializable, BlockProxy):
     confirmed = property(lambda x: x._confirmed, set_confirmed)
 
 
+class BlockSnapshot(BlockProxy):
+    """
+    Immutable snapshot of a :class:`Block`.
+
+    Snapshots are used to hand blocks over to the network thread.
+    Since the snapshot can't be modified, the same snapshot can be shared
+    between threads and reused until the wallet's block changes.
+    """
+    __slots__ = ("_block", "_link_block", "_confirmed")
+
+    def __init__(self, block):
+        """
+        :param block: Block to create a snapshot of
+        :type block: Block
+        """
+        link_block = None
+        if block.link_block:
+            link_block = LinkBlock.from_dict(block.link_block.to_dict())
+
+        object.__setattr__(
+            self, "_block", RawBlock.from_dict(block.block_data, verify=False)
+        )
+        object.__setattr__(self, "_link_block", link_block)
+        object.__setattr__(self, "_confirmed", block.confirmed)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Block snapshots are immutable")
+
+    def __deepcopy__(self, memodict):
+        # Immutable snapshots never need to be copied
+        return self
+
+    def is_current(self, block):
+        """
+        Check if the snapshot is still up-to-date with the given block.
+
+        Block hash doesn't cover the signature or the proof-of-work,
+        so compare them separately.
+
+        :param block: Block the snapshot was created from
+        :type block: Block
+        :rtype: bool
+        """
+        return (
+            self.block_hash == block.block_hash
+            and self.signature == block.signature
+            and self.work == block.work
+            and self.confirmed == block.confirmed
+        )
+
+    def to_block(self):
+        """
+        Create a new :class:`Block` from the snapshot
+
+        :rtype: Block
+        """
+        link_block = None
+        if self.link_block:
+            link_block = LinkBlock.from_dict(self.link_block.to_dict())
+
+        return Block(
+            block_data=self.block.to_dict(), link_block=link_block,
+            confirmed=self.confirmed
+        )
+
+    block = property(lambda x: x._block)
+    block_data = property(lambda x: x._block.to_dict())
+    link_block = property(lambda x: x._link_block)
+    confirmed = property(lambda x: x._confirmed)
+
+
 class PrecomputedWork(WalletSerializable):
     """
     Precomputed work object consisting of the work nonce and the difficulty
@@ -775,7 +847,7 @@ class Account(WalletSerializable):
         self.update_confirmed_head()
 
         if callbacks:
-            callbacks.block_confirmed.invoke(block)
+            callbacks.block_confirmed.invoke(account_block)
 
     @wallet_parameter
     def set_account_id(self, account_id):
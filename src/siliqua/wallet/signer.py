@@ -0,0 +1,211 @@
+"""
+Batched block signing.
+
+Signing a large backlog of blocks (eg. after a send-many or a bulk
+representative change) one block at a time can block the main thread
+for a long time. :class:`BlockSigner` groups the blocks by account and
+signs them in a process pool, only waiting for the results for a limited
+amount of time on each call.
+"""
+import concurrent.futures
+import os
+import time
+from binascii import hexlify, unhexlify
+
+from ed25519_blake2b import SigningKey
+
+from . import logger
+
+__all__ = ("BlockSigner", "sign_block_hashes")
+
+
+def sign_block_hashes(private_key, block_hashes):
+    """
+    Sign a list of block hashes using the same private key.
+
+    This is run in a worker process.
+
+    :param str private_key: Private key used to sign the blocks
+    :param list block_hashes: List of block hashes to sign
+
+    :returns: List of signatures in the same order as the block hashes
+    :rtype: list
+    """
+    signing_key = SigningKey(unhexlify(private_key))
+
+    return [
+        hexlify(signing_key.sign(msg=unhexlify(block_hash))).decode()
+        for block_hash in block_hashes
+    ]
+
+
+class BlockSigner:
+    """
+    Signer that signs blocks in batches using a process pool.
+
+    Small amounts of blocks are signed directly in the calling thread
+    to avoid the overhead of the process pool.
+    """
+    # If there are fewer blocks to sign than this, sign them in the
+    # calling thread instead
+    MIN_POOL_BLOCK_COUNT = 64
+
+    # Maximum amount of blocks to sign in a single worker task
+    BATCH_SIZE = 256
+
+    def __init__(self, processes=-1, time_budget=0.1):
+        """
+        :param int processes: Amount of worker processes to use.
+                              -1 uses half of logical CPU cores.
+        :param float time_budget: Maximum time in seconds to wait for
+                                  signatures on each call
+        """
+        if processes == -1:
+            processes = max(int(os.cpu_count() / 2), 1)
+
+        self.processes = int(processes)
+        self.time_budget = float(time_budget)
+
+        self.pool = None
+
+        # Futures for the batches currently being signed and the
+        # block hashes included in them
+        self.pending_batches = {}
+        self.pending_block_hashes = set()
+
+    @property
+    def pending(self):
+        """
+        Return True if there are blocks still being signed
+        """
+        return bool(self.pending_batches)
+
+    def sign(self, account_blocks):
+        """
+        Sign the given blocks.
+
+        Blocks that are not signed within the time budget will be
+        returned by a later call once they have been signed.
+
+        :param list account_blocks: List of (private key, blocks) tuples,
+                                    one for each account
+        :returns: List of newly signed blocks
+        :rtype: list
+        """
+        start = time.time()
+
+        account_blocks = [
+            (private_key, [
+                block for block in blocks
+                if not block.signature
+                and block.block_hash not in self.pending_block_hashes
+            ])
+            for private_key, blocks in account_blocks
+        ]
+        account_blocks = [
+            (private_key, blocks) for private_key, blocks in account_blocks
+            if blocks
+        ]
+        block_count = sum([len(blocks) for _, blocks in account_blocks])
+
+        if block_count < self.MIN_POOL_BLOCK_COUNT and not self.pending:
+            return self.sign_inline(account_blocks)
+
+        if not self.pool:
+            logger.info(
+                "Starting signing pool with %d process(es)", self.processes
+            )
+            self.pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.processes
+            )
+
+        for private_key, blocks in account_blocks:
+            for i in range(0, len(blocks), self.BATCH_SIZE):
+                self._submit_batch(private_key, blocks[i:i+self.BATCH_SIZE])
+
+        timeout = max(self.time_budget - (time.time() - start), 0)
+        concurrent.futures.wait(
+            list(self.pending_batches.keys()), timeout=timeout
+        )
+
+        return self._collect_signed_blocks()
+
+    def shutdown(self):
+        """
+        Shutdown the process pool. Any unfinished signatures are discarded.
+        """
+        # Cancel batches that haven't started yet. 'cancel_futures' can't
+        # be used since it requires Python 3.9.
+        for future in self.pending_batches.keys():
+            future.cancel()
+
+        if self.pool:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+
+        self.pending_batches = {}
+        self.pending_block_hashes = set()
+
+    @staticmethod
+    def sign_inline(account_blocks):
+        """
+        Sign the given blocks in the calling thread
+
+        :param list account_blocks: List of (private key, blocks) tuples,
+                                    one for each account
+        :returns: List of newly signed blocks
+        :rtype: list
+        """
+        signed_blocks = []
+
+        for private_key, blocks in account_blocks:
+            block_hashes = [block.block_hash for block in blocks]
+            signatures = sign_block_hashes(private_key, block_hashes)
+
+            for block, signature in zip(blocks, signatures):
+                block.signature = signature
+                signed_blocks.append(block)
+
+        return signed_blocks
+
+    def _submit_batch(self, private_key, blocks):
+        future = self.pool.submit(
+            sign_block_hashes, private_key,
+            [block.block_hash for block in blocks]
+        )
+
+        self.pending_batches[future] = blocks
+        self.pending_block_hashes.update(
+            [block.block_hash for block in blocks]
+        )
+
+    def _collect_signed_blocks(self):
+        signed_blocks = []
+
+        done_futures = [
+            future for future in self.pending_batches.keys()
+            if future.done()
+        ]
+
+        for future in done_futures:
+            blocks = self.pending_batches.pop(future)
+            self.pending_block_hashes.difference_update(
+                [block.block_hash for block in blocks]
+            )
+
+            try:
+                signatures = future.result()
+            except Exception as exc:
+                # The blocks will be submitted again on the next call
+                logger.error("Signing worker failed: %s", exc)
+                continue
+
+            for block, signature in zip(blocks, signatures):
+                # Block might have been signed elsewhere in the meantime
+                if block.signature:
+                    continue
+
+                block.signature = signature
+                signed_blocks.append(block)
+
+        return signed_blocks
@@ -392,16 +392,13 @@ def _get_block_hashes_in_order(
     return hash_list
 
 
-def sort_blocks_for_broadcast(blocks):
+def _get_block_dependencies(blocks):
     """
-    Sort and return a list of Blocks in correct order so they can be
-    broadcast
-
-    :param blocks: List of blocks
-    :type blocks: List[siliqua.wallet.accounts.Block]
+    Build the dependency graph for a list of Blocks using the `previous`
+    and `link` edges between them
 
-    :returns: Sorted list of blocks
-    :rtype: list
+    :returns: (block_map, hash2successor, hash2parent) tuple
+    :rtype: tuple
     """
     block_map = HexDict()
     hash2successor = HexDict()
@@ -433,6 +430,22 @@ def sort_blocks_for_broadcast(blocks):
                 hash2successor[link_block_hash].append(block_hash)
                 hash2parent[block_hash].append(link_block_hash)
 
+    return block_map, hash2successor, hash2parent
+
+
+def sort_blocks_for_broadcast(blocks):
+    """
+    Sort and return a list of Blocks in correct order so they can be
+    broadcast
+
+    :param blocks: List of blocks
+    :type blocks: List[siliqua.wallet.accounts.Block]
+
+    :returns: Sorted list of blocks
+    :rtype: list
+    """
+    block_map, hash2successor, hash2parent = _get_block_dependencies(blocks)
+
     frontiers = []
 
     # Get frontiers (blocks without any successors)
@@ -459,3 +472,49 @@ def sort_blocks_for_broadcast(blocks):
                 added_block_hashes.add(block_hash)
 
     return [block_map[block_hash] for block_hash in block_hashes_in_order]
+
+
+def split_blocks_for_broadcast(blocks):
+    """
+    Split a list of Blocks into independent groups that can be broadcast
+    in parallel.
+
+    Blocks in different groups don't depend on each other through
+    `previous` or `link` edges. Blocks in each group are sorted in the order
+    they need to be broadcast.
+
+    :param blocks: List of blocks
+    :type blocks: List[siliqua.wallet.accounts.Block]
+
+    :returns: List of block groups
+    :rtype: List[list]
+    """
+    block_map, hash2successor, hash2parent = _get_block_dependencies(blocks)
+
+    groups = []
+    grouped_block_hashes = set()
+
+    for block in blocks:
+        if block.block_hash in grouped_block_hashes:
+            continue
+
+        # Find every block connected to this block in either direction
+        group = []
+        block_hashes_to_visit = [block.block_hash]
+        grouped_block_hashes.add(block.block_hash)
+
+        while block_hashes_to_visit:
+            block_hash = block_hashes_to_visit.pop()
+
+            if block_hash in block_map:
+                group.append(block_map[block_hash])
+
+            for related_hash in \
+                    hash2parent[block_hash] + hash2successor[block_hash]:
+                if related_hash not in grouped_block_hashes:
+                    grouped_block_hashes.add(related_hash)
+                    block_hashes_to_visit.append(related_hash)
+
+        groups.append(sort_blocks_for_broadcast(group))
+
+    return groups
@@ -1,11 +1,13 @@
 import base64
+import concurrent.futures
+import itertools
 import os
 import secrets
 from enum import Enum
 from functools import wraps
 
 import ijson
-from nanolib import (WORK_DIFFICULTY, generate_account_id,
+from nanolib import (WORK_DIFFICULTY, InvalidPrivateKey, generate_account_id,
                      generate_account_key_pair, get_account_id,
                      get_account_key_pair, validate_account_id,
                      validate_block_hash, validate_private_key, validate_seed)
@@ -15,7 +17,8 @@ from siliqua.util import AccountIDDict
 from ..util import Callbacks
 from ..work import WorkUnit
 from . import logger
-from .accounts import Account, AccountSource, Block, PrecomputedWork
+from .accounts import (Account, AccountSource, Block, BlockSnapshot,
+                       PrecomputedWork)
 from .exceptions import (AccountAlreadyExists, InvalidEncryptionKey,
                          TransactionAlreadyExists, UnsupportedWalletVersion,
                          WalletDecryptionError, WalletFileInvalid,
@@ -138,6 +141,41 @@ class WalletProperties(WalletSerializable):
     version = property(lambda x: x._version, set_version)
 
 
+def derive_private_key_accounts(private_keys, secret_key=None):
+    """
+    Derive account IDs for a list of private keys and encrypt the private
+    keys if a secret key is provided.
+
+    This is run in a worker process when private keys are imported in bulk.
+
+    :param list private_keys: List of private keys
+    :param str secret_key: Optional secret key used to encrypt the private
+                           keys
+
+    :returns: List of (account ID, private key) tuples, or
+              :class:`nanolib.exceptions.InvalidPrivateKey` instances for
+              invalid private keys
+    :rtype: list
+    """
+    results = []
+
+    for private_key in private_keys:
+        try:
+            validate_private_key(private_key)
+        except InvalidPrivateKey as exc:
+            results.append(exc)
+            continue
+
+        account_id = get_account_id(private_key=private_key)
+
+        if secret_key:
+            private_key = Secret(val=private_key, secret_key=secret_key)
+
+        results.append((account_id, private_key))
+
+    return results
+
+
 def ensure_secrets_unlocked(func):
     """
     Decorator that ensures the wrapped method can only be called when
@@ -620,6 +658,107 @@ class Wallet(WalletSerializable):
 
         return self.add_account(account)
 
+    @ensure_secrets_unlocked
+    def add_accounts_from_private_keys(
+            self, private_keys, processes=-1, batch_size=5000):
+        """
+        Add accounts from an iterable of private keys.
+
+        Private keys are consumed from the iterable in batches, making it
+        possible to import a large amount of private keys from a file.
+        Account IDs are derived and private keys encrypted in a process
+        pool while the previous batch is added to the wallet.
+
+        Private keys for existing watching-only accounts are added to the
+        existing accounts as in :meth:`add_account_from_private_key`.
+
+        :param private_keys: Iterable of private keys
+        :param int processes: Amount of worker processes to use.
+                              -1 uses half of CPU cores.
+        :param int batch_size: Amount of private keys to process at a time
+
+        :returns: Tuple containing the list of added accounts and a list
+                  of (index, exception) tuples for private keys that
+                  couldn't be added. The exception is either
+                  :class:`nanolib.exceptions.InvalidPrivateKey` or
+                  :class:`siliqua.wallet.exceptions.AccountAlreadyExists`
+        :rtype: tuple
+        """
+        if processes == -1:
+            processes = max(int(os.cpu_count() / 2), 1)
+
+        private_keys = iter(private_keys)
+        accounts = []
+        errors = []
+
+        def submit_batch(pool):
+            batch = list(itertools.islice(private_keys, batch_size))
+            chunk_size = max(int(len(batch) / processes), 1)
+
+            return [
+                pool.submit(
+                    derive_private_key_accounts,
+                    batch[i:i+chunk_size], self.secret_key
+                )
+                for i in range(0, len(batch), chunk_size)
+            ]
+
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=processes) as pool:
+            index = 0
+            futures = submit_batch(pool)
+
+            while futures:
+                # Start processing the next batch before adding the
+                # accounts from the current batch
+                next_futures = submit_batch(pool)
+
+                for future in futures:
+                    for result in future.result():
+                        if isinstance(result, InvalidPrivateKey):
+                            errors.append((index, result))
+                            index += 1
+                            continue
+
+                        account_id, private_key = result
+
+                        try:
+                            account = self.account_map[account_id]
+                        except KeyError:
+                            account = None
+
+                        if account and account.private_key:
+                            errors.append((
+                                index,
+                                AccountAlreadyExists(
+                                    "Account already in the wallet"
+                                )
+                            ))
+                        elif account:
+                            account.private_key = private_key
+                            account.source = AccountSource.PRIVATE_KEY
+                            accounts.append(account)
+                        else:
+                            account = self.add_account(
+                                Account(
+                                    account_id=account_id,
+                                    private_key=private_key,
+                                    source=AccountSource.PRIVATE_KEY
+                                )
+                            )
+                            accounts.append(account)
+
+                        index += 1
+
+                futures = next_futures
+
+        logger.info(
+            "Added %d account(s) from %d private key(s)",
+            len(accounts), index
+        )
+
+        return accounts, errors
+
     def add_account_from_account_id(self, account_id):
         """
         Add watching-only account with an account ID.
@@ -757,10 +896,15 @@ class Wallet(WalletSerializable):
                     logger.debug(
                         "Adding block %s in account %s from network",
                         block_result.block_hash, account_id)
-                    account.add_block(
-                        block_result.block,
-                        callbacks=self.callbacks
-                    )
+
+                    block = block_result.block
+                    if isinstance(block, BlockSnapshot):
+                        # Broadcast block was removed from the wallet
+                        # before it was confirmed
+                        block = block.to_block()
+                        block.confirmed = True
+
+                    account.add_block(block, callbacks=self.callbacks)
 
         return True
 
@@ -862,13 +1006,22 @@ class Wallet(WalletSerializable):
         return block
 
     @ensure_secrets_unlocked
-    def sign_blocks(self):
+    def sign_blocks(self, signer=None):
         """
         Sign all blocks that haven't been signed yet.
 
+        Each account's private key is only decrypted once, after which
+        all of the account's unsigned blocks are signed together.
+
+        :param signer: Optional block signer used to sign large amounts of
+                       blocks in a process pool. If the signer doesn't
+                       finish within its time budget, remaining blocks will
+                       be returned by later calls.
+        :type signer: siliqua.wallet.signer.BlockSigner
+
         :returns: List of newly signed blocks
         """
-        signed_blocks = []
+        account_blocks = []
 
         for account in self.accounts:
             if not account.private_key:
@@ -877,19 +1030,28 @@ class Wallet(WalletSerializable):
             if not account.blocks:
                 continue
 
+            unsigned_blocks = []
             block = account.confirmed_head or account.blocks[0]
 
             while block:
                 if not block.signature:
-                    block.sign(
-                        private_key=account.get_secret(
-                            "private_key", secret_key=self.secret_key
-                        )
-                    )
-                    signed_blocks.append(block)
+                    unsigned_blocks.append(block)
 
                 block = block.next
 
+            if unsigned_blocks:
+                account_blocks.append((
+                    account.get_secret(
+                        "private_key", secret_key=self.secret_key
+                    ),
+                    unsigned_blocks
+                ))
+
+        if signer:
+            signed_blocks = signer.sign(account_blocks)
+        else:
+            signed_blocks = BlockSigner.sign_inline(account_blocks)
+
         if signed_blocks:
             logger.debug("Found and signed %d block(s)", len(signed_blocks))
 
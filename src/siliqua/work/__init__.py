@@ -12,6 +12,7 @@ from threading import Lock
 
 from siliqua.exceptions import InsufficientConfiguration
 from siliqua.plugins import BasePlugin, get_work_plugins
+from siliqua.util import Callbacks
 from nanolib import (WORK_DIFFICULTY, get_work_value, solve_work,
                      validate_account_id, validate_block_hash,
                      validate_difficulty, validate_work,
@@ -99,6 +100,10 @@ class BaseWorkPlugin(BasePlugin):
         self.work_lock = Lock()
         self.work_units = {}
 
+        # 'work_solved' is invoked in the work thread whenever PoW is
+        # generated for a work unit
+        self.callbacks = Callbacks(["work_solved"])
+
         self.started = False
 
     def add_work_units_to_solve(self, work_units, network_difficulty):
@@ -49,10 +49,11 @@ class WorkProcessor:
     and processing the results. Runs on its own thread.
     """
     def __init__(
-            self, process_count, work_lock, work_units):
+            self, process_count, work_lock, work_units, callbacks=None):
         self.process_count = int(process_count)
         self.work_lock = work_lock
         self.work_units = work_units
+        self.callbacks = callbacks
 
         self.work_to_generate = OrderedDict()
         self.work_block_hash_pools = OrderedDict()
@@ -239,6 +240,9 @@ class WorkProcessor:
                             )
                             found_work = True
 
+                            if self.callbacks:
+                                self.callbacks.work_solved.invoke(work_unit)
+
                     if found_work:
                         # If we found work, shutdown all workers for this block hash
                         del self.work_to_generate[work_block_hash]
@@ -281,9 +285,11 @@ class WorkProcessor:
             self.start_worker(work_unit=work_unit)
 
 
-def run_work_thread(process_count, work_lock, work_units, shutdown_flag):
+def run_work_thread(
+        process_count, work_lock, work_units, shutdown_flag, callbacks=None):
     work_processor = WorkProcessor(
-        process_count=process_count, work_lock=work_lock, work_units=work_units
+        process_count=process_count, work_lock=work_lock,
+        work_units=work_units, callbacks=callbacks
     )
 
     while not shutdown_flag.is_set():
@@ -356,7 +362,8 @@ class WorkPlugin(BaseWorkPlugin):
                 "process_count": process_count,
                 "work_units": self.work_units,
                 "work_lock": self.work_lock,
-                "shutdown_flag": self.shutdown_flag
+                "shutdown_flag": self.shutdown_flag,
+                "callbacks": self.callbacks
             }
         )
         self.thread.start()
@@ -116,7 +116,9 @@ class MockWebSocketNode:
         self.lock = RLock()
 
         self.broadcast_blocks = mock_node.shared.broadcast_blocks
-        self.subscriptions = {}
+        # Subscriptions for each WebSocket connection
+        self.connection_subscriptions = []
+        self.received_actions = []
 
         self.ws_responses = defaultdict(list)
 
@@ -126,6 +128,16 @@ class MockWebSocketNode:
         lambda self: self.mock_node.shared.wallet
     )
 
+    @property
+    def subscriptions(self):
+        """
+        Subscriptions for the latest WebSocket connection
+        """
+        if not self.connection_subscriptions:
+            return {}
+
+        return self.connection_subscriptions[-1]
+
     def start(self):
         self.shutdown_flag = ThreadEvent()
 
@@ -166,18 +178,32 @@ class MockWebSocketNode:
 
         return self
 
-    async def handle_subscription(self, response):
+    async def handle_subscription(self, response, subscriptions):
         action = response["action"]
         topic = response["topic"]
 
+        self.received_actions.append((action, topic))
+
         if action == "subscribe":
-            self.subscriptions[topic] = response.get("options", {})
+            subscriptions[topic] = response.get("options", {})
             logger.info(
-                "[MOCK] Subscribed %s %s", topic, self.subscriptions[topic]
+                "[MOCK] Subscribed %s %s", topic, subscriptions[topic]
+            )
+        elif action == "update":
+            options = subscriptions[topic]
+            options_update = response.get("options", {})
+
+            accounts = set(options.get("accounts", []))
+            accounts |= set(options_update.get("accounts_add", []))
+            accounts -= set(options_update.get("accounts_del", []))
+
+            options["accounts"] = sorted(list(accounts))
+            logger.info(
+                "[MOCK] Updated subscription %s %s", topic, options
             )
         elif action == "unsubscribe":
             try:
-                del self.subscriptions[topic]
+                del subscriptions[topic]
                 logger.info(
                     "[MOCK] Unsubscribed from topic '%s'",
                     topic
@@ -188,18 +214,18 @@ class MockWebSocketNode:
                     "which is not active", topic
                 )
 
-    async def broadcast_replay_responses(self, ws):
-        for topic, options in self.subscriptions.items():
+    async def broadcast_replay_responses(self, ws, subscriptions):
+        for topic, options in subscriptions.items():
             for response in self.ws_responses[topic]:
                 if response.options == options:
                     await ws.send_json(response.response)
                     self.ws_responses[topic].remove(response)
 
-    async def broadcast_mock_responses(self, ws):
+    async def broadcast_mock_responses(self, ws, subscriptions):
         wallet = wallet_from_str(self.wallet)
 
-        if "confirmation" in self.subscriptions:
-            options = self.subscriptions["confirmation"].get("options", {})
+        if "confirmation" in subscriptions:
+            options = subscriptions["confirmation"].get("options", {})
 
             accounts = options.get("accounts", [])
 
@@ -249,7 +275,7 @@ class MockWebSocketNode:
 
                     block = block.next
 
-        if "active_difficulty" in self.subscriptions:
+        if "active_difficulty" in subscriptions:
             await ws.send_json({
                 "topic": "active_difficulty",
                 "time": str(time.time()),
@@ -271,12 +297,17 @@ async def mock_ws_handler(request):
     ws = web.WebSocketResponse()
     await ws.prepare(request)
 
+    subscriptions = {}
+    ws_mock_node.connection_subscriptions.append(subscriptions)
+
     while not shutdown_flag.is_set():
         # Receive and handle subscriptions and unsubscriptions
         try:
             try:
                 response = await ws.receive_json(timeout=0.1)
-                await ws_mock_node.handle_subscription(response)
+                await ws_mock_node.handle_subscription(
+                    response, subscriptions
+                )
             except asyncio.TimeoutError:
                 pass
             except TypeError:
@@ -286,9 +317,11 @@ async def mock_ws_handler(request):
                 else:
                     raise
 
-            await ws_mock_node.broadcast_replay_responses(ws)
+            await ws_mock_node.broadcast_replay_responses(ws, subscriptions)
             if ws_mock_node.wallet:
-                await ws_mock_node.broadcast_mock_responses(ws)
+                await ws_mock_node.broadcast_mock_responses(
+                    ws, subscriptions
+                )
         except Exception:
             import traceback
             print(traceback.format_exc())
@@ -402,7 +435,6 @@ class MockRPCResponseMocker:
 
         assert data["raw"]
         assert data["reverse"]
-        assert data["count"] == 500
 
         head = data.get("head", None)
 
@@ -458,6 +490,7 @@ class MockRPCResponseMocker:
                     "amount": str(block.amount),
                     "balance": str(block.balance),
                     "hash": block.block_hash,
+                    "height": str(i + 1),
                     "link": block.link,
                     "local_timestamp": None,
                     "previous": block.previous,
@@ -468,6 +501,9 @@ class MockRPCResponseMocker:
                     "work": block.work
                 })
 
+        if account_entries:
+            account_entries = account_entries[:data["count"]]
+
         result["history"] = account_entries
 
         return result
@@ -652,6 +688,55 @@ class MockRPCResponseMocker:
             "hash": block.block_hash
         }
 
+    def create_mock_account_info(self, data):
+        wallet = wallet_from_str(self.shared.wallet)
+
+        try:
+            account = wallet.account_map[data["account"]]
+        except KeyError:
+            return {"error": "Account not found"}
+
+        confirmed_blocks = [
+            block for block in account.blocks if block.confirmed
+        ]
+
+        if not confirmed_blocks:
+            return {"error": "Account not found"}
+
+        return {
+            "frontier": confirmed_blocks[-1].block_hash,
+            "open_block": confirmed_blocks[0].block_hash,
+            "representative_block": confirmed_blocks[-1].block_hash,
+            "balance": str(confirmed_blocks[-1].balance),
+            "modified_timestamp": str(int(time.time())),
+            "block_count": str(len(confirmed_blocks)),
+            "account_version": "1",
+            "confirmation_height": str(len(confirmed_blocks))
+        }
+
+    def create_mock_accounts_frontiers(self, data):
+        wallet = wallet_from_str(self.shared.wallet)
+
+        frontiers = {}
+
+        for account_id in data["accounts"]:
+            try:
+                account = wallet.account_map[account_id]
+            except KeyError:
+                continue
+
+            confirmed_blocks = [
+                block for block in account.blocks if block.confirmed
+            ]
+
+            if confirmed_blocks:
+                frontiers[account_id] = confirmed_blocks[-1].block_hash
+
+        return {
+            # Instead of an empty dict, an empty string is used in the API
+            "frontiers": frontiers if frontiers else ""
+        }
+
     def create_mock_active_difficulty(self, _):
         return {
             "network_minimum": self.shared.work_difficulty,
@@ -682,6 +767,10 @@ class MockRPCResponseMocker:
                 return self.create_mock_blocks_info(data)
             elif action == "accounts_pending":
                 return self.create_mock_accounts_pending(data)
+            elif action == "account_info":
+                return self.create_mock_account_info(data)
+            elif action == "accounts_frontiers":
+                return self.create_mock_accounts_frontiers(data)
             elif action == "process":
                 return self.create_mock_process(data)
             elif action == "active_difficulty":
@@ -1079,7 +1168,8 @@ def network_plugin_factory(config_factory):
     network_plugins = []
 
     def create_node_network_plugin(
-            port=9076, ws_port=None, plugin_cls=None):
+            port=9076, ws_port=None, plugin_cls=None, ws_connections=1,
+            rpc_urls=None):
         if not plugin_cls:
             plugin_cls = NetworkPlugin
 
@@ -1089,7 +1179,7 @@ def network_plugin_factory(config_factory):
         )
         config.set(
             "network.{}.rpc_url".format(plugin_cls.PLUGIN_NAME),
-            "http://127.0.0.1:{}".format(port)
+            rpc_urls or "http://127.0.0.1:{}".format(port)
         )
 
         if ws_port:
@@ -1097,6 +1187,10 @@ def network_plugin_factory(config_factory):
                 "network.{}.ws_url".format(plugin_cls.PLUGIN_NAME),
                 "http://127.0.0.1:{}".format(ws_port)
             )
+            config.set(
+                "network.{}.ws_connections".format(plugin_cls.PLUGIN_NAME),
+                ws_connections
+            )
 
         config.set(
             "network.{}.sync_delay".format(plugin_cls.PLUGIN_NAME),
@@ -13,5 +13,14 @@ DATA = [
         {
             "error": "Account not found"
         }
+    ),
+    HTTPReplay(
+        {
+            "action": "account_info",
+            "account": "xrb_15n1wthxc5ndjnoufdfe8m4z5j973o6trzwbfys4cu4gtju5mh4xc918fout"
+        },
+        {
+            "error": "Account not found"
+        }
     )
 ]
@@ -0,0 +1,16 @@
+from tests.network.nano_node.conftest import HTTPReplay
+
+
+DATA = [
+    HTTPReplay(
+        {
+            "action": "accounts_frontiers",
+            "accounts": [
+                "xrb_15n1wthxc5ndjnoufdfe8m4z5j973o6trzwbfys4cu4gtju5mh4xc918fout"
+            ]
+        },
+        {
+            "frontiers": ""
+        }
+    )
+]
@@ -7,7 +7,7 @@ DATA = [
         {
             "action": "account_history",
             "account": "xrb_3rropjiqfxpmrrkooej4qtmm1pueu36f9ghinpho4esfdor8785a455d16nf",
-            "count": 500,
+            "count": 6,
             "raw": True,
             "reverse": True
         },
@@ -265,5 +265,20 @@ DATA = [
                 "xrb_3rropjiqfxpmrrkooej4qtmm1pueu36f9ghinpho4esfdor8785a455d16nf": ""
             }
         }
+    ),
+    HTTPReplay(
+        {
+            "action": "account_info",
+            "account": "xrb_3rropjiqfxpmrrkooej4qtmm1pueu36f9ghinpho4esfdor8785a455d16nf"
+        },
+        {
+            "frontier": "BCDEF4D74B0D93231B1C6CFDBA21DC189CFF4D69BE8FAC07278968FE0BC09FFC",
+            "open_block": "088EE46429CA936F76C4EAA20B97F6D33E5D872971433EE0C1311BCB98764456",
+            "representative_block": "BCDEF4D74B0D93231B1C6CFDBA21DC189CFF4D69BE8FAC07278968FE0BC09FFC",
+            "balance": "1415589316951048370157256704",
+            "modified_timestamp": "0",
+            "block_count": "5",
+            "confirmation_height": "5"
+        }
     )
 ]
@@ -8,7 +8,7 @@ DATA = [
             "account": "xrb_1nanoftwk6741wmdznzangwm8prq95spu3zntb5gwpjdk8qd3p8eu5bxoehc",
             "raw": True,
             "reverse": True,
-            "count": 500
+            "count": 3
         },
         {
             "account": "xrb_1nanoftwk6741wmdznzangwm8prq95spu3zntb5gwpjdk8qd3p8eu5bxoehc",
@@ -135,5 +135,20 @@ DATA = [
         {
             "error": "Old block"
         }
+    ),
+    HTTPReplay(
+        {
+            "action": "account_info",
+            "account": "xrb_1nanoftwk6741wmdznzangwm8prq95spu3zntb5gwpjdk8qd3p8eu5bxoehc"
+        },
+        {
+            "frontier": "96970559D7257F63ACB8383ED57CB510745DE744ABCEC4DC41590CE7E32179EA",
+            "open_block": "E82CDC903E33AC80C2ACB6F3608FE9CFBDF610F11308F10CDDD8F6347F1CE058",
+            "representative_block": "96970559D7257F63ACB8383ED57CB510745DE744ABCEC4DC41590CE7E32179EA",
+            "balance": "0",
+            "modified_timestamp": "1556254492",
+            "block_count": "2",
+            "confirmation_height": "2"
+        }
     )
 ]
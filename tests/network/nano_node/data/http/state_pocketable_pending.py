@@ -8,7 +8,7 @@ DATA = [
             "account": "xrb_1w77aapnijnm5mo16r3xtpqu7n459r61fqpcdt3kxfmz8gtqgzbozswxmduy",
             "raw": True,
             "reverse": True,
-            "count": 500
+            "count": 3
         },
         {
             "account": "xrb_1w77aapnijnm5mo16r3xtpqu7n459r61fqpcdt3kxfmz8gtqgzbozswxmduy",
@@ -162,5 +162,20 @@ DATA = [
                 }
             }
         }
+    ),
+    HTTPReplay(
+        {
+            "action": "account_info",
+            "account": "xrb_1w77aapnijnm5mo16r3xtpqu7n459r61fqpcdt3kxfmz8gtqgzbozswxmduy"
+        },
+        {
+            "frontier": "D9917582FB96AF84C02250F62A5340DD1318C76B33EC3C421D15F6EFED1DFD55",
+            "open_block": "A972FF5D6C00BFD18EDD70C74469204E640C81F0D30B62E0069A24209F1D82F9",
+            "representative_block": "D9917582FB96AF84C02250F62A5340DD1318C76B33EC3C421D15F6EFED1DFD55",
+            "balance": "1000000000000000000000000000000",
+            "modified_timestamp": "1551151678",
+            "block_count": "2",
+            "confirmation_height": "2"
+        }
     )
 ]
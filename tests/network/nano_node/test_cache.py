@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+from siliqua.network.nano_node.cache import LinkBlockCache
+from tests.util import run_async
+
+ACCOUNT_ID = \
+    "xrb_1111111111111111111111111111111111111111111111111111hifc8npp"
+
+
+class MockFetch:
+    def __init__(self, link_blocks):
+        self.link_blocks = {
+            link_block.block_hash: link_block for link_block in link_blocks
+        }
+        self.requests = []
+
+    async def __call__(self, block_hashes):
+        self.requests.append(block_hashes)
+        await asyncio.sleep(0)
+
+        return {
+            block_hash: self.link_blocks[block_hash]
+            for block_hash in block_hashes
+            if block_hash in self.link_blocks
+        }
+
+
+def test_link_block_cache_coalesce(pocketable_block_factory):
+    link_blocks = [
+        pocketable_block_factory(account_id=ACCOUNT_ID, amount=1000)
+        for _ in range(0, 3)
+    ]
+    block_hash_a, block_hash_b, block_hash_c = [
+        link_block.block_hash for link_block in link_blocks
+    ]
+    fetch = MockFetch(link_blocks)
+    cache = LinkBlockCache(maxsize=10, coalesce_seconds=0.01)
+
+    async def get_link_blocks():
+        return await asyncio.gather(
+            cache.get_link_blocks([block_hash_a], fetch),
+            cache.get_link_blocks([block_hash_b, block_hash_a], fetch),
+            cache.get_link_blocks([block_hash_c], fetch)
+        )
+
+    result_a, result_b, result_c = run_async(get_link_blocks())
+
+    assert [link_block.block_hash for link_block in result_b] == \
+        [block_hash_b, block_hash_a]
+    assert result_a[0].block_hash == block_hash_a
+    assert result_c[0].block_hash == block_hash_c
+
+    # Concurrent lookups are merged into one batch
+    assert fetch.requests == [[block_hash_a, block_hash_b, block_hash_c]]
+
+    # Every caller gets its own copy
+    assert result_a[0] is not result_b[1]
+    assert result_a[0].amount == result_b[1].amount == 1000
+
+    # Cached link blocks are not retrieved again
+    result = run_async(cache.get_link_blocks([block_hash_c], fetch))
+
+    assert result[0].block_hash == block_hash_c
+    assert len(fetch.requests) == 1
+
+
+def test_link_block_cache_lru(pocketable_block_factory):
+    link_blocks = [
+        pocketable_block_factory(account_id=ACCOUNT_ID, amount=1000)
+        for _ in range(0, 3)
+    ]
+    block_hash_a, block_hash_b, block_hash_c = [
+        link_block.block_hash for link_block in link_blocks
+    ]
+    cache = LinkBlockCache(maxsize=2, coalesce_seconds=0)
+
+    cache.add(link_blocks[0])
+    cache.add(link_blocks[1])
+
+    # Access A so that B becomes the least recently used block
+    assert cache.get(block_hash_a).block_hash == block_hash_a
+
+    cache.add(link_blocks[2])
+
+    assert len(cache) == 2
+    assert cache.get(block_hash_a)
+    assert not cache.get(block_hash_b)
+    assert cache.get(block_hash_c)
+
+    # Modifying a returned block doesn't modify the cached block
+    cache.get(block_hash_a).amount = 1
+
+    assert cache.get(block_hash_a).amount == 1000
+
+
+def test_link_block_cache_missing_block(pocketable_block_factory):
+    link_block = pocketable_block_factory(account_id=ACCOUNT_ID, amount=1000)
+    fetch = MockFetch([link_block])
+    cache = LinkBlockCache(maxsize=10, coalesce_seconds=0)
+
+    async def get_link_blocks():
+        return await asyncio.gather(
+            cache.get_link_blocks([link_block.block_hash], fetch),
+            cache.get_link_blocks(["A" * 64], fetch),
+            return_exceptions=True
+        )
+
+    result, error = run_async(get_link_blocks())
+
+    # Missing block only fails the lookup that requested it
+    assert result[0].block_hash == link_block.block_hash
+    assert isinstance(error, KeyError)
+
+    # Failed lookups are not cached
+    with pytest.raises(KeyError):
+        run_async(cache.get_link_blocks(["A" * 64], fetch))
+
+    assert len(fetch.requests) == 2
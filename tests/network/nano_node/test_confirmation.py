@@ -0,0 +1,201 @@
+import asyncio
+from threading import Event
+from types import SimpleNamespace
+
+from siliqua.network.nano_node.confirmation import ConfirmationTracker
+from tests.util import run_async
+
+
+class MockBlock:
+    def __init__(self, block_hash, account="xrb_account"):
+        self.block_hash = block_hash
+        self.account = account
+
+
+class MockRPCProcessor:
+    CONFIRMATION_POLL_INTERVAL_SECONDS = 0.01
+    CONFIRMATION_FALLBACK_POLL_INTERVAL_SECONDS = 300
+    CONFIRMATION_TIMEOUT_SECONDS = 300
+
+    def __init__(self, responses, websocket_processor=None):
+        self.network_plugin = SimpleNamespace(
+            get_websocket_processor=lambda account_id: websocket_processor
+        )
+        self.rpc_url = "http://127.0.0.1"
+        self.shutdown_flag = Event()
+        self.responses = iter(responses)
+        self.requests = []
+
+    async def do_json_post(self, url, params):
+        self.requests.append(params)
+        return next(self.responses)
+
+
+def test_confirmation_tracker_batch():
+    rpc_processor = MockRPCProcessor([
+        {
+            "blocks": {
+                "A": {"confirmed": "true"},
+                "B": {"confirmed": "false"}
+            }
+        },
+        {
+            "blocks": {
+                "B": {"confirmed": "true"}
+            }
+        }
+    ])
+    tracker = ConfirmationTracker(rpc_processor)
+
+    async def wait_for_blocks():
+        return await asyncio.gather(
+            tracker.wait_for_confirmation(MockBlock("A")),
+            tracker.wait_for_confirmation(MockBlock("B"))
+        )
+
+    result_a, result_b = run_async(wait_for_blocks())
+
+    assert result_a.confirmed
+    assert result_b.confirmed
+
+    # Both blocks are polled using a single request
+    assert rpc_processor.requests == [
+        {"action": "blocks_info", "hashes": ["A", "B"]},
+        {"action": "blocks_info", "hashes": ["B"]}
+    ]
+
+
+def test_confirmation_tracker_missing_block():
+    rpc_processor = MockRPCProcessor([
+        {"error": "Block not found"},
+        {
+            "blocks": {
+                "A": {"confirmed": "true"}, "B": {"confirmed": "true"}
+            }
+        },
+        {"error": "Block not found"},
+        {"blocks": {"C": {"confirmed": "true"}}},
+        {"error": "Block not found"}
+    ])
+    tracker = ConfirmationTracker(rpc_processor)
+
+    async def wait_for_blocks():
+        return await asyncio.gather(*[
+            tracker.wait_for_confirmation(MockBlock(block_hash))
+            for block_hash in ("A", "B", "C", "D")
+        ])
+
+    result_a, result_b, result_c, result_d = run_async(wait_for_blocks())
+
+    assert result_a.confirmed
+    assert result_b.confirmed
+    assert result_c.confirmed
+
+    # Missing block is found by splitting the blocks in half until
+    # the missing block is found
+    assert result_d.rejected
+    assert result_d.error.value == "unknown"
+
+    assert [request["hashes"] for request in rpc_processor.requests] == [
+        ["A", "B", "C", "D"], ["A", "B"], ["C", "D"], ["C"], ["D"]
+    ]
+
+
+def test_confirmation_tracker_websocket():
+    websocket_processor = SimpleNamespace(
+        connected=True, subscribed_account_ids={"xrb_account"}
+    )
+    rpc_processor = MockRPCProcessor(
+        [{
+            "blocks": {
+                "A": {"confirmed": "false"}, "B": {"confirmed": "true"}
+            }
+        }],
+        websocket_processor=websocket_processor
+    )
+    tracker = ConfirmationTracker(rpc_processor)
+
+    async def wait_for_blocks():
+        async def confirm_block():
+            await asyncio.sleep(0.05)
+            assert tracker.confirm("A")
+
+        results = await asyncio.gather(
+            tracker.wait_for_confirmation(MockBlock("A")),
+            tracker.wait_for_confirmation(
+                MockBlock("B", account="xrb_unsubscribed")
+            ),
+            confirm_block()
+        )
+        return results[:2]
+
+    result_a, result_b = run_async(wait_for_blocks())
+
+    assert result_a.confirmed
+    assert result_b.confirmed
+
+    # Every block is polled once immediately, after which only
+    # the block for the account not subscribed by the WebSocket connection
+    # is polled
+    assert rpc_processor.requests == [
+        {"action": "blocks_info", "hashes": ["A", "B"]}
+    ]
+
+    # Unknown blocks are ignored
+    assert not tracker.confirm("C")
+
+
+def test_confirmation_tracker_websocket_late_block():
+    websocket_processor = SimpleNamespace(
+        connected=True, subscribed_account_ids={"xrb_account"}
+    )
+    rpc_processor = MockRPCProcessor(
+        [
+            {"blocks": {"A": {"confirmed": "false"}}},
+            {"blocks": {"B": {"confirmed": "true"}}}
+        ],
+        websocket_processor=websocket_processor
+    )
+    tracker = ConfirmationTracker(rpc_processor)
+
+    async def wait_for_blocks():
+        async def wait_for_late_block():
+            await asyncio.sleep(0.05)
+            return await tracker.wait_for_confirmation(MockBlock("B"))
+
+        async def confirm_block():
+            await asyncio.sleep(0.1)
+            assert tracker.confirm("A")
+
+        results = await asyncio.gather(
+            tracker.wait_for_confirmation(MockBlock("A")),
+            wait_for_late_block(),
+            confirm_block()
+        )
+        return results[:2]
+
+    result_a, result_b = run_async(wait_for_blocks())
+
+    assert result_a.confirmed
+    assert result_b.confirmed
+
+    # Block registered while the poll task is running is polled on the
+    # next tick even though it's tracked by the WebSocket connection
+    assert rpc_processor.requests == [
+        {"action": "blocks_info", "hashes": ["A"]},
+        {"action": "blocks_info", "hashes": ["B"]}
+    ]
+
+
+def test_confirmation_tracker_early_confirmation():
+    rpc_processor = MockRPCProcessor([])
+    tracker = ConfirmationTracker(rpc_processor)
+
+    # Confirmation arrives before the block is registered
+    assert not tracker.confirm("A")
+
+    result = run_async(tracker.wait_for_confirmation(MockBlock("A")))
+
+    assert result.confirmed
+    assert not rpc_processor.requests
+    assert not tracker.recent_confirmations
@@ -0,0 +1,75 @@
+import asyncio
+from types import SimpleNamespace
+
+from siliqua.network.nano_node.difficulty import DifficultyTracker
+from siliqua.network.nano_node.rpc import RPCProcessor
+from tests.util import run_async
+
+
+def test_difficulty_tracker(monkeypatch):
+    now = 1000
+
+    monkeypatch.setattr(
+        "siliqua.network.nano_node.difficulty.time.time", lambda: now
+    )
+
+    network_plugin = SimpleNamespace(work_difficulty="ffffffc000000000")
+    tracker = DifficultyTracker(network_plugin, poll_interval=10)
+
+    # Difficulty is polled until it's received for the first time
+    assert tracker.poll_due
+
+    tracker.update("ffffffc100000000")
+
+    assert network_plugin.work_difficulty == "ffffffc100000000"
+    assert not tracker.poll_due
+
+    # Difficulty is polled again after the interval unless it's
+    # updated in the meantime
+    now = 1009
+    tracker.update("ffffffc200000000")
+    now = 1011
+
+    assert not tracker.poll_due
+
+    now = 1020
+
+    assert tracker.poll_due
+
+    tracker.update("ffffffc200000000")
+
+    # Refresh can be requested before the interval has passed
+    tracker.request_refresh()
+
+    assert tracker.poll_due
+
+    tracker.update("ffffffc300000000")
+
+    assert not tracker.poll_due
+
+
+def test_refresh_active_difficulty():
+    requests = []
+
+    async def update_active_difficulty():
+        requests.append(1)
+        await asyncio.sleep(0.05)
+
+    rpc_processor = SimpleNamespace(
+        difficulty_refresh_task=None,
+        update_active_difficulty=update_active_difficulty
+    )
+
+    async def refresh():
+        await asyncio.gather(*[
+            RPCProcessor.refresh_active_difficulty(rpc_processor)
+            for _ in range(0, 5)
+        ])
+
+    # Concurrent refreshes share a single request
+    run_async(refresh())
+    assert len(requests) == 1
+
+    # Difficulty is refreshed again once the previous refresh has finished
+    run_async(refresh())
+    assert len(requests) == 2
@@ -1,3 +1,4 @@
+import asyncio
 import time
 
 import pytest
@@ -5,6 +6,9 @@ from siliqua.network import AccountSyncStatus
 from siliqua.util import RawBlock
 from siliqua.wallet import Block
 from siliqua.network import BlockProcessError
+from siliqua.network.nano_node.base import HistoryPage
+from siliqua.network.nano_node.rpc import RPCProcessor
+from siliqua.network.nano_node.ws import WebSocketProcessor
 from siliqua.wallet.util import TimestampSource
 from nanolib.exceptions import InvalidSignature
 from tests.util import wait_for
@@ -156,6 +160,44 @@ class TestJSONRPCProcessor:
         # Link blocks are retrieved for receive blocks, not send blocks
         assert not block_b.link_block
 
+    def test_sync_state_watching_confirmation_height(
+            self, mock_node, node_network_plugin):
+        """
+        Synchronize an account blockchain using the account's confirmation
+        height. Only link blocks need to be retrieved using 'blocks_info'.
+        """
+        mock_node.add_replay_datasets([
+            "state_watching_confirmation_height", "active_difficulty",
+            "version"
+        ]).start()
+        network_plugin = node_network_plugin
+
+        network_plugin.account_sync_statuses["xrb_1nanoftwk6741wmdznzangwm8prq95spu3zntb5gwpjdk8qd3p8eu5bxoehc"] \
+            = AccountSyncStatus(
+                account_id="xrb_1nanoftwk6741wmdznzangwm8prq95spu3zntb5gwpjdk8qd3p8eu5bxoehc"
+            )
+
+        sync_status = network_plugin.account_sync_statuses[
+            "xrb_1nanoftwk6741wmdznzangwm8prq95spu3zntb5gwpjdk8qd3p8eu5bxoehc"]
+        wait_for(
+            lambda: sync_status.network_head == "96970559D7257F63ACB8383ED57CB510745DE744ABCEC4DC41590CE7E32179EA",
+            timeout=2
+        )
+
+        # The last block is above the confirmation height
+        assert not sync_status.sync_complete
+        assert network_plugin.processed_block_queue.qsize() == 2
+
+        block_a, block_b = [
+            network_plugin.processed_block_queue.get_nowait().block
+            for _ in range(0, 2)
+        ]
+
+        assert block_a.block_hash == "E82CDC903E33AC80C2ACB6F3608FE9CFBDF610F11308F10CDDD8F6347F1CE058"
+        assert block_a.link == block_a.link_block.block_hash
+        assert block_b.block_hash == "96970559D7257F63ACB8383ED57CB510745DE744ABCEC4DC41590CE7E32179EA"
+        assert not block_b.link_block
+
     def test_sync_empty_watching(self, mock_node, node_network_plugin):
         """
         Synchronize account blockchain when no blocks for the account
@@ -178,6 +220,211 @@ class TestJSONRPCProcessor:
 
         assert not sync_status.network_head
 
+    def test_sync_node_failover(self, mock_node, network_plugin_factory):
+        """
+        Synchronize account blockchain when one of the nodes is unreachable
+        """
+        mock_node.add_replay_datasets([
+            "empty_watching", "active_difficulty", "version"
+        ]).start()
+        network_plugin = network_plugin_factory(
+            rpc_urls=[
+                # Nothing is listening on this port
+                "http://127.0.0.1:9079",
+                "http://127.0.0.1:{}".format(mock_node.port)
+            ]
+        )
+
+        network_plugin.account_sync_statuses["xrb_15n1wthxc5ndjnoufdfe8m4z5j973o6trzwbfys4cu4gtju5mh4xc918fout"] \
+            = AccountSyncStatus(
+                account_id="xrb_15n1wthxc5ndjnoufdfe8m4z5j973o6trzwbfys4cu4gtju5mh4xc918fout"
+            )
+
+        # Requests to the unreachable node are retried using the other node
+        sync_status = network_plugin.account_sync_statuses[
+            "xrb_15n1wthxc5ndjnoufdfe8m4z5j973o6trzwbfys4cu4gtju5mh4xc918fout"]
+        wait_for(lambda: sync_status.sync_complete, timeout=2)
+
+        # The unreachable node is taken out of rotation
+        dead_endpoint, endpoint = network_plugin.node_pool.endpoints
+
+        assert dead_endpoint.open_until
+        assert dead_endpoint.latency is None
+        assert endpoint.latency is not None
+        assert network_plugin.node_pool.select() is endpoint
+
+    def test_sync_frontiers_unchanged(self, mock_node, node_network_plugin):
+        """
+        Check accounts that are due for polling using a bulk frontier
+        request
+        """
+        mock_node.add_replay_datasets([
+            "empty_watching", "empty_watching_frontiers",
+            "active_difficulty", "version"
+        ]).start()
+        network_plugin = node_network_plugin
+
+        network_plugin.account_sync_statuses["xrb_15n1wthxc5ndjnoufdfe8m4z5j973o6trzwbfys4cu4gtju5mh4xc918fout"] \
+            = AccountSyncStatus(
+                account_id="xrb_15n1wthxc5ndjnoufdfe8m4z5j973o6trzwbfys4cu4gtju5mh4xc918fout"
+            )
+
+        sync_status = network_plugin.account_sync_statuses[
+            "xrb_15n1wthxc5ndjnoufdfe8m4z5j973o6trzwbfys4cu4gtju5mh4xc918fout"]
+        wait_for(lambda: sync_status.sync_complete, timeout=1)
+
+        # Only allow the frontier request from now on and make the account
+        # due for polling
+        mock_node.shared.req_responses = []
+        mock_node.add_replay_datasets([
+            "empty_watching_frontiers", "active_difficulty", "version"
+        ])
+        sync_status.timestamp = None
+
+        # Frontier hasn't changed, so the account is marked as checked
+        # without requesting the account history
+        wait_for(lambda: sync_status.timestamp, timeout=1)
+
+        assert sync_status.sync_complete
+        assert not sync_status.network_head
+
+    def test_sync_deep_history(
+            self, monkeypatch, mock_node, node_network_plugin):
+        """
+        Synchronize an account with a history that spans several pages.
+        The next page is requested while the current page is processed.
+        """
+        mock_node.add_replay_datasets(["active_difficulty", "version"]).start()
+        network_plugin = node_network_plugin
+
+        account_id = \
+            "xrb_15n1wthxc5ndjnoufdfe8m4z5j973o6trzwbfys4cu4gtju5mh4xc918fout"
+        block_hashes = ["{:064X}".format(i) for i in range(1, 1001)]
+        events = []
+        processed_block_hashes = []
+
+        async def get_account_history(self, account_id, head=None, count=500):
+            events.append(("fetch", head))
+
+            start = block_hashes.index(head) if head else 0
+            return HistoryPage([
+                {"hash": block_hash}
+                for block_hash in block_hashes[start:start+count]
+            ])
+
+        async def get_confirmation_height(self, account_id):
+            return True, None
+
+        async def process_account_history(
+                self, account_id, history, confirmation_height=None):
+            events.append(("process", history[-1]["hash"]))
+            await asyncio.sleep(0.01)
+
+            processed_block_hashes.extend(
+                [entry["hash"] for entry in history]
+            )
+            self.account_sync_statuses[account_id].network_head = \
+                history[-1]["hash"]
+            events.append(("processed", history[-1]["hash"]))
+
+            return True
+
+        monkeypatch.setattr(RPCProcessor, "HISTORY_PAGE_SIZE", 100)
+        monkeypatch.setattr(
+            RPCProcessor, "get_account_history", get_account_history
+        )
+        monkeypatch.setattr(
+            RPCProcessor, "process_account_history", process_account_history
+        )
+        monkeypatch.setattr(
+            RPCProcessor, "get_confirmation_height", get_confirmation_height
+        )
+
+        network_plugin.account_sync_statuses[account_id] = \
+            AccountSyncStatus(account_id=account_id)
+
+        sync_status = network_plugin.account_sync_statuses[account_id]
+        wait_for(lambda: sync_status.sync_complete, timeout=5)
+
+        # Every block was processed once and in order
+        assert processed_block_hashes == block_hashes
+        assert sync_status.network_head == block_hashes[-1]
+
+        # Pages overlap by one block. Starting from the third page, each
+        # page was requested before the previous page finished processing.
+        for i in range(198, 991, 99):
+            block_hash = block_hashes[i]
+            assert events.index(("fetch", block_hash)) \
+                < events.index(("processed", block_hash))
+
+    def test_sync_existing_account_confirmation_height(
+            self, monkeypatch, mock_node, node_network_plugin):
+        """
+        Synchronize an account that already has blocks in the wallet,
+        eg. after a restart. The confirmation height is only requested
+        once the history doesn't fit in a single page.
+        """
+        mock_node.add_replay_datasets(["active_difficulty", "version"]).start()
+        network_plugin = node_network_plugin
+
+        account_id = \
+            "xrb_15n1wthxc5ndjnoufdfe8m4z5j973o6trzwbfys4cu4gtju5mh4xc918fout"
+        block_hashes = ["{:064X}".format(i) for i in range(1, 201)]
+        block_count = [3]
+        confirmation_height_requests = []
+        processed = []
+
+        async def get_account_history(self, account_id, head=None, count=500):
+            start = block_hashes.index(head) if head else 0
+            end = min(start + count, block_count[0])
+            return HistoryPage([
+                {"hash": block_hashes[i], "height": str(i + 1)}
+                for i in range(start, end)
+            ])
+
+        async def get_confirmation_height(self, account_id):
+            confirmation_height_requests.append(account_id)
+            return True, block_count[0]
+
+        async def process_account_history(
+                self, account_id, history, confirmation_height=None):
+            processed.append((history[-1]["hash"], confirmation_height))
+            self.account_sync_statuses[account_id].network_head = \
+                history[-1]["hash"]
+
+            return False
+
+        monkeypatch.setattr(RPCProcessor, "HISTORY_PAGE_SIZE", 100)
+        monkeypatch.setattr(
+            RPCProcessor, "get_account_history", get_account_history
+        )
+        monkeypatch.setattr(
+            RPCProcessor, "process_account_history", process_account_history
+        )
+        monkeypatch.setattr(
+            RPCProcessor, "get_confirmation_height", get_confirmation_height
+        )
+
+        # Wallet already contains the first block
+        network_plugin.account_sync_statuses[account_id] = \
+            AccountSyncStatus(account_id=account_id, head_hash=block_hashes[0])
+        sync_status = network_plugin.account_sync_statuses[account_id]
+
+        # New blocks are checked without requesting the confirmation height
+        wait_for(lambda: processed, timeout=2)
+
+        assert processed[0] == (block_hashes[2], None)
+        assert not confirmation_height_requests
+
+        # Long history requests the confirmation height first
+        block_count[0] = 200
+        processed.clear()
+        sync_status.timestamp = None
+        wait_for(lambda: processed, timeout=2)
+
+        assert processed[0] == (block_hashes[101], 200)
+        assert confirmation_height_requests == [account_id]
+
     def test_sync_invalid_signature(self, mock_node, node_network_plugin):
         # If the node returns an invalid signature, the network plugin
         # will abort and shut itself down
@@ -508,6 +755,154 @@ class TestWebSocketProcessor:
         assert int(block_c.timestamp.date.timestamp()) > time.time() - 10
         assert not block_c.link_block
 
+    def test_subscription_update(
+            self, mock_node, mock_ws_node, ws_node_network_plugin):
+        mock_node.add_replay_datasets([
+            "active_difficulty", "version", "ws_watching"
+        ]).start()
+        mock_ws_node.start()
+        network_plugin = ws_node_network_plugin
+
+        account_id_a = \
+            "xrb_1nanoftwk6741wmdznzangwm8prq95spu3zntb5gwpjdk8qd3p8eu5bxoehc"
+        account_id_b = \
+            "xrb_3sjmihcotq4ofuufmw6tr6pmgy698gg8wggsrzpyebkrp1i6g6igfrzfhpkw"
+
+        def get_subscribed_accounts():
+            return mock_ws_node.subscriptions.get(
+                "confirmation", {}
+            ).get("accounts", None)
+
+        network_plugin.account_sync_statuses[account_id_a] = \
+            AccountSyncStatus(account_id=account_id_a)
+        wait_for(
+            lambda: get_subscribed_accounts() == [account_id_a], timeout=1
+        )
+
+        network_plugin.account_sync_statuses[account_id_b] = \
+            AccountSyncStatus(account_id=account_id_b)
+        wait_for(
+            lambda: get_subscribed_accounts() == [account_id_a, account_id_b],
+            timeout=1
+        )
+
+        del network_plugin.account_sync_statuses[account_id_a]
+        wait_for(
+            lambda: get_subscribed_accounts() == [account_id_b], timeout=1
+        )
+
+        # Only the changed accounts are sent after the initial subscription
+        assert [
+            action for action, topic in mock_ws_node.received_actions
+            if topic == "confirmation"
+        ] == ["subscribe", "update", "update"]
+
+    def test_sharded_connections(
+            self, mock_node, mock_ws_node, network_plugin_factory):
+        mock_node.add_replay_datasets([
+            "active_difficulty", "version", "ws_watching"
+        ]).start()
+        mock_ws_node.start()
+        network_plugin = network_plugin_factory(
+            port=mock_node.port, ws_port=mock_ws_node.port, ws_connections=2
+        )
+
+        # The accounts belong to different shards
+        account_id_a = \
+            "xrb_1nanoftwk6741wmdznzangwm8prq95spu3zntb5gwpjdk8qd3p8eu5bxoehc"
+        account_id_b = \
+            "xrb_3sjmihcotq4ofuufmw6tr6pmgy698gg8wggsrzpyebkrp1i6g6igfrzfhpkw"
+
+        network_plugin.account_sync_statuses[account_id_a] = \
+            AccountSyncStatus(account_id=account_id_a)
+        network_plugin.account_sync_statuses[account_id_b] = \
+            AccountSyncStatus(account_id=account_id_b)
+
+        def get_subscribed_accounts():
+            return sorted([
+                subscriptions["confirmation"]["accounts"]
+                for subscriptions in mock_ws_node.connection_subscriptions
+                if "confirmation" in subscriptions
+            ])
+
+        wait_for(
+            lambda: get_subscribed_accounts() == [
+                [account_id_a], [account_id_b]
+            ],
+            timeout=1
+        )
+
+        # Each account is handled by the processor of its own shard
+        processor_a = network_plugin.get_websocket_processor(account_id_a)
+        processor_b = network_plugin.get_websocket_processor(account_id_b)
+
+        assert processor_a.shard_index == 1
+        assert processor_a.subscribed_account_ids == {account_id_a}
+        assert processor_b.shard_index == 0
+        assert processor_b.subscribed_account_ids == {account_id_b}
+
+        # Only one connection tracks the network difficulty
+        assert len([
+            subscriptions
+            for subscriptions in mock_ws_node.connection_subscriptions
+            if "active_difficulty" in subscriptions
+        ]) == 1
+
+    def test_reconnect(
+            self, monkeypatch, mock_node, mock_ws_node,
+            ws_node_network_plugin):
+        monkeypatch.setattr(
+            WebSocketProcessor, "RECONNECT_MIN_WAIT_SECONDS", 0.05
+        )
+
+        polled_account_ids = []
+        original_poll_missed_accounts = WebSocketProcessor.poll_missed_accounts
+
+        def poll_missed_accounts(self):
+            original_poll_missed_accounts(self)
+            polled_account_ids.extend(self.account_ids_to_poll)
+
+        monkeypatch.setattr(
+            WebSocketProcessor, "poll_missed_accounts", poll_missed_accounts
+        )
+
+        mock_node.add_replay_datasets([
+            "active_difficulty", "version", "ws_watching"
+        ]).start()
+        mock_ws_node.start()
+        network_plugin = ws_node_network_plugin
+
+        account_id = \
+            "xrb_1nanoftwk6741wmdznzangwm8prq95spu3zntb5gwpjdk8qd3p8eu5bxoehc"
+
+        network_plugin.account_sync_statuses[account_id] = \
+            AccountSyncStatus(account_id=account_id)
+
+        def get_subscribed_accounts():
+            return mock_ws_node.subscriptions.get(
+                "confirmation", {}
+            ).get("accounts", None)
+
+        wait_for(
+            lambda: get_subscribed_accounts() == [account_id], timeout=1
+        )
+        assert not polled_account_ids
+
+        # Restart the WebSocket server, dropping the connection
+        mock_ws_node.reload()
+
+        # The connection is reopened and the account is subscribed again
+        wait_for(
+            lambda: len(mock_ws_node.connection_subscriptions) == 2,
+            timeout=2
+        )
+        wait_for(
+            lambda: get_subscribed_accounts() == [account_id], timeout=1
+        )
+
+        # The account is polled to catch up with any missed confirmations
+        wait_for(lambda: polled_account_ids == [account_id], timeout=1)
+
     def test_invalid_signature(
             self, mock_node, mock_ws_node, ws_node_network_plugin):
         # If the node returns an invalid signature, the network plugin
@@ -0,0 +1,86 @@
+import pytest
+from siliqua.network.nano_node.pool import NodePool, get_rpc_urls
+
+
+def test_get_rpc_urls():
+    assert get_rpc_urls("http://127.0.0.1:7076") == ["http://127.0.0.1:7076"]
+    assert get_rpc_urls(["http://127.0.0.1:7076", "http://127.0.0.2:7076"]) \
+        == ["http://127.0.0.1:7076", "http://127.0.0.2:7076"]
+    assert get_rpc_urls(None) == []
+
+
+def test_node_pool_select():
+    pool = NodePool(["http://127.0.0.1", "http://127.0.0.2"])
+    endpoint_a, endpoint_b = pool.endpoints
+
+    # Endpoints without measurements are preferred
+    pool.record_success(endpoint_a, 0.5)
+
+    assert pool.select() is endpoint_b
+
+    pool.record_success(endpoint_b, 1.0)
+
+    assert pool.select() is endpoint_a
+
+    # Latency is averaged over requests
+    pool.record_success(endpoint_a, 2.0)
+
+    assert endpoint_a.latency == pytest.approx(0.95)
+    assert pool.select() is endpoint_a
+
+    # Busy endpoints are penalized
+    endpoint_a.active = 1
+
+    assert pool.select() is endpoint_b
+
+    # Excluded endpoints are never selected
+    assert pool.select(exclude=[endpoint_b]) is endpoint_a
+    assert pool.select(exclude=[endpoint_a, endpoint_b]) is None
+
+
+def test_node_pool_circuit_breaker(monkeypatch):
+    now = 1000
+
+    monkeypatch.setattr(
+        "siliqua.network.nano_node.pool.time.time", lambda: now
+    )
+
+    pool = NodePool(["http://127.0.0.1", "http://127.0.0.2"])
+    endpoint_a, endpoint_b = pool.endpoints
+
+    pool.record_success(endpoint_a, 0.1)
+    pool.record_success(endpoint_b, 1.0)
+
+    # Endpoint is taken out of rotation after enough failures in a row
+    for _ in range(0, NodePool.FAILURE_THRESHOLD - 1):
+        pool.record_failure(endpoint_a)
+
+    assert pool.select() is endpoint_a
+
+    pool.record_failure(endpoint_a)
+
+    assert endpoint_a.open_until == now + NodePool.MIN_OPEN_SECONDS
+    assert pool.select() is endpoint_b
+
+    # If every endpoint is out of rotation, the endpoint that returns
+    # first is selected
+    for _ in range(0, NodePool.FAILURE_THRESHOLD + 1):
+        pool.record_failure(endpoint_b)
+
+    assert pool.select() is endpoint_a
+
+    # Endpoint is available for a trial request after the timeout.
+    # If the trial request fails, the timeout is doubled.
+    now += NodePool.MIN_OPEN_SECONDS
+
+    assert endpoint_a.available
+
+    pool.record_failure(endpoint_a)
+
+    assert endpoint_a.open_until == now + NodePool.MIN_OPEN_SECONDS * 2
+
+    # Successful request returns the endpoint into rotation
+    pool.record_success(endpoint_a, 0.1)
+
+    assert endpoint_a.available
+    assert pool.select() is endpoint_a
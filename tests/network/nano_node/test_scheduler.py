@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+from siliqua.network.nano_node.scheduler import RequestScheduler
+from tests.util import run_async
+
+
+def run_requests(scheduler, requests):
+    """
+    Start the given (priority, key) requests while the scheduler is
+    fully occupied and return the order in which they were started
+    """
+    started = []
+
+    async def request(priority, key):
+        await scheduler.acquire(priority=priority, key=key)
+        started.append((priority, key))
+        await asyncio.sleep(0)
+        scheduler.release()
+
+    async def run():
+        # Occupy the only slot so that every request is queued
+        await scheduler.acquire()
+
+        tasks = [
+            asyncio.ensure_future(request(priority, key))
+            for priority, key in requests
+        ]
+        await asyncio.sleep(0)
+
+        scheduler.release()
+        await asyncio.gather(*tasks)
+
+    run_async(run())
+
+    return started
+
+
+def test_request_scheduler_priority():
+    scheduler = RequestScheduler(max_concurrency=1)
+
+    started = run_requests(scheduler, [(2, "a"), (2, "b"), (0, None)])
+
+    # Higher priority request is started first
+    assert started == [(0, None), (2, "a"), (2, "b")]
+    assert scheduler.active == 0
+
+
+def test_request_scheduler_fairness():
+    scheduler = RequestScheduler(max_concurrency=1)
+
+    started = run_requests(
+        scheduler, [(2, "a"), (2, "a"), (2, "a"), (2, "b"), (2, "c")]
+    )
+
+    # Requests with the same priority are started in round-robin order
+    assert started == [
+        (2, "a"), (2, "b"), (2, "c"), (2, "a"), (2, "a")
+    ]
+
+
+def test_request_scheduler_concurrency():
+    scheduler = RequestScheduler(max_concurrency=3)
+    active_counts = []
+
+    async def request():
+        await scheduler.acquire()
+        active_counts.append(scheduler.active)
+        await asyncio.sleep(0.01)
+        scheduler.release()
+
+    async def run():
+        await asyncio.gather(*[request() for _ in range(0, 10)])
+
+    run_async(run())
+
+    assert max(active_counts) == 3
+    assert scheduler.active == 0
+
+
+def test_request_scheduler_cancel():
+    scheduler = RequestScheduler(max_concurrency=1)
+
+    async def run():
+        await scheduler.acquire()
+
+        task = asyncio.ensure_future(scheduler.acquire(key="a"))
+        await asyncio.sleep(0)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # Cancelled request no longer waits for a slot
+        assert scheduler.waiting_count == 0
+
+        scheduler.release()
+
+    run_async(run())
+
+    assert scheduler.active == 0
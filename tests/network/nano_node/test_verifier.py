@@ -0,0 +1,101 @@
+import copy
+import functools
+from types import SimpleNamespace
+
+import pytest
+from nanolib.exceptions import InvalidSignature
+from siliqua.network.nano_node.base import NetworkProcessorBase
+from siliqua.network.nano_node.pool import NodeEndpoint
+from siliqua.network.nano_node.verifier import BlockVerifier
+from tests.network.nano_node.data.http.state_watching import DATA
+from tests.util import run_async
+
+ACCOUNT_ID = \
+    "xrb_1nanoftwk6741wmdznzangwm8prq95spu3zntb5gwpjdk8qd3p8eu5bxoehc"
+
+
+@pytest.fixture(scope="function")
+def verifier():
+    verifier = BlockVerifier(processes=2)
+
+    yield verifier
+
+    verifier.shutdown()
+
+
+@pytest.fixture(scope="function")
+def history():
+    history = copy.deepcopy(DATA[0].resp["history"])
+
+    for entry in history:
+        entry["account"] = ACCOUNT_ID
+
+    return history
+
+
+class TestBlockVerifier:
+    def test_block_verifier_parse_inline(self, verifier, history):
+        raw_blocks = run_async(verifier.parse(history))
+
+        assert [raw_block.signature for raw_block in raw_blocks] == \
+            [entry["signature"] for entry in history]
+
+        # Small amount of blocks doesn't start the process pool
+        assert not verifier.pool
+
+    def test_block_verifier_parse_pool(self, verifier, history):
+        verifier.MIN_POOL_BLOCK_COUNT = 1
+        verifier.BATCH_SIZE = 1
+
+        raw_blocks = run_async(verifier.parse(history))
+
+        assert verifier.pool
+
+        # Blocks decoded in the pool are returned in the same order
+        assert [raw_block.signature for raw_block in raw_blocks] == \
+            [entry["signature"] for entry in history]
+
+    @pytest.mark.parametrize("min_pool_block_count", [1, 100])
+    def test_block_verifier_invalid_signature(
+            self, verifier, history, min_pool_block_count):
+        verifier.MIN_POOL_BLOCK_COUNT = min_pool_block_count
+
+        history[-1]["signature"] = "0" * 128
+
+        # Invalid block raises the same error whether it was verified
+        # in the process pool or not
+        with pytest.raises(InvalidSignature):
+            run_async(verifier.parse(history))
+
+
+@pytest.mark.parametrize("trusted,confirmed,verify_ratio,valid", [
+    (False, True, 0, False),
+    (True, True, 0, True),
+    (True, True, 1, False),
+    # Unconfirmed blocks and link blocks are always fully verified
+    (True, False, 0, False)
+])
+def test_parse_blocks_trusted_endpoint(
+        verifier, history, trusted, confirmed, verify_ratio, valid):
+    processor = SimpleNamespace(
+        block_verifier=verifier, trusted_verify_ratio=verify_ratio
+    )
+    processor.get_verify_mask = functools.partial(
+        NetworkProcessorBase.get_verify_mask, processor
+    )
+    endpoint = NodeEndpoint("http://127.0.0.1", trusted=trusted)
+
+    history[-1]["signature"] = "0" * 128
+
+    async def parse_blocks():
+        await NetworkProcessorBase.parse_blocks(
+            processor, history, endpoint=endpoint, confirmed=confirmed
+        )
+
+    # Confirmed blocks returned by a trusted endpoint are only verified
+    # partially
+    if valid:
+        run_async(parse_blocks())
+    else:
+        with pytest.raises(InvalidSignature):
+            run_async(parse_blocks())
@@ -1,7 +1,12 @@
+import asyncio
 from queue import Empty
+from threading import Thread
 
 import pytest
-from siliqua.network import BlockSetQueue
+from siliqua.network import (AccountSyncStatus, AccountSyncStatusDict,
+                             BaseNetworkPlugin, BlockSetQueue)
+from siliqua.wallet.accounts import BlockSnapshot, LinkBlock
+from tests.util import run_async
 
 
 def test_block_set_queue(pocketable_block_factory):
@@ -36,3 +41,149 @@ def test_block_set_queue(pocketable_block_factory):
 
     assert queue.get() == block_a
     assert queue.get() == block_c
+
+
+def test_block_set_queue_batch(pocketable_block_factory):
+    queue = BlockSetQueue(capacity=2)
+
+    account_id = \
+        "xrb_1111111111111111111111111111111111111111111111111111hifc8npp"
+
+    block_a, block_b, block_c = [
+        pocketable_block_factory(account_id=account_id, amount=1000)
+        for _ in range(0, 3)
+    ]
+
+    queue.put(block_a)
+    assert queue.has_capacity
+
+    # Batches are added even if they exceed the capacity
+    queue.put_many([block_b, block_c])
+    assert queue.qsize() == 3
+    assert not queue.has_capacity
+
+    async def wait_for_capacity():
+        await asyncio.wait_for(queue.wait_for_capacity(), timeout=0.2)
+
+    with pytest.raises(asyncio.TimeoutError):
+        run_async(wait_for_capacity())
+
+    # The blocks are drained in FIFO order
+    assert queue.drain() == [block_a, block_b, block_c]
+    assert queue.drain() == []
+    assert queue.has_capacity
+
+    run_async(wait_for_capacity())
+
+    # Waiting coroutine is woken up when the queue is drained
+    # in another thread
+    queue.put_many([block_a, block_b])
+
+    async def wait_for_drain():
+        loop = asyncio.get_event_loop()
+        loop.call_later(0.05, lambda: Thread(target=queue.drain).start())
+
+        await asyncio.wait_for(queue.wait_for_capacity(), timeout=1)
+
+    run_async(wait_for_drain())
+    assert queue.has_capacity
+    assert not queue.capacity_waiters
+
+
+def test_block_set_queue_remove_dependents(wallet_factory):
+    wallet = wallet_factory(balance=10000)
+
+    account_a = wallet.accounts[0]
+    account_b = wallet.accounts[1]
+    external_account_id = wallet.accounts[15].account_id
+
+    # 'block_b' and 'block_c' depend on 'block_a' through link and
+    # previous edges respectively, while 'block_d' precedes 'block_a'
+    # and isn't affected
+    block_d = wallet.send(
+        source=account_a.account_id,
+        destination=external_account_id, amount=100
+    )
+    block_a = wallet.send(
+        source=account_a.account_id,
+        destination=account_b.account_id, amount=1000
+    )
+    block_b = account_b.receive_block(
+        LinkBlock(amount=1000, block=block_a.block)
+    )
+    block_c = wallet.send(
+        source=account_b.account_id,
+        destination=external_account_id, amount=100
+    )
+
+    queue = BlockSetQueue()
+
+    # Dependents are found regardless of the order
+    for block in (block_c, block_d, block_b):
+        queue.put(block)
+
+    removed_blocks = queue.remove_dependents([block_a.block_hash])
+
+    assert [block.block_hash for block in removed_blocks] == [
+        block_b.block_hash, block_c.block_hash
+    ]
+
+    assert queue.get() == block_d
+    assert queue.empty()
+
+
+def test_add_blocks_to_broadcast_snapshots(wallet_factory, config_factory):
+    wallet = wallet_factory(balance=10000)
+
+    account = wallet.accounts[0]
+    external_account_id = wallet.accounts[15].account_id
+
+    block = wallet.send(
+        source=account.account_id,
+        destination=external_account_id, amount=100
+    )
+
+    network_plugin = BaseNetworkPlugin(config=config_factory())
+
+    network_plugin.add_blocks_to_broadcast([block])
+    snapshot = network_plugin.broadcast_block_queue.drain()[0]
+
+    assert isinstance(snapshot, BlockSnapshot)
+
+    # Unchanged blocks reuse the existing snapshot
+    network_plugin.add_blocks_to_broadcast([block])
+
+    assert network_plugin.broadcast_block_queue.drain()[0] is snapshot
+
+    # Changed blocks get a new snapshot
+    block.work = "0" * 16
+    network_plugin.add_blocks_to_broadcast([block])
+    new_snapshot = network_plugin.broadcast_block_queue.drain()[0]
+
+    assert new_snapshot is not snapshot
+    assert new_snapshot.work == "0" * 16
+
+
+def test_account_sync_status_dict_callbacks():
+    account_id = \
+        "xrb_1111111111111111111111111111111111111111111111111111hifc8npp"
+
+    sync_statuses = AccountSyncStatusDict()
+    changes = []
+
+    sync_statuses.callbacks.account_added.add(
+        lambda account_id: changes.append(("add", account_id))
+    )
+    sync_statuses.callbacks.account_removed.add(
+        lambda account_id: changes.append(("remove", account_id))
+    )
+
+    sync_statuses[account_id] = AccountSyncStatus(account_id=account_id)
+
+    # Replacing an existing account doesn't add it again
+    sync_statuses[account_id.replace("xrb_", "nano_")] = \
+        AccountSyncStatus(account_id=account_id)
+
+    del sync_statuses[account_id]
+
+    assert changes == [("add", account_id), ("remove", account_id)]
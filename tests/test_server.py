@@ -0,0 +1,212 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from siliqua.network import BlockProcessError, BlockSyncResult
+from siliqua.network.nano_node import NetworkPlugin
+from siliqua.server import AsyncWalletServer, WalletServer
+from siliqua.wallet.accounts import BlockSnapshot
+from siliqua.work.local import WorkPlugin
+from tests.util import run_async
+
+
+@pytest.fixture(scope="function")
+def async_server(config_factory, wallet_factory):
+    config = config_factory()
+    server = WalletServer(
+        config=config,
+        work=WorkPlugin(config=config),
+        network=NetworkPlugin(config=config),
+        wallet=wallet_factory(balance=1000, confirmed=True)
+    )
+
+    yield AsyncWalletServer(server)
+
+    server.signer.shutdown()
+
+
+def test_wait_for_update(async_server):
+    server = async_server.server
+
+    # No notifications, so the wait times out
+    assert not server.wait_for_update(timeout=0.1)
+
+    # Completed network round wakes up the waiting thread right away
+    threading.Timer(
+        0.1, lambda: server.network.connection_status.complete_round(
+            sync_complete=True
+        )
+    ).start()
+
+    start = time.time()
+    assert server.wait_for_update(timeout=5)
+    assert time.time() - start < 1
+
+    assert server.network.connection_status.completed_rounds == 1
+    assert server.network.connection_status.sync_complete
+
+
+class TestAsyncWalletServer:
+    def test_wait_for_blocks_rejected(self, async_server):
+        wallet = async_server.server.wallet
+        network = async_server.server.network
+
+        account_id = wallet.accounts[0].account_id
+        destination = wallet.accounts[1].account_id
+
+        blocks = [
+            wallet.send(
+                source=account_id, destination=destination, amount=100
+            )
+            for _ in range(0, 2)
+        ]
+
+        def reject_block():
+            network.processed_block_queue.put(
+                BlockSyncResult(
+                    block=BlockSnapshot(blocks[0]), rejected=True,
+                    error="fork"
+                )
+            )
+
+        async def run():
+            await async_server.start()
+
+            events = async_server.subscribe()
+
+            # Rejection is processed as soon as it's received instead of
+            # waiting for the next periodic update
+            threading.Timer(0.1, reject_block).start()
+
+            result = await asyncio.wait_for(
+                async_server.wait_for_blocks(blocks, timeout=10),
+                timeout=async_server.MAX_UPDATE_INTERVAL_SECONDS
+            )
+
+            await async_server.stop()
+
+            return result, events
+
+        result, events = run_async(run())
+
+        assert result.complete
+        assert result.wait_results[0].rejected
+        assert result.wait_results[0].error == BlockProcessError.FORK
+        assert result.wait_results[1].rejected
+        assert result.wait_results[1].error == \
+            BlockProcessError.PREVIOUS_BLOCK_REJECTED
+
+        event_names = []
+        while not events.empty():
+            event_names.append(events.get_nowait().name)
+
+        assert event_names[0] == "block_rejected"
+        assert event_names.count("block_removed") == 2
+
+    def test_wait_for_blocks_timeout(self, async_server):
+        wallet = async_server.server.wallet
+
+        block = wallet.send(
+            source=wallet.accounts[0].account_id,
+            destination=wallet.accounts[1].account_id,
+            amount=100
+        )
+
+        async def run():
+            await async_server.start()
+
+            result = await async_server.wait_for_block(block, timeout=0.2)
+
+            await async_server.stop()
+
+            return result
+
+        result = run_async(run())
+
+        assert result.timeout
+        assert not result.confirmed and not result.rejected
+
+    def test_wait_for_blocks_already_rejected(self, async_server):
+        wallet = async_server.server.wallet
+        network = async_server.server.network
+
+        blocks = [
+            wallet.send(
+                source=wallet.accounts[0].account_id,
+                destination=wallet.accounts[1].account_id,
+                amount=100
+            )
+            for _ in range(0, 2)
+        ]
+
+        async def run():
+            await async_server.start()
+
+            events = async_server.subscribe()
+            network.processed_block_queue.put(
+                BlockSyncResult(
+                    block=BlockSnapshot(blocks[0]), rejected=True,
+                    error="fork"
+                )
+            )
+            async_server.notify()
+
+            # Wait until the rejection has been processed
+            while (await events.get()).name != "block_rejected":
+                pass
+
+            # Blocks were rejected before the wait started
+            result = await asyncio.wait_for(
+                async_server.wait_for_blocks(blocks),
+                timeout=async_server.MAX_UPDATE_INTERVAL_SECONDS
+            )
+
+            await async_server.stop()
+
+            return result
+
+        result = run_async(run())
+
+        assert result.complete
+        assert result.wait_results[0].error == BlockProcessError.FORK
+        assert result.wait_results[1].error == \
+            BlockProcessError.PREVIOUS_BLOCK_REJECTED
+
+    def test_wait_for_blocks_removed(self, async_server):
+        wallet = async_server.server.wallet
+        account = wallet.accounts[0]
+
+        block = wallet.send(
+            source=account.account_id,
+            destination=wallet.accounts[1].account_id,
+            amount=100
+        )
+
+        async def run():
+            await async_server.start()
+
+            # Block removed without being rejected no longer holds up
+            # the wait
+            async_server.loop.call_later(
+                0.1, lambda: asyncio.ensure_future(
+                    async_server.run(
+                        account.remove_block, block,
+                        callbacks=wallet.callbacks
+                    )
+                )
+            )
+
+            result = await asyncio.wait_for(
+                async_server.wait_for_blocks([block]),
+                timeout=async_server.MAX_UPDATE_INTERVAL_SECONDS
+            )
+
+            await async_server.stop()
+
+            return result
+
+        result = run_async(run())
+
+        assert result.complete
+        assert not result.wait_results
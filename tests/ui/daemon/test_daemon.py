@@ -0,0 +1,268 @@
+import json
+import time
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from siliqua.network.nano_node import NetworkPlugin
+from siliqua.server import AsyncWalletServer, WalletServer
+from siliqua.ui.daemon import (INVALID_PARAMS, METHOD_NOT_FOUND, PARSE_ERROR,
+                               DaemonUI, is_loopback_host)
+from siliqua.work.local import WorkPlugin
+from tests.util import run_async
+
+
+@pytest.fixture(scope="function")
+def daemon_rpc(config_factory, wallet_factory, wallet_path):
+    """
+    Fixture to send JSON-RPC requests to a daemon with a loaded wallet
+    without starting the network or work plugins
+    """
+    config = config_factory()
+
+    wallet = wallet_factory(balance=1000, confirmed=True)
+    wallet.save(str(wallet_path))
+
+    server = WalletServer(
+        config=config,
+        work=WorkPlugin(config=config),
+        network=NetworkPlugin(config=config),
+        wallet=None
+    )
+    server.load_wallet(str(wallet_path), passphrase="password")
+
+    if server.wallet.encryption.secrets_encrypted:
+        server.wallet.unlock("password")
+
+    ui = DaemonUI(config=config)
+
+    def send_requests(payloads):
+        async def run():
+            async_server = AsyncWalletServer(server)
+            await async_server.start()
+
+            client = TestClient(TestServer(ui.create_app(async_server)))
+            await client.start_server()
+
+            responses = []
+
+            try:
+                for payload in payloads:
+                    if isinstance(payload, str):
+                        resp = await client.post(
+                            "/", data=payload,
+                            headers={"Content-Type": "application/json"}
+                        )
+                    else:
+                        resp = await client.post("/", json=payload)
+
+                    responses.append(await resp.json())
+            finally:
+                await client.close()
+                await async_server.stop()
+
+            return responses
+
+        return run_async(run())
+
+    yield server, send_requests
+
+    server.signer.shutdown()
+    server.close_wallet()
+
+
+def test_daemon_commands(daemon_rpc):
+    server, send_requests = daemon_rpc
+    account_id = server.wallet.accounts[0].account_id
+
+    set_name, get_balance = send_requests([
+        {
+            "jsonrpc": "2.0", "id": 1, "method": "set-account-name",
+            "params": {"account_id": account_id, "name": "Savings"}
+        },
+        {
+            "jsonrpc": "2.0", "id": 2, "method": "get_balance",
+            "params": {}
+        }
+    ])
+
+    assert set_name["id"] == 1
+    assert set_name["result"]["status"] == "success"
+    assert server.wallet.account_map[account_id].name == "Savings"
+
+    assert get_balance["id"] == 2
+    assert get_balance["result"]["data"]["spendable_balance"] == "1000"
+    assert get_balance["result"]["data"]["accounts"][account_id]["name"] \
+        == "Savings"
+
+    # Wallet is kept unlocked between commands
+    assert server.wallet.secrets_unlocked
+
+
+def test_daemon_command_errors(daemon_rpc):
+    server, send_requests = daemon_rpc
+
+    not_found, invalid_params, parse_error, stdio_error, batch = \
+        send_requests([
+            {"jsonrpc": "2.0", "id": 1, "method": "create-wallet"},
+            {
+                "jsonrpc": "2.0", "id": 2, "method": "set-account-name",
+                "params": {"account_id": "invalid", "name": "Savings"}
+            },
+            "{invalid",
+            {
+                "jsonrpc": "2.0", "id": 4, "method": "set-account-name",
+                "params": {
+                    "account_id":
+                        "xrb_1111111111111111111111111111111111111111111111111111hifc8npp",
+                    "name": "Savings"
+                }
+            },
+            [
+                {"jsonrpc": "2.0", "id": 5, "method": "list-accounts"},
+                {"jsonrpc": "2.0", "id": 6, "method": "nonexistent"}
+            ]
+        ])
+
+    assert not_found["error"]["code"] == METHOD_NOT_FOUND
+    assert invalid_params["error"]["code"] == INVALID_PARAMS
+    assert parse_error["error"]["code"] == PARSE_ERROR
+
+    # Command errors are returned as stdio results
+    assert stdio_error["result"]["status"] == "error"
+    assert stdio_error["result"]["data"]["error"] == "account_not_found"
+
+    assert batch[0]["result"]["status"] == "success"
+    assert batch[1]["error"]["code"] == METHOD_NOT_FOUND
+
+
+def test_daemon_request_checks(daemon_rpc):
+    server, _ = daemon_rpc
+    ui = DaemonUI(config=server.config)
+
+    payload = {"jsonrpc": "2.0", "id": 1, "method": "list-accounts"}
+
+    async def run():
+        async_server = AsyncWalletServer(server)
+        await async_server.start()
+
+        client = TestClient(
+            TestServer(ui.create_app(async_server, token="secret"))
+        )
+        await client.start_server()
+
+        statuses = []
+
+        try:
+            for kwargs in [
+                    {"json": payload},
+                    {
+                        "json": payload,
+                        "headers": {"Authorization": "Bearer wrong"}
+                    },
+                    {
+                        "json": payload,
+                        "headers": {
+                            "Authorization": "Bearer secret",
+                            "Origin": "https://example.com"
+                        }
+                    },
+                    {
+                        "data": json.dumps(payload),
+                        "headers": {
+                            "Authorization": "Bearer secret",
+                            "Content-Type": "text/plain"
+                        }
+                    },
+                    {
+                        "json": payload,
+                        "headers": {"Authorization": "Bearer secret"}
+                    }]:
+                resp = await client.post("/", **kwargs)
+                statuses.append(resp.status)
+        finally:
+            await client.close()
+            await async_server.stop()
+
+        return statuses
+
+    # Missing or incorrect token, request from a web page and
+    # non-JSON request are rejected
+    assert run_async(run()) == [401, 401, 403, 415, 200]
+
+
+def test_daemon_send_wait_until_confirmed(daemon_rpc):
+    server, send_requests = daemon_rpc
+    account_id = server.wallet.accounts[0].account_id
+
+    start = time.time()
+    batch, change_representative, sync = send_requests([
+        [
+            {
+                "jsonrpc": "2.0", "id": 1, "method": "send",
+                "params": {
+                    "source": account_id,
+                    "destination":
+                        "xrb_1nanoftwk6741wmdznzangwm8prq95spu3zntb5gwpjdk8qd3p8eu5bxoehc",
+                    "amount": "1", "timeout": 1
+                }
+            },
+            {"jsonrpc": "2.0", "id": 2, "method": "list-accounts"}
+        ],
+        {
+            "jsonrpc": "2.0", "id": 3,
+            "method": "change-account-representative",
+            "params": {
+                "account_id": account_id,
+                "representative":
+                    "xrb_1nanoftwk6741wmdznzangwm8prq95spu3zntb5gwpjdk8qd3p8eu5bxoehc",
+                "wait_until_confirmed": True
+            }
+        },
+        {"jsonrpc": "2.0", "id": 4, "method": "sync"}
+    ])
+
+    # The block isn't confirmed since the network isn't running, but
+    # the confirmation is waited for outside the wallet thread
+    send, list_accounts = batch
+    assert send["result"]["data"]["error"] == "network_timeout"
+    assert send["result"]["data"]["block_error"] == "timeout"
+    assert not send["result"]["data"]["confirmed"]
+    assert list_accounts["result"]["status"] == "success"
+    assert time.time() - start < 5
+
+    assert change_representative["error"]["code"] == INVALID_PARAMS
+    assert sync["error"]["code"] == METHOD_NOT_FOUND
+
+
+def test_daemon_excluded_commands(daemon_rpc):
+    server, send_requests = daemon_rpc
+    account_id = server.wallet.accounts[0].account_id
+
+    responses = send_requests([
+        {"jsonrpc": "2.0", "id": 1, "method": "get-wallet-seed"},
+        {
+            "jsonrpc": "2.0", "id": 2, "method": "get-account-private-key",
+            "params": {"account_id": account_id}
+        },
+        {
+            "jsonrpc": "2.0", "id": 3, "method": "change-encryption",
+            "params": {"new_passphrase": ""}
+        },
+        {
+            "jsonrpc": "2.0", "id": 4, "method": "add-accounts-from-file",
+            "params": {"path": "/etc/passwd"}
+        }
+    ])
+
+    # Commands revealing secrets, changing encryption or reading files
+    # are not available
+    for response in responses:
+        assert response["error"]["code"] == METHOD_NOT_FOUND
+
+
+@pytest.mark.parametrize("host,loopback", [
+    ("127.0.0.1", True), ("::1", True), ("localhost", True),
+    ("0.0.0.0", False), ("192.168.1.1", False), ("example.com", False)
+])
+def test_is_loopback_host(host, loopback):
+    assert is_loopback_host(host) == loopback
@@ -2,8 +2,9 @@ import pytest
 import json
 import copy
 
+from nanolib import generate_seed, get_account_id
 from siliqua.server import WalletServer
-from siliqua.wallet import Account, AccountSource, Block, LinkBlock
+from siliqua.wallet import Account, AccountSource, Block, LinkBlock, Wallet
 from siliqua.wallet.secret import Secret
 from siliqua.ui.stdio import logger
 
@@ -367,6 +368,34 @@ class TestAddAccount:
         else:
             assert wallet.account_map[account_id].private_key == private_key
 
+    def test_add_accounts_from_file(
+            self, stdio, wallet_path, zero_balance_wallet, wallet_loader,
+            tmp_path):
+        wallet = zero_balance_wallet
+        wallet.save(wallet_path)
+
+        private_keys = [generate_seed() for _ in range(0, 10)]
+        keys_path = tmp_path / "keys.txt"
+        keys_path.write_text(
+            "\n".join(private_keys + ["", "invalid", private_keys[0]])
+        )
+
+        result = stdio([
+            "--wallet", str(wallet_path), "add-accounts-from-file",
+            str(keys_path)
+        ])
+
+        assert result["data"]["added_count"] == 10
+        assert result["data"]["invalid_lines"] == [12]
+        assert result["data"]["existing_lines"] == [13]
+
+        wallet = wallet_loader(wallet_path)
+
+        for private_key in private_keys:
+            account_id = get_account_id(private_key=private_key)
+            assert wallet.account_map[account_id].source == \
+                AccountSource.PRIVATE_KEY
+
     def test_add_account_from_private_key_after_account_id(
             self, stdio, wallet_path, zero_balance_wallet, wallet_loader,
             is_encrypted_test):
@@ -2109,3 +2138,166 @@ class TestListAddressBook:
         assert data["count"] == 2
         assert data["addresses"][DESTINATION_A] == "Destination 1"
         assert data["addresses"][DESTINATION_B] == "Destination 2"
+
+
+class TestBatch:
+    def test_batch(
+            self, stdio, wallet_factory, wallet_path, wallet_loader,
+            tmp_path, monkeypatch):
+        wallet = wallet_factory()
+        account_id = wallet.accounts[3].account_id
+        wallet.save(str(wallet_path))
+
+        save_count = []
+        monkeypatch.setattr(
+            "siliqua.wallet.Wallet.save",
+            hook(
+                Wallet.save,
+                after=lambda *args, **kwargs: save_count.append(1)
+            )
+        )
+
+        batch_path = tmp_path / "commands.txt"
+        with open(batch_path, "w") as f:
+            f.write("\n".join([
+                json.dumps({
+                    "id": "first",
+                    "command": "set-account-name",
+                    "params": {
+                        "account_id": account_id,
+                        "name": "Account number four"
+                    }
+                }),
+                "",
+                json.dumps({
+                    "command": "add_to_address_book",
+                    "params": {
+                        "account_id": "xrb_1nanoftwk6741wmdznzangwm8prq95spu3zntb5gwpjdk8qd3p8eu5bxoehc",
+                        "name": "Friend"
+                    }
+                }),
+                "{invalid",
+                json.dumps({"command": "create-wallet"}),
+                json.dumps({
+                    "command": "set-account-name",
+                    "params": {"account_id": "invalid", "name": "Invalid"}
+                })
+            ]))
+
+        output = stdio(
+            ["--wallet", str(wallet_path), "batch", str(batch_path)],
+            raw=True
+        )
+        results = [
+            json.loads(line) for line in output.split("\n")
+            if line.startswith("{")
+        ]
+
+        # One result per command followed by a summary
+        assert len(results) == 6
+
+        assert results[0]["status"] == "success"
+        assert results[0]["id"] == "first"
+        assert results[0]["line"] == 1
+        assert results[1]["status"] == "success"
+        assert results[1]["line"] == 3
+        assert results[2]["data"]["error"] == "invalid_batch_command"
+        assert results[3]["data"]["error"] == "command_not_found"
+        assert results[4]["data"]["error"] == "invalid_parameter"
+
+        assert results[5]["status"] == "error"
+        assert results[5]["data"]["error"] == "batch_command_failed"
+        assert results[5]["data"]["command_count"] == 5
+        assert results[5]["data"]["error_count"] == 3
+
+        # Wallet is only saved once
+        assert len(save_count) == 1
+
+        wallet = wallet_loader(str(wallet_path))
+        assert wallet.accounts[3].name == "Account number four"
+        assert wallet.address_book[
+            "xrb_1nanoftwk6741wmdznzangwm8prq95spu3zntb5gwpjdk8qd3p8eu5bxoehc"
+        ] == "Friend"
+
+    def test_batch_stop_on_error(
+            self, stdio, wallet_factory, wallet_path, tmp_path):
+        wallet = wallet_factory()
+        wallet.save(str(wallet_path))
+
+        batch_path = tmp_path / "commands.txt"
+        with open(batch_path, "w") as f:
+            f.write("{invalid\n")
+            f.write(json.dumps({"command": "list-accounts"}) + "\n")
+
+        output = stdio(
+            [
+                "--wallet", str(wallet_path), "batch", str(batch_path),
+                "--stop-on-error"
+            ],
+            raw=True
+        )
+        results = [
+            json.loads(line) for line in output.split("\n")
+            if line.startswith("{")
+        ]
+
+        assert len(results) == 2
+        assert results[0]["data"]["error"] == "invalid_batch_command"
+        assert results[1]["data"]["command_count"] == 1
+
+    def test_batch_passphrase(
+            self, stdio, wallet_path, tmp_path, monkeypatch):
+        stdio(
+            ["create-wallet", str(wallet_path), "--encrypt-secrets"],
+            env={"PASSPHRASE": "password"}
+        )
+
+        def getpass(prompt):
+            raise AssertionError("Passphrase shouldn't be prompted")
+
+        monkeypatch.setattr("siliqua.ui.stdio.util.getpass", getpass)
+
+        batch_path = tmp_path / "commands.txt"
+        with open(batch_path, "w") as f:
+            f.write(json.dumps({"command": "list-accounts"}) + "\n")
+
+        # Wallet isn't unlocked if no command needs its secrets
+        output = stdio(
+            ["--wallet", str(wallet_path), "batch", str(batch_path)],
+            raw=True
+        )
+        assert "Passphrase required" not in output
+        assert json.loads(output.split("\n")[0])["status"] == "success"
+
+        with open(batch_path, "a") as f:
+            f.write(json.dumps({"command": "get-wallet-seed"}) + "\n")
+
+        # Commands that need secrets use the batch passphrase
+        output = stdio(
+            ["--wallet", str(wallet_path), "batch", str(batch_path)],
+            env={"PASSPHRASE": "password"},
+            raw=True
+        )
+        results = [
+            json.loads(line) for line in output.split("\n")
+            if line.startswith("{")
+        ]
+
+        assert results[1]["status"] == "success"
+        assert results[1]["data"]["seed"]
+        assert results[2]["data"]["error_count"] == 0
+
+    def test_batch_file_not_found(
+            self, stdio, wallet_factory, wallet_path, tmp_path):
+        wallet = wallet_factory()
+        wallet.save(str(wallet_path))
+
+        result = stdio(
+            [
+                "--wallet", str(wallet_path), "batch",
+                str(tmp_path / "missing.txt")
+            ],
+            success=False
+        )
+
+        assert result["data"]["error"] == "file_not_found"
@@ -1,3 +1,4 @@
+import asyncio
 import socket
 import time
 
@@ -49,6 +50,18 @@ def async_hook(func, orig_func):
     return wrapper
 
 
+def run_async(coro):
+    # asyncio.run() is not available in Python 3.6
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+        asyncio.set_event_loop(None)
+
+
 def to_hex(num, digits):
     s = hex(num)[2:]
 
@@ -2,7 +2,8 @@ import pytest
 from siliqua.network import BlockProcessError
 from siliqua.util import RawBlock
 from siliqua.wallet.accounts import (Account, AccountSource, Block,
-                                       LinkBlock, PrecomputedWork)
+                                       BlockSnapshot, LinkBlock,
+                                       PrecomputedWork)
 from siliqua.wallet.exceptions import (InsufficientBalance,
                                          InvalidAccountBlock)
 from nanolib.exceptions import (InvalidAccount, InvalidPrivateKey,
@@ -120,6 +121,49 @@ class TestBlock:
         assert "'block_data' or 'block' is required" in str(exc.value)
 
 
+class TestBlockSnapshot:
+    def test_block_snapshot_immutable(self, account_factory):
+        account = account_factory(balance=1000, block_count=2, complete=True)
+        block = account.blocks[1]
+
+        snapshot = BlockSnapshot(block)
+
+        assert snapshot.block_hash == block.block_hash
+        assert snapshot.link_block is not block.link_block
+        assert snapshot.link_block.block_hash == block.link_block.block_hash
+        assert not snapshot.confirmed
+
+        with pytest.raises(AttributeError):
+            snapshot.work = "0" * 16
+
+        with pytest.raises(AttributeError):
+            snapshot.confirmed = True
+
+    def test_block_snapshot_is_current(self, account_factory):
+        account = account_factory(balance=1000, block_count=2, complete=True)
+        block = account.blocks[1]
+
+        snapshot = BlockSnapshot(block)
+
+        assert snapshot.is_current(block)
+
+        # Changing the block doesn't change the snapshot
+        block.work = None
+
+        assert snapshot.work
+        assert not snapshot.is_current(block)
+
+    def test_block_snapshot_to_block(self, account_factory):
+        account = account_factory(balance=1000, block_count=1)
+        block = account.blocks[0]
+
+        new_block = BlockSnapshot(block).to_block()
+
+        assert new_block is not block
+        assert new_block.block_hash == block.block_hash
+        assert new_block.link_block.block_hash == block.link_block.block_hash
+
+
 class TestAccountProperties:
     def test_account_create_account_id(self):
         account = Account(**ACCOUNT_KWARGS)
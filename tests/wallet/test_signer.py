@@ -0,0 +1,65 @@
+import pytest
+from siliqua.wallet import BlockSigner
+
+
+@pytest.fixture(scope="function")
+def signer():
+    signer = BlockSigner(processes=2, time_budget=10)
+
+    yield signer
+
+    signer.shutdown()
+
+
+class TestBlockSigner:
+    def test_block_signer_sign_inline(self, signer, account_factory):
+        account = account_factory(balance=1000, block_count=5)
+
+        signed_blocks = signer.sign(
+            [(account.private_key, account.blocks)]
+        )
+
+        assert len(signed_blocks) == 5
+        assert all(block.has_valid_signature for block in account.blocks)
+
+        # Small amount of blocks doesn't start the process pool
+        assert not signer.pool
+
+    def test_block_signer_sign_pool(self, signer, account_factory):
+        signer.MIN_POOL_BLOCK_COUNT = 1
+        signer.BATCH_SIZE = 2
+
+        account_a = account_factory(balance=1000, block_count=5)
+        account_b = account_factory(balance=1000, block_count=3)
+
+        signed_blocks = signer.sign([
+            (account_a.private_key, account_a.blocks),
+            (account_b.private_key, account_b.blocks)
+        ])
+
+        assert signer.pool
+        assert not signer.pending
+        assert len(signed_blocks) == 8
+        assert all(
+            block.has_valid_signature for block
+            in account_a.blocks + account_b.blocks
+        )
+
+    def test_block_signer_time_budget(self, signer, account_factory):
+        signer.MIN_POOL_BLOCK_COUNT = 1
+        signer.time_budget = 0
+
+        account = account_factory(balance=1000, block_count=5)
+
+        signed_blocks = signer.sign([(account.private_key, account.blocks)])
+
+        # Signatures are collected by later calls if the time budget
+        # is exceeded
+        signer.time_budget = 10
+        while signer.pending:
+            signed_blocks += signer.sign(
+                [(account.private_key, account.blocks)]
+            )
+
+        assert len(signed_blocks) == 5
+        assert all(block.has_valid_signature for block in account.blocks)
@@ -5,7 +5,8 @@ import pytest
 from siliqua.wallet.accounts import LinkBlock
 from siliqua.wallet.exceptions import InvalidEncryptionKey
 from siliqua.wallet.util import (HexDict, Secret, WalletSerializable,
-                                 sort_blocks_for_broadcast, wallet_parameter)
+                                 sort_blocks_for_broadcast,
+                                 split_blocks_for_broadcast, wallet_parameter)
 
 SECRET_KEY_A = b'erIm8Vj4YjcfD5MF3wrfGdZ8Yt2ttk3GcqrI1H3LWkA='
 SECRET_KEY_B = b'5nb5Hkpw0R4QcVwXvl-jf05l1nceoHWwrVHQTR851uo='
@@ -311,3 +312,58 @@ def test_sort_blocks_for_broadcast(wallet_factory):
     blocks = sort_blocks_for_broadcast(blocks)
 
     assert block_hashes == [block.block_hash for block in blocks]
+
+
+def test_split_blocks_for_broadcast(wallet_factory):
+    wallet = wallet_factory(balance=10000)
+
+    # Fund a few other accounts using a chain of sends
+    for i in range(1, 4):
+        send_block = wallet.send(
+            source=wallet.accounts[0].account_id,
+            destination=wallet.accounts[i].account_id,
+            amount=1000
+        )
+        wallet.accounts[i].receive_block(
+            LinkBlock(amount=1000, block=send_block.block)
+        )
+
+    for account in wallet.accounts[0:4]:
+        for block in account.blocks:
+            block.confirmed = True
+        account.update_confirmed_head()
+
+    external_account_id = wallet.accounts[15].account_id
+
+    # Two independent sends and two dependent sends
+    block_a = wallet.send(
+        source=wallet.accounts[1].account_id,
+        destination=external_account_id, amount=100
+    )
+    block_b = wallet.send(
+        source=wallet.accounts[2].account_id,
+        destination=external_account_id, amount=100
+    )
+    block_c = wallet.send(
+        source=wallet.accounts[3].account_id,
+        destination=wallet.accounts[0].account_id, amount=100
+    )
+    block_d = wallet.accounts[0].receive_block(
+        LinkBlock(amount=100, block=block_c.block)
+    )
+    block_e = wallet.send(
+        source=wallet.accounts[0].account_id,
+        destination=external_account_id, amount=100
+    )
+
+    groups = split_blocks_for_broadcast(
+        [block_e, block_a, block_d, block_b, block_c]
+    )
+
+    assert [
+        [block.block_hash for block in group] for group in groups
+    ] == [
+        [block_c.block_hash, block_d.block_hash, block_e.block_hash],
+        [block_a.block_hash],
+        [block_b.block_hash]
+    ]
@@ -228,6 +228,39 @@ class TestWalletOperations:
             AccountSource.PRIVATE_KEY
         assert wallet.account_map[account_id].private_key
 
+    def test_wallet_add_accounts_from_private_keys(self, wallet):
+        watching_account_id = \
+            "xrb_1x1cg4dgaop8i5gksrsrj891mmrzrqz7r37r48ocrnqkypqph3pbtgtk8whz"
+        wallet.add_account_from_account_id(watching_account_id)
+
+        private_keys = [generate_seed() for _ in range(0, 20)]
+        private_keys += [
+            "invalid",
+            private_keys[0],
+            # Private key for the watching-only account
+            "142a67048c4e0def1fdf3234d17b844a619c9f6dca1fde97b9e0225980f1d7a5"
+        ]
+
+        accounts, errors = wallet.add_accounts_from_private_keys(
+            iter(private_keys), processes=2, batch_size=7
+        )
+
+        assert len(accounts) == 21
+        assert len(wallet.accounts) == 41
+
+        assert [index for index, _ in errors] == [20, 21]
+        assert isinstance(errors[0][1], InvalidPrivateKey)
+        assert isinstance(errors[1][1], AccountAlreadyExists)
+
+        for account, private_key in zip(accounts, private_keys[:20]):
+            assert account.source == AccountSource.PRIVATE_KEY
+            assert account.get_secret(
+                "private_key", secret_key=wallet.secret_key
+            ) == private_key
+
+        assert wallet.account_map[watching_account_id].source == \
+            AccountSource.PRIVATE_KEY
+
     def test_wallet_add_account_from_account_id(self, wallet):
         # Add a watching-only account using the account ID
         account = wallet.add_account_from_account_id(